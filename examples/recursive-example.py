@@ -41,16 +41,16 @@ def main() -> int:
 
     # Review data and run report
     log_filepath = os.path.abspath(report_path)
-    reporter = FDDReporting(log_filepath=log_filepath)
 
     # Gather all .csv files within base directory
     filenames = gather_csv_filenames(Path(base_directory))
 
-    # Iterate through files
-    for filepath in filenames:
-        graphall = GraphAll(filepath, parse_dates=datetime_header)
-        graphall.graph_multiple_dependent_axis(
-            reporter, INDEPENDENT_AXIS_NAME, DEPENDENT_AXIS_NAMES)
+    # Iterate through files. Issues are written when the reporter is closed
+    with FDDReporting(log_filepath=log_filepath) as reporter:
+        for filepath in filenames:
+            graphall = GraphAll(filepath, parse_dates=datetime_header)
+            graphall.graph_multiple_dependent_axis(
+                reporter, INDEPENDENT_AXIS_NAME, DEPENDENT_AXIS_NAMES)
 
     return 0
 
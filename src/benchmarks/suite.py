@@ -0,0 +1,449 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 10:48:03 2026
+
+@author: jvorsten
+
+Benchmark suite with JSON baselines
+Synthetic trends (see benchmarks.synthetic) of each equipment type, length
+and number of units are reviewed, and the hot paths of a review are timed
+separately. Each time is the minimum of several repeats
+
+Stages
+ingest     ingest_csv: parse the CSV files into the equipment rules
+store      store_import: convert the CSV files into trend stores, and
+           ingest_store: open the stores
+rules      rules: every rule in the single pass of the rule plan, and each
+           rule_* method of the equipment rules called alone
+report     report: log every fault episode with an image
+graphall   graphall_ingest and graphall_render: GraphAll of each file
+startup    import_cli: import time of the command line module measured by
+           python -X importtime, and cli_help: wall time of
+           python -m trendreview --help. Saved as the case 'startup'
+
+Results are saved as JSON. A previous result used as a baseline fails the
+run (exit status 1) when any stage is slower than the baseline by more than
+the tolerance. Stages shorter than min_seconds are too noisy to compare.
+The run also fails when import_cli is longer than the startup budget,
+with or without a baseline
+
+Example
+Save a baseline, then compare a later run against it
+python -m benchmarks.suite --rows 1000 100000 --baseline ./baseline.json --save-baseline
+python -m benchmarks.suite --rows 1000 100000 --baseline ./baseline.json
+"""
+
+# Python imports
+from typing import Callable, Dict, List, Mapping
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Third party imports
+import numpy as np
+import pandas as pd
+import matplotlib
+
+# Local imports
+import trendreview
+from trendreview.FDDExceptions import FDDException
+from trendreview.reporting import FDDReporting
+from trendreview.ddvav import DDVAVRules, DDVAV_TYPES
+from trendreview.sdvav import SDVAVRules, SDVAV_TYPES
+from trendreview.GraphAll import GraphAll
+from trendreview.trendstore import import_csv
+from benchmarks.synthetic import FAULTS, write_units
+
+# Declarations
+RESULTS_FORMAT_VERSION = 1
+STAGES = ['ingest', 'store', 'rules', 'report', 'graphall', 'startup']
+# Stages of each case of equipment, rows and units
+CASE_STAGES = ['ingest', 'store', 'rules', 'report', 'graphall']
+RULES = {'ddvav': DDVAVRules, 'sdvav': SDVAVRules}
+TYPES = {'ddvav': DDVAV_TYPES, 'sdvav': SDVAV_TYPES}
+DEFAULT_ROWS = [1000, 100000]
+DEFAULT_UNITS = [1]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.2
+DEFAULT_MIN_SECONDS = 0.01
+STARTUP_CASE = 'startup'
+CLI_MODULE = 'trendreview.trendreview'
+DEFAULT_STARTUP_BUDGET = 0.25  # [s] import time of CLI_MODULE
+# Directory which contains the trendreview package
+SOURCE_DIRECTORY = os.path.dirname(os.path.dirname(
+    os.path.abspath(trendreview.__file__)))
+
+# %%
+
+
+def case_name(equipment: str, n_rows: int, n_units: int) -> str:
+    """Key of a benchmark case in results"""
+    return f"{equipment}/rows={n_rows}/units={n_units}"
+
+
+def measure(run: Callable[[object], None],
+            setup: Callable[[], object] = lambda: None,
+            repeat: int = DEFAULT_REPEAT) -> float:
+    """Return the minimum time of run in seconds over repeat runs. setup is
+    called before each run (and not timed), its result is passed to run"""
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def _load(equipment: str, filepath: str):
+    """Equipment rules of a file. Notices about extra columns are hidden"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return RULES[equipment](filepath)
+
+
+def _call_rule(method: Callable, data: pd.DataFrame) -> None:
+    """Call a rule method, which raises FDDException when the rule fails"""
+    try:
+        method(data)
+    except FDDException:
+        pass
+
+    return None
+
+
+def run_case(equipment: str, filepaths: List[str], directory: str,
+             stages: List[str] = None, repeat: int = DEFAULT_REPEAT,
+             target_width: int = None) -> Dict[str, float]:
+    """Time the stages of reviewing filepaths
+    inputs
+    -------
+    equipment: (str) 'ddvav' or 'sdvav'
+    filepaths: (list) of CSV trend files, one for each unit
+    directory: (str) scratch directory for trend stores and reports
+    stages: (list) of stage groups to run, see CASE_STAGES (default: all)
+    repeat: (int) number of times each stage is run
+    target_width: (int) plot width of reports, see FDDReporting
+    outputs
+    -------
+    seconds: (dict) of stage name to the time of all units in seconds"""
+    stages = CASE_STAGES if stages is None else stages
+    seconds = {}
+
+    def reporter():
+        report_directory = tempfile.mkdtemp(dir=directory)
+        return FDDReporting(os.path.join(report_directory, 'report.txt'),
+                            target_width=target_width)
+
+    if 'ingest' in stages:
+        seconds['ingest_csv'] = measure(lambda _: [
+            _load(equipment, filepath) for filepath in filepaths],
+            repeat=repeat)
+
+    if 'store' in stages:
+        stores = [os.path.join(directory, f'{idx}.trend')
+                  for idx in range(len(filepaths))]
+        seconds['store_import'] = measure(lambda _: [
+            import_csv(filepath, store, dtypes=TYPES[equipment])
+            for filepath, store in zip(filepaths, stores)], repeat=repeat)
+        seconds['ingest_store'] = measure(lambda _: [
+            _load(equipment, store) for store in stores], repeat=repeat)
+
+    if 'rules' in stages or 'report' in stages:
+        units = [_load(equipment, filepath) for filepath in filepaths]
+    if 'rules' in stages:
+        seconds['rules'] = measure(lambda _: [
+            unit.collect_faults() for unit in units], repeat=repeat)
+        for method in units[0].get_rules():
+            name = method.__name__
+            seconds[name] = measure(lambda _: [
+                _call_rule(getattr(unit, name), unit.data)
+                for unit in units], repeat=repeat)
+
+    if 'report' in stages:
+        faults = [unit.collect_faults() for unit in units]
+
+        def report(reporter: FDDReporting):
+            for unit, unit_faults in zip(units, faults):
+                data = unit.report_data(unit_faults)
+                for fault in unit_faults:
+                    reporter.log_fault(fault, data, create_image=True)
+        seconds['report'] = measure(report, reporter, repeat=repeat)
+
+    if 'graphall' in stages:
+        seconds['graphall_ingest'] = measure(lambda _: [
+            GraphAll(filepath) for filepath in filepaths], repeat=repeat)
+        graphs = [GraphAll(filepath) for filepath in filepaths]
+        seconds['graphall_render'] = measure(lambda reporter: [
+            graph.graph_all_data(reporter) for graph in graphs],
+            reporter, repeat=repeat)
+
+    return seconds
+
+
+def _run_python(args: List[str]) -> subprocess.CompletedProcess:
+    """Run a new Python interpreter which imports trendreview from
+    SOURCE_DIRECTORY"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [SOURCE_DIRECTORY] + [path for path in
+                              [env.get('PYTHONPATH')] if path])
+    return subprocess.run([sys.executable] + args, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def import_time(module: str, repeat: int = DEFAULT_REPEAT) -> float:
+    """Return the cumulative import time of module in seconds, measured by
+    python -X importtime in a new interpreter. The minimum of repeat
+    interpreters is kept"""
+    times = []
+    for _ in range(repeat):
+        stderr = _run_python(['-X', 'importtime', '-c',
+                              f'import {module}']).stderr
+        for line in stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == module:
+                times.append(int(fields[1]) / 1e6)
+    if not times:
+        raise ValueError(f"Import time of {module} was not reported")
+
+    return min(times)
+
+
+def startup_seconds(repeat: int = DEFAULT_REPEAT) -> Dict[str, float]:
+    """Time the start of the command line, see the stage startup"""
+    return {
+        'import_cli': import_time(CLI_MODULE, repeat),
+        'cli_help': measure(lambda _: _run_python(
+            ['-m', 'trendreview', '--help']), repeat=repeat),
+    }
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine and package versions of a run. Results of
+    different machines are not comparable"""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+    }
+
+
+def run_suite(equipment: List[str], rows: List[int], units: List[int],
+              data_directory: str, faults: bool = True,
+              stages: List[str] = None, repeat: int = DEFAULT_REPEAT,
+              target_width: int = None, log: Callable = print) -> Dict:
+    """Generate synthetic trends and time every case of equipment, rows and
+    units, see run_case
+    inputs
+    -------
+    data_directory: (str) directory of generated trend files. Files which
+    already exist are reused
+    faults: (bool) inject every fault of the equipment, otherwise trends are
+    healthy
+    log: (callable) called with a line of progress for each case
+    outputs
+    -------
+    results: (dict) with the environment and the seconds of each case"""
+    stages = STAGES if stages is None else stages
+    results = {'version': RESULTS_FORMAT_VERSION,
+               'environment': environment(), 'cases': {}}
+    if STARTUP_CASE in stages:
+        seconds = startup_seconds(repeat)
+        results['cases'][STARTUP_CASE] = {'seconds': seconds}
+        log(format_case(STARTUP_CASE, seconds))
+    stages = [stage for stage in stages if stage in CASE_STAGES]
+    if not stages:
+        return results
+    for equipment_type in equipment:
+        injected = list(FAULTS[equipment_type]) if faults else []
+        for n_rows in rows:
+            for n_units in units:
+                filepaths = write_units(data_directory, equipment_type,
+                                        n_rows, n_units, injected)
+                scratch = tempfile.mkdtemp()
+                try:
+                    seconds = run_case(equipment_type, filepaths, scratch,
+                                       stages, repeat, target_width)
+                finally:
+                    shutil.rmtree(scratch, ignore_errors=True)
+                name = case_name(equipment_type, n_rows, n_units)
+                results['cases'][name] = {
+                    'equipment': equipment_type, 'rows': n_rows,
+                    'units': n_units, 'faults': injected,
+                    'seconds': seconds}
+                log(format_case(name, seconds))
+
+    return results
+
+
+def format_case(name: str, seconds: Mapping[str, float]) -> str:
+    """Lines of text describing the times of a case"""
+    lines = [name]
+    for stage, value in seconds.items():
+        lines.append(f"  {stage:<44} {value:10.4f} s")
+
+    return '\n'.join(lines)
+
+
+def compare(results: Mapping, baseline: Mapping,
+            tolerance: float = DEFAULT_TOLERANCE,
+            min_seconds: float = DEFAULT_MIN_SECONDS) -> List[str]:
+    """Return a message for each stage of results which is slower than the
+    same stage of baseline by more than tolerance (a fraction, 0.2 is 20%).
+    Stages faster than min_seconds in both results, and cases or stages
+    missing from the baseline, are not compared"""
+    regressions = []
+    for name, case in results['cases'].items():
+        baseline_seconds = baseline['cases'].get(name, {}).get('seconds', {})
+        for stage, value in case['seconds'].items():
+            if stage not in baseline_seconds:
+                continue
+            reference = baseline_seconds[stage]
+            if max(value, reference) < min_seconds:
+                continue
+            if value > reference * (1 + tolerance):
+                regressions.append(
+                    f"{name} {stage}: {value:.4f} s versus baseline " +
+                    f"{reference:.4f} s (+{value / reference - 1:.0%})")
+
+    return regressions
+
+
+def check_startup(results: Mapping,
+                  budget: float = DEFAULT_STARTUP_BUDGET) -> List[str]:
+    """Return a message when the import time of the command line in
+    results is longer than budget seconds"""
+    seconds = results['cases'].get(STARTUP_CASE, {}).get('seconds', {})
+    if seconds.get('import_cli', 0) > budget:
+        return [f"{STARTUP_CASE} import_cli: {seconds['import_cli']:.4f} s " +
+                f"versus budget {budget:.4f} s"]
+
+    return []
+
+
+def save_results(filepath: str, results: Mapping) -> None:
+    """Write results to a JSON file"""
+    with open(filepath, 'wt', encoding='UTF-8') as file:
+        json.dump(results, file, indent=2)
+
+    return None
+
+
+def load_results(filepath: str) -> Dict:
+    """Read results from a JSON file"""
+    with open(filepath, 'rt', encoding='UTF-8') as file:
+        results = json.load(file)
+    if results.get('version') != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"{filepath} is not a benchmark result of format " +
+                         f"version {RESULTS_FORMAT_VERSION}")
+
+    return results
+
+
+parser = argparse.ArgumentParser(
+    description='Time the hot paths of trend review on synthetic trends')
+parser.add_argument('--equipment', type=str, nargs='+', dest='equipment',
+                    choices=list(FAULTS), default=list(FAULTS),
+                    help='Equipment types benchmarked (default: all)')
+parser.add_argument('--rows', type=int, nargs='+', dest='rows',
+                    default=DEFAULT_ROWS,
+                    help=('Number of rows of each trend, like 1000 ' +
+                          f'10000000 (default: {DEFAULT_ROWS})'))
+parser.add_argument('--units', type=int, nargs='+', dest='units',
+                    default=DEFAULT_UNITS,
+                    help=('Number of trend files reviewed in each case, ' +
+                          f'like 1 1000 (default: {DEFAULT_UNITS})'))
+parser.add_argument('--healthy', action='store_true', dest='healthy',
+                    default=False,
+                    help='Do not inject faults into the trends')
+parser.add_argument('--stages', type=str, nargs='+', dest='stages',
+                    choices=STAGES, default=STAGES,
+                    help='Stages timed (default: all)')
+parser.add_argument('--repeat', type=int, dest='repeat',
+                    default=DEFAULT_REPEAT,
+                    help=('Number of times each stage is run, the minimum ' +
+                          f'time is kept (default: {DEFAULT_REPEAT})'))
+parser.add_argument('--target-width', type=int, dest='target_width',
+                    default=None,
+                    help=('Plot width in pixels of reports and graphs ' +
+                          '(default: plot all samples)'))
+parser.add_argument('--data-dir', type=os.path.abspath, dest='data_directory',
+                    default=None,
+                    help=('Directory of generated trend files, reused by ' +
+                          'later runs (default: a temporary directory)'))
+parser.add_argument('--output', type=os.path.abspath, dest='output',
+                    default=None, help='Save results to this JSON file')
+parser.add_argument('--baseline', type=os.path.abspath, dest='baseline',
+                    default=None,
+                    help=('Compare results to this JSON file, and exit with ' +
+                          'status 1 when a stage is slower'))
+parser.add_argument('--save-baseline', action='store_true',
+                    dest='save_baseline', default=False,
+                    help='Save results as the baseline instead of comparing')
+parser.add_argument('--tolerance', type=float, dest='tolerance',
+                    default=DEFAULT_TOLERANCE,
+                    help=('Allowed slowdown versus the baseline as a ' +
+                          f'fraction (default: {DEFAULT_TOLERANCE})'))
+parser.add_argument('--min-seconds', type=float, dest='min_seconds',
+                    default=DEFAULT_MIN_SECONDS,
+                    help=('Stages faster than this are not compared ' +
+                          f'(default: {DEFAULT_MIN_SECONDS})'))
+parser.add_argument('--startup-budget', type=float, dest='startup_budget',
+                    default=DEFAULT_STARTUP_BUDGET,
+                    help=('Longest allowed import time of the command line ' +
+                          f'in seconds (default: {DEFAULT_STARTUP_BUDGET})'))
+
+
+def main(parser: argparse.ArgumentParser) -> int:
+    """Run the benchmark suite from the command line"""
+    namespace = parser.parse_args()
+    data_directory = namespace.data_directory or tempfile.mkdtemp()
+    try:
+        results = run_suite(namespace.equipment, namespace.rows,
+                            namespace.units, data_directory,
+                            faults=not namespace.healthy,
+                            stages=namespace.stages,
+                            repeat=namespace.repeat,
+                            target_width=namespace.target_width)
+    finally:
+        if namespace.data_directory is None:
+            shutil.rmtree(data_directory, ignore_errors=True)
+
+    if namespace.output is not None:
+        save_results(namespace.output, results)
+    regressions = check_startup(results, namespace.startup_budget)
+    if namespace.baseline is None or namespace.save_baseline:
+        if namespace.save_baseline:
+            save_results(namespace.baseline, results)
+            print(f"Saved baseline {namespace.baseline}")
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+
+    regressions += compare(results, load_results(namespace.baseline),
+                           namespace.tolerance, namespace.min_seconds)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print(f"No regressions versus baseline {namespace.baseline}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(parser))
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 09:12:40 2026
+
+@author: jvorsten
+
+Synthetic trend files for benchmarks and tests
+Trends of healthy dual-duct (ddvav) and single-duct (sdvav) terminal units
+are generated at a 5 minute interval. The unit alternates between 12 hour
+cooling and heating periods, dampers follow a daily load profile, and the
+room temperature stays at setpoint, so no rule fails on a healthy trend
+
+Faults are injected by overwriting an episode of FAULT_ROWS rows with the
+values in FAULTS. Each fault is detected by the rules listed with it.
+Episodes of different faults are spread evenly through the trend and never
+overlap
+
+Files are written in chunks of rows, so trends longer than memory (10M
+rows) can be generated. Every value is a function of the row number and
+the seed, so a trend is the same whether written in one chunk or many
+
+Example
+data = generate_trend('ddvav', 10000, faults=['cooling_damper_stuck'])
+# Or write 100 units of 1M rows each
+filepaths = write_units('c:/path/to/directory', 'ddvav', 10**6, 100)
+"""
+
+# Python imports
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple
+import hashlib
+import os
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from trendreview.ddvav import DDVAV_HEADERS, UNUSED_HEADERS
+from trendreview.sdvav import SDVAV_HEADERS, UNUSED_SDVAV_HEADERS
+
+# Declarations
+EQUIPMENT_HEADERS = {
+    'ddvav': DDVAV_HEADERS + UNUSED_HEADERS,
+    'sdvav': SDVAV_HEADERS + UNUSED_SDVAV_HEADERS,
+}
+START = np.datetime64('2021-11-19T00:00', 'ns')
+INTERVAL = np.timedelta64(5, 'm')
+ROWS_PER_DAY = 288
+MODE_ROWS = 144  # Rows of each cooling or heating period
+SETPOINT = 72.0  # [DegF]
+FAULT_ROWS = 36  # Rows of each fault episode, 3 hours
+DEFAULT_CHUNK_ROWS = 10**6
+
+# Values written during a fault episode, and the rules which detect the fault
+DDVAV_FAULTS: Dict[str, Tuple[Dict, List[str]]] = {
+    'simultaneous_heating_cooling': (
+        {'HeatCoolMode': 'COOL',
+         'CoolingDamperCommand': 50.0, 'CoolingDamperPosition': 50.0,
+         'CoolingAirVolume': 500.0,
+         'HeatingDamperCommand': 50.0, 'HeatingDamperPosition': 50.0,
+         'HeatingAirVolume': 300.0},
+        # Heating while cooling is also heating in the wrong mode
+        ['rule_simultaneous_heating_cooling', 'rule_heating_opposed_mode']),
+    'heating_opposed_mode': (
+        {'HeatCoolMode': 'COOL',
+         'CoolingDamperCommand': 0.0, 'CoolingDamperPosition': 0.0,
+         'CoolingAirVolume': 0.0,
+         'HeatingDamperCommand': 50.0, 'HeatingDamperPosition': 50.0,
+         'HeatingAirVolume': 300.0},
+        ['rule_heating_opposed_mode']),
+    'cooling_opposed_mode': (
+        {'HeatCoolMode': 'HEAT',
+         'CoolingDamperCommand': 50.0, 'CoolingDamperPosition': 50.0,
+         'CoolingAirVolume': 500.0,
+         'HeatingDamperCommand': 0.0, 'HeatingDamperPosition': 0.0,
+         'HeatingAirVolume': 0.0},
+        ['rule_cooling_opposed_mode']),
+    'cooling_damper_stuck': (
+        {'HeatCoolMode': 'COOL',
+         'CoolingDamperCommand': 80.0, 'CoolingDamperPosition': 20.0,
+         'CoolingAirVolume': 200.0,
+         'HeatingDamperCommand': 0.0, 'HeatingDamperPosition': 0.0,
+         'HeatingAirVolume': 0.0},
+        ['rule_cooling_damper_stuck']),
+    'heating_damper_stuck': (
+        {'HeatCoolMode': 'HEAT',
+         'CoolingDamperCommand': 0.0, 'CoolingDamperPosition': 0.0,
+         'CoolingAirVolume': 0.0,
+         'HeatingDamperCommand': 80.0, 'HeatingDamperPosition': 20.0,
+         'HeatingAirVolume': 100.0},
+        ['rule_heating_damper_stuck']),
+    'cooling_airflow_on_closed_damper': (
+        {'HeatCoolMode': 'COOL',
+         'CoolingDamperCommand': 0.0, 'CoolingDamperPosition': 0.0,
+         'CoolingAirVolume': 300.0,
+         'HeatingDamperCommand': 0.0, 'HeatingDamperPosition': 0.0,
+         'HeatingAirVolume': 0.0},
+        ['rule_cooling_airflow_on_closed_damper']),
+    'heating_airflow_on_closed_damper': (
+        {'HeatCoolMode': 'HEAT',
+         'CoolingDamperCommand': 0.0, 'CoolingDamperPosition': 0.0,
+         'CoolingAirVolume': 0.0,
+         'HeatingDamperCommand': 0.0, 'HeatingDamperPosition': 0.0,
+         'HeatingAirVolume': 300.0},
+        ['rule_heating_airflow_on_closed_damper']),
+    'room_temperature_deviation': (
+        {'RoomTemperature': SETPOINT + 8},
+        ['rule_room_temperature_deviation']),
+}
+SDVAV_FAULTS: Dict[str, Tuple[Dict, List[str]]] = {
+    'heating_opposed_mode': (
+        {'HeatCoolMode': 'COOL',
+         'HeatingValveCommand': 50.0, 'HeatingValvePosition': 50.0},
+        ['rule_heating_opposed_mode']),
+    'damper_stuck': (
+        {'DamperCommand': 80.0, 'DamperPosition': 20.0, 'AirVolume': 200.0},
+        ['rule_damper_stuck']),
+    'airflow_on_closed_damper': (
+        {'DamperCommand': 0.0, 'DamperPosition': 0.0, 'AirVolume': 300.0},
+        ['rule_airflow_on_closed_damper']),
+    'room_temperature_deviation': (
+        {'RoomTemperature': SETPOINT + 8},
+        ['rule_room_temperature_deviation']),
+}
+FAULTS = {'ddvav': DDVAV_FAULTS, 'sdvav': SDVAV_FAULTS}
+
+# %%
+
+
+def expected_rules(equipment: str, faults: Iterable[str]) -> List[str]:
+    """Return the sorted names of rules which detect faults"""
+    rules = set()
+    for fault in faults:
+        rules.update(FAULTS[equipment][fault][1])
+
+    return sorted(rules)
+
+
+def fault_episodes(n_rows: int, faults: Iterable[str]
+                   ) -> List[Tuple[str, int, int]]:
+    """Return (fault, first row, stop row) of each fault episode. Episodes
+    are spread evenly through n_rows and separated by healthy rows
+    inputs
+    -------
+    n_rows: (int) length of the trend
+    faults: (iterable) of fault names, see FAULTS"""
+    faults = list(faults)
+    spacing = n_rows // (len(faults) + 1)
+    if faults and spacing < 2 * FAULT_ROWS:
+        raise ValueError(f"{n_rows} rows is too short to inject " +
+                         f"{len(faults)} faults of {FAULT_ROWS} rows; at " +
+                         f"least {2 * FAULT_ROWS * (len(faults) + 1)} rows " +
+                         "are required")
+
+    return [(fault, spacing * (idx + 1), spacing * (idx + 1) + FAULT_ROWS)
+            for idx, fault in enumerate(faults)]
+
+
+def _noise(seed: int, stream: int, start: int, n_rows: int,
+           scale: float) -> np.ndarray:
+    """Uniform noise in [-scale, scale] for rows start to start + n_rows.
+    Each column (stream) and block of rows has its own generator, so the
+    noise of a row does not depend on how rows are chunked"""
+    block = ROWS_PER_DAY
+    first, last = start // block, (start + n_rows - 1) // block
+    noise = np.concatenate([
+        np.random.default_rng([seed, stream, idx]).uniform(
+            -scale, scale, block)
+        for idx in range(first, last + 1)])
+    offset = start - first * block
+
+    return noise[offset:offset + n_rows]
+
+
+def _healthy_rows(equipment: str, start: int, n_rows: int,
+                  seed: int) -> pd.DataFrame:
+    """Healthy trend of rows start to start + n_rows"""
+    rows = np.arange(start, start + n_rows)
+    cooling = (rows // MODE_ROWS) % 2 == 0
+    # Damper load follows the time of day, always open more than the
+    # closed damper tolerance
+    load = 45 + 30 * np.sin(2 * np.pi * rows / ROWS_PER_DAY)
+    load = np.round(load + _noise(seed, 0, start, n_rows, 2), 1)
+    airflow = np.round(10 * load + _noise(seed, 1, start, n_rows, 5))
+    room = np.round(SETPOINT + _noise(seed, 2, start, n_rows, 0.25), 2)
+    zero = np.zeros(n_rows)
+
+    columns = {
+        'DateTime': np.datetime_as_string(START + rows * INTERVAL, unit='m'),
+        'ControlSetpoint': np.full(n_rows, SETPOINT),
+        'HeatCoolMode': np.where(cooling, 'COOL', 'HEAT'),
+        'RoomTemperature': room,
+        'DischargeTemperature': np.where(cooling, 55.0, 85.0),
+        'ScheduleMode': np.ones(n_rows, dtype=np.int8),
+        'OccupancyMode': np.ones(n_rows, dtype=np.int8),
+        'AirflowSetpoint': airflow,
+    }
+    if equipment == 'ddvav':
+        columns.update({
+            'CoolingDamperCommand': np.where(cooling, load, zero),
+            'CoolingDamperPosition': np.where(cooling, load, zero),
+            'CoolingAirVolume': np.where(cooling, airflow, zero),
+            'HeatingDamperCommand': np.where(cooling, zero, load),
+            'HeatingDamperPosition': np.where(cooling, zero, load),
+            'HeatingAirVolume': np.where(cooling, zero, airflow),
+            'CoolingSetpoint': np.full(n_rows, SETPOINT - 2),
+        })
+    else:
+        columns.update({
+            'DamperCommand': load,
+            'DamperPosition': load,
+            'AirVolume': airflow,
+            'HeatingValveCommand': np.where(cooling, zero, load),
+            'HeatingValvePosition': np.where(cooling, zero, load),
+            'DischargeTemperatureSetpoint': np.where(cooling, 55.0, 85.0),
+        })
+
+    return pd.DataFrame(columns, columns=EQUIPMENT_HEADERS[equipment])
+
+
+def _inject_faults(data: pd.DataFrame, equipment: str, start: int,
+                   episodes: List[Tuple[str, int, int]]) -> None:
+    """Overwrite the rows of data (starting at row start of the trend)
+    which are within fault episodes"""
+    stop = start + data.shape[0]
+    for fault, first, last in episodes:
+        first, last = max(first, start), min(last, stop)
+        if first >= last:
+            continue
+        values: Mapping = FAULTS[equipment][fault][0]
+        for column, value in values.items():
+            data.iloc[first - start:last - start,
+                      data.columns.get_loc(column)] = value
+
+    return None
+
+
+def iter_trend(equipment: str, n_rows: int, faults: Iterable[str] = (),
+               seed: int = 0, chunk_rows: int = DEFAULT_CHUNK_ROWS
+               ) -> Iterator[pd.DataFrame]:
+    """Yield the rows of a synthetic trend in chunks of chunk_rows rows
+    inputs
+    -------
+    equipment: (str) 'ddvav' or 'sdvav'
+    n_rows: (int) length of the trend
+    faults: (iterable) of fault names injected, see FAULTS
+    seed: (int) seed of the noise added to healthy values
+    chunk_rows: (int) number of rows in each chunk"""
+    if equipment not in FAULTS:
+        raise ValueError(f"Equipment must be one of {list(FAULTS)}. " +
+                         f"Got {equipment}")
+    unknown = set(faults).difference(FAULTS[equipment])
+    if unknown:
+        raise ValueError(f"Unknown {equipment} faults {sorted(unknown)}, " +
+                         f"faults must be in {list(FAULTS[equipment])}")
+    episodes = fault_episodes(n_rows, faults)
+
+    for start in range(0, n_rows, chunk_rows):
+        data = _healthy_rows(equipment, start,
+                             min(chunk_rows, n_rows - start), seed)
+        _inject_faults(data, equipment, start, episodes)
+        yield data
+
+
+def generate_trend(equipment: str, n_rows: int, faults: Iterable[str] = (),
+                   seed: int = 0) -> pd.DataFrame:
+    """Return a synthetic trend in memory, see iter_trend"""
+    return pd.concat(list(iter_trend(equipment, n_rows, faults, seed)),
+                     ignore_index=True)
+
+
+def write_trend(filepath: str, equipment: str, n_rows: int,
+                faults: Iterable[str] = (), seed: int = 0,
+                chunk_rows: int = DEFAULT_CHUNK_ROWS) -> str:
+    """Write a synthetic trend to a CSV file, one chunk of rows at a time.
+    See iter_trend for inputs. Returns filepath"""
+    with open(filepath, 'wt', encoding='UTF-8', newline='') as file:
+        for idx, data in enumerate(iter_trend(equipment, n_rows, faults,
+                                              seed, chunk_rows)):
+            data.to_csv(file, index=False, header=idx == 0)
+
+    return filepath
+
+
+def write_units(directory: str, equipment: str, n_rows: int, n_units: int,
+                faults: Iterable[str] = (), seed: int = 0,
+                chunk_rows: int = DEFAULT_CHUNK_ROWS) -> List[str]:
+    """Write one synthetic trend file for each of n_units units into
+    directory. Each unit has the same faults and different noise. Files
+    which already exist are reused, so large trends are generated once
+    outputs
+    -------
+    filepaths: (list) of CSV file paths, one for each unit"""
+    faults = list(faults)
+    # Files of different faults have different names
+    name = hashlib.sha256(','.join(faults).encode('UTF-8')).hexdigest()[:8]
+    os.makedirs(directory, exist_ok=True)
+    filepaths = []
+    for unit in range(n_units):
+        filepath = os.path.join(
+            directory, f'{equipment}_{n_rows}_{name}_seed{seed + unit}.csv')
+        if not os.path.isfile(filepath):
+            # Write to a temporary name, so an interrupted run is not reused
+            temporary = filepath + '.tmp'
+            write_trend(temporary, equipment, n_rows, faults, seed + unit,
+                        chunk_rows)
+            os.replace(temporary, filepath)
+        filepaths.append(filepath)
+
+    return filepaths
@@ -63,6 +63,7 @@ def profile_graph_all_data():
     graphall = GraphAll(filepath)
     graphall.graph_all_data(
         reporter, independent_axis_name, dependent_axis_names)
+    reporter.close()
 
     return None
 
@@ -11,6 +11,7 @@ import unittest
 
 # Third party imports
 from pandas import Timestamp
+import numpy as np
 
 # Local imports
 from trendreview.FDDExceptions import FDDException
@@ -105,3 +106,16 @@ class FDDExceptionTest(unittest.TestCase):
             FDDException(self.msg, self.data)
 
         return None
+
+    def test_init_numpy_data(self):
+        """Data columns may be numpy arrays, empty arrays are rejected"""
+        self.data['DateTime'] = np.array(self.data['DateTime'],
+                                         dtype='datetime64[ns]')
+        self.data['RoomTemperature'] = np.array(self.data['RoomTemperature'])
+        FDDException(self.msg, self.data)
+
+        self.data['RoomTemperature'] = np.array([])
+        with self.assertRaises(KeyError):
+            FDDException(self.msg, self.data)
+
+        return None
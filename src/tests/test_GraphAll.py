@@ -8,6 +8,9 @@ Created on Mon Feb 14 10:49:09 2022
 # Python imports
 import unittest
 from datetime import datetime
+import tempfile
+import shutil
+import os
 
 # Third party imports
 import pandas as pd
@@ -48,9 +51,35 @@ class TestGraphAll(unittest.TestCase):
         """Graph all instances against independent axis and save a log"""
 
         independent_axis_name = 'DateTime'
-        reporter = FDDReporting(log_filepath=LOG_FILEPATH)
-        self.graphall.graph_all_data(
-            reporter, independent_axis_name, DEPENDENT_AXIS_NAMES)
+        with FDDReporting(log_filepath=LOG_FILEPATH) as reporter:
+            self.graphall.graph_all_data(
+                reporter, independent_axis_name, DEPENDENT_AXIS_NAMES)
+        return None
+
+    def test_render_workers(self):
+        """Images rendered by worker processes are numbered and reported the
+        same as images rendered within this process"""
+        directory = tempfile.mkdtemp()
+        try:
+            reports = []
+            for name, render_workers in (('serial', 0), ('workers', 2)):
+                os.makedirs(os.path.join(directory, name))
+                log_filepath = os.path.join(directory, name, 'report.txt')
+                reporter = FDDReporting(log_filepath=log_filepath,
+                                        render_workers=render_workers)
+                self.graphall.graph_all_data(
+                    reporter, 'DateTime', DEPENDENT_AXIS_NAMES)
+                reporter.close()
+                with open(log_filepath, 'rt', encoding='UTF-8') as file:
+                    reports.append(file.read().replace(name, ''))
+                self.assertEqual(
+                    sorted(os.listdir(os.path.join(directory, name))),
+                    ['.figure_counter', 'figure1.png', 'figure2.png',
+                     'report.txt'])
+            self.assertEqual(reports[0], reports[1])
+        finally:
+            shutil.rmtree(directory)
+
         return None
 
 
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 14:52:09 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import tempfile
+import time
+import shutil
+import os
+import re
+
+# Third party imports
+
+# Local imports
+from trendreview import batch
+from trendreview.batch import run_batch, gather_csv_filenames
+
+# Relative to project src directory (not relative to __file__)
+FILEPATH3 = '../data/ddvav_test.csv'
+GRAPH_COLUMNS = ['DischargeTemperature', 'CoolingDamperCommand']
+
+# %%
+
+
+class TestBatch(unittest.TestCase):
+    """Test file src/trendreview/batch.py"""
+
+    def setUp(self):
+        """Create a directory of trend files and two report directories"""
+        self.directory = tempfile.mkdtemp()
+        self.trend_directory = os.path.join(self.directory, 'trends')
+        os.makedirs(os.path.join(self.trend_directory, 'floor2'))
+        shutil.copy(FILEPATH3, os.path.join(self.trend_directory, 'a.csv'))
+        shutil.copy(FILEPATH3, os.path.join(self.trend_directory, 'floor2',
+                                            'b.csv'))
+        with open(os.path.join(self.trend_directory, 'c.csv'), 'wt',
+                  encoding='UTF-8') as file:
+            file.write('NotDateTime,Value\n1,2\n')
+        for name in ('sequential', 'parallel'):
+            os.makedirs(os.path.join(self.directory, name))
+
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        return None
+
+    def test_gather_csv_filenames(self):
+        """All .csv files are found recursively in a repeatable order"""
+        names = gather_csv_filenames(self.trend_directory)
+        self.assertEqual([os.path.relpath(name, self.trend_directory)
+                          for name in names],
+                         ['a.csv', 'c.csv', os.path.join('floor2', 'b.csv')])
+
+        return None
+
+    def test_parallel_report_matches_sequential(self):
+        """A report built by worker processes is identical to a report built
+        within one process, including figure numbering"""
+        filepaths = gather_csv_filenames(self.trend_directory)
+        reports = []
+        for name, workers in (('sequential', 1), ('parallel', 2)):
+            log_filepath = os.path.join(self.directory, name, 'report.txt')
+            run_batch(filepaths, 'GraphAll', log_filepath, workers=workers,
+                      max_pending=1, graph_columns=GRAPH_COLUMNS)
+            with open(log_filepath, 'rt', encoding='UTF-8') as file:
+                reports.append(file.read().replace(self.directory, ''))
+            figures = sorted(
+                name for name in os.listdir(os.path.dirname(log_filepath))
+                if name.endswith('.png'))
+            self.assertEqual(figures, ['figure1.png', 'figure2.png',
+                                       'figure3.png', 'figure4.png'])
+            # The staging directory is removed
+            self.assertEqual(
+                sorted(os.listdir(os.path.dirname(log_filepath))),
+                ['.figure_counter'] + figures + ['report.txt'])
+
+        self.assertEqual(reports[0], reports[1])
+        self.assertEqual(len(re.findall('Issue #', reports[0])), 5)
+        self.assertIn('Unable to review file', reports[0])
+
+        return None
+
+    def test_max_pending_bounds_waiting_results(self):
+        """Files reviewed after a slow file wait to be logged in order, and
+        count towards max_pending, so no more files are queued meanwhile"""
+        started, lock = [], threading.Lock()
+
+        def review_job(index, filepath, *args):
+            with lock:
+                started.append(index)
+            if index == 0:
+                time.sleep(0.5)
+            return {'index': index, 'filepath': filepath, 'issues': [],
+                    'error': None, 'profile': None}
+
+        started_when_logged = {}
+
+        def log_result(reporter, result):
+            with lock:
+                started_when_logged[result['index']] = len(started)
+
+        log_filepath = os.path.join(self.directory, 'parallel', 'report.txt')
+        with mock.patch.object(batch, 'ProcessPoolExecutor',
+                               ThreadPoolExecutor), \
+                mock.patch.object(batch, '_review_job', review_job), \
+                mock.patch.object(batch, '_log_result', log_result):
+            run_batch([str(index) for index in range(20)], 'ddvav',
+                      log_filepath, workers=3, max_pending=3)
+
+        self.assertEqual(sorted(started_when_logged), list(range(20)))
+        self.assertEqual(started_when_logged[0], 3)
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
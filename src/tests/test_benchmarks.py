@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 11:20:36 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+import contextlib
+import io
+import tempfile
+import shutil
+import os
+
+# Third party imports
+import pandas as pd
+
+# Local imports
+from trendreview.ddvav import DDVAVRules
+from trendreview.sdvav import SDVAVRules
+from benchmarks.synthetic import (
+    FAULTS, expected_rules, fault_episodes, generate_trend, write_trend,
+    write_units)
+from benchmarks.suite import (run_case, compare, case_name, check_startup,
+                              import_time, STARTUP_CASE)
+
+# Declarations
+N_ROWS = 2000
+RULES = {'ddvav': DDVAVRules, 'sdvav': SDVAVRules}
+
+# %%
+
+
+class TestSynthetic(unittest.TestCase):
+    """Test file src/benchmarks/synthetic.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return None
+
+    def detected_rules(self, equipment, faults, chunk_rows=10**6):
+        """Names of rules which fail on a synthetic trend"""
+        filepath = write_trend(os.path.join(self.directory, 'trend.csv'),
+                               equipment, N_ROWS, faults,
+                               chunk_rows=chunk_rows)
+        with contextlib.redirect_stdout(io.StringIO()):
+            rules = RULES[equipment](filepath)
+
+        return sorted({fault.rule for fault in rules.collect_faults()})
+
+    def test_healthy_trend(self):
+        """No rule fails on a healthy trend"""
+        for equipment in FAULTS:
+            with self.subTest(equipment=equipment):
+                self.assertEqual(self.detected_rules(equipment, []), [])
+
+    def test_injected_faults(self):
+        """Each injected fault is detected by the rules listed with it"""
+        for equipment, faults in FAULTS.items():
+            for fault in faults:
+                with self.subTest(equipment=equipment, fault=fault):
+                    self.assertEqual(
+                        self.detected_rules(equipment, [fault]),
+                        expected_rules(equipment, [fault]))
+            with self.subTest(equipment=equipment, fault='all'):
+                self.assertEqual(
+                    self.detected_rules(equipment, list(faults), 333),
+                    expected_rules(equipment, faults))
+
+    def test_chunks(self):
+        """A trend written in chunks equals the trend generated at once"""
+        faults = list(FAULTS['ddvav'])
+        filepath = write_trend(os.path.join(self.directory, 'trend.csv'),
+                               'ddvav', N_ROWS, faults, chunk_rows=333)
+        expected = generate_trend('ddvav', N_ROWS, faults)
+        pd.testing.assert_frame_equal(
+            pd.read_csv(filepath),
+            pd.read_csv(io.StringIO(expected.to_csv(index=False))))
+
+        return None
+
+    def test_fault_episodes(self):
+        """Episodes do not overlap, and a short trend raises ValueError"""
+        episodes = fault_episodes(N_ROWS, ['a', 'b', 'c'])
+        for (_, _, stop), (_, start, _) in zip(episodes, episodes[1:]):
+            self.assertLess(stop, start)
+        self.assertLessEqual(episodes[-1][2], N_ROWS)
+        with self.assertRaises(ValueError):
+            fault_episodes(100, ['a', 'b'])
+
+        return None
+
+    def test_write_units(self):
+        """Each unit is a separate file with different noise, and existing
+        files are reused"""
+        filepaths = write_units(self.directory, 'sdvav', 1000, 2)
+        self.assertEqual(len(filepaths), 2)
+        first, second = (pd.read_csv(filepath) for filepath in filepaths)
+        self.assertFalse(first['RoomTemperature'].equals(
+            second['RoomTemperature']))
+        mtime = os.stat(filepaths[0]).st_mtime_ns
+        self.assertEqual(write_units(self.directory, 'sdvav', 1000, 2),
+                         filepaths)
+        self.assertEqual(os.stat(filepaths[0]).st_mtime_ns, mtime)
+
+        return None
+
+
+class TestSuite(unittest.TestCase):
+    """Test file src/benchmarks/suite.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return None
+
+    def test_run_case(self):
+        """Ingest, store and every rule method are timed"""
+        filepaths = write_units(self.directory, 'ddvav', N_ROWS, 2,
+                                list(FAULTS['ddvav']))
+        seconds = run_case('ddvav', filepaths, self.directory,
+                           stages=['ingest', 'store', 'rules'], repeat=1)
+        methods = [name for name in dir(DDVAVRules)
+                   if name.startswith('rule_')]
+        self.assertEqual(
+            set(seconds),
+            {'ingest_csv', 'store_import', 'ingest_store', 'rules'}.union(
+                methods))
+        self.assertTrue(all(value >= 0 for value in seconds.values()))
+
+        return None
+
+    def test_compare(self):
+        """Stages slower than the baseline by more than the tolerance are
+        regressions, unless both times are below min_seconds"""
+        name = case_name('ddvav', 1000, 1)
+        baseline = {'cases': {name: {'seconds': {
+            'rules': 1.0, 'report': 1.0, 'ingest_csv': 0.001}}}}
+        results = {'cases': {
+            name: {'seconds': {'rules': 1.1, 'report': 1.5,
+                               'ingest_csv': 0.004, 'graphall_render': 9.0}},
+            case_name('ddvav', 10**7, 1): {'seconds': {'rules': 9.0}}}}
+        regressions = compare(results, baseline, tolerance=0.2,
+                              min_seconds=0.01)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('report', regressions[0])
+        self.assertEqual(len(compare(results, baseline, tolerance=0.6)), 0)
+
+        return None
+
+    def test_startup(self):
+        """The import time of the command line is measured, and is checked
+        against the startup budget"""
+        seconds = import_time('trendreview.options', repeat=1)
+        self.assertGreater(seconds, 0)
+        self.assertLess(seconds, 10)
+        results = {'cases': {STARTUP_CASE: {'seconds': {'import_cli': 0.3}}}}
+        self.assertEqual(check_startup(results, budget=0.5), [])
+        self.assertEqual(len(check_startup(results, budget=0.2)), 1)
+        self.assertEqual(check_startup({'cases': {}}, budget=0.2), [])
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
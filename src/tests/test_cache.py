@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:48:20 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+import tempfile
+import shutil
+import os
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from trendreview.cache import TrendCache
+from trendreview.helpers import read_csv
+from trendreview.ddvav import DDVAV_HEADERS, DDVAV_TYPES, DDVAVRules
+from trendreview.GraphAll import GraphAll
+
+# Relative to project src directory (not relative to __file__)
+FILEPATH = '../data/DD03.csv'
+
+# %%
+
+
+class TestTrendCache(unittest.TestCase):
+    """Test file src/trendreview/cache.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = TrendCache(os.path.join(self.directory, 'cache'))
+        self.filepath = os.path.join(self.directory, 'DD03.csv')
+        shutil.copyfile(FILEPATH, self.filepath)
+
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return None
+
+    def test_cached_data_matches_csv(self):
+        """Data loaded from the cache is equal to the parsed file"""
+        expected = read_csv(self.filepath, DDVAV_HEADERS, DDVAV_TYPES)
+        first = read_csv(self.filepath, DDVAV_HEADERS, DDVAV_TYPES,
+                         cache=self.cache)
+        self.assertEqual(len(self.cache.entries()), 1)
+        second = read_csv(self.filepath, DDVAV_HEADERS, DDVAV_TYPES,
+                          cache=self.cache)
+        pd.testing.assert_frame_equal(first, expected)
+        pd.testing.assert_frame_equal(second, expected)
+
+        # Text columns of GraphAll
+        expected = GraphAll(self.filepath).data
+        GraphAll(self.filepath, cache=self.cache)
+        cached = GraphAll(self.filepath, cache=self.cache).data
+        pd.testing.assert_frame_equal(cached, expected)
+        self.assertEqual(len(self.cache.entries()), 2)
+
+        # Rules evaluate on cached data
+        rules = DDVAVRules(self.filepath, cache=self.cache)
+        pd.testing.assert_frame_equal(
+            rules.data, read_csv(self.filepath, DDVAV_HEADERS, DDVAV_TYPES))
+
+        return None
+
+    def test_hit_is_memory_mapped(self):
+        """Numeric and datetime columns of a cached frame are memory-mapped,
+        not copied into memory"""
+        def memory_mapped(array) -> bool:
+            array = np.asarray(array)
+            while array is not None:
+                if isinstance(array, np.memmap):
+                    return True
+                array = array.base
+            return False
+
+        read_csv(self.filepath, DDVAV_HEADERS, DDVAV_TYPES, cache=self.cache)
+        cached = read_csv(self.filepath, DDVAV_HEADERS, DDVAV_TYPES,
+                          cache=self.cache)
+        for name in cached.columns:
+            if cached[name].dtype != object:
+                with self.subTest(name=name):
+                    self.assertTrue(memory_mapped(cached[name].to_numpy()))
+        self.assertTrue(all(memory_mapped(block.values)
+                            for block in cached._mgr.blocks
+                            if block.dtype != object))
+
+        return None
+
+    def test_hit_does_not_read(self):
+        """A cached file is not read again while it is unchanged"""
+        calls = []
+
+        def read():
+            calls.append(1)
+            return pd.read_csv(self.filepath, parse_dates=['DateTime'])
+
+        self.cache.load(self.filepath, {'parse_dates': ['DateTime']}, read)
+        self.cache.load(self.filepath, {'parse_dates': ['DateTime']}, read)
+        self.assertEqual(len(calls), 1)
+        # Different parsing options are a different entry
+        self.cache.load(self.filepath, {}, read)
+        self.assertEqual(len(calls), 2)
+
+        return None
+
+    def test_changed_file_is_invalidated(self):
+        """Changing the contents of a file changes its cache key"""
+        key = self.cache.key(self.filepath, {})
+        self.assertEqual(self.cache.key(self.filepath, {}), key)
+        data = pd.read_csv(self.filepath)
+        data.iloc[:10].to_csv(self.filepath, index=False)
+        self.assertNotEqual(self.cache.key(self.filepath, {}), key)
+        cached = self.cache.load(
+            self.filepath, {}, lambda: pd.read_csv(self.filepath))
+        self.assertEqual(cached.shape[0], 10)
+
+        return None
+
+    def test_eviction(self):
+        """Least recently used entries are removed beyond max_bytes"""
+        read = GraphAll(self.filepath).data
+        self.cache.load(self.filepath, {'option': 1}, lambda: read)
+        size = self.cache.entries()[0][1]
+        self.cache.max_bytes = int(size * 1.5)
+        self.cache.load(self.filepath, {'option': 2}, lambda: read)
+        entries = self.cache.entries()
+        self.assertEqual(len(entries), 1)
+        self.assertTrue(entries[0][2].endswith(
+            self.cache.key(self.filepath, {'option': 2})))
+        self.cache.clear()
+        self.assertEqual(len(self.cache.entries()), 0)
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
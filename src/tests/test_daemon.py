@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:05:48 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+import contextlib
+import tempfile
+import threading
+import shutil
+import json
+import io
+import os
+
+# Third party imports
+
+# Local imports
+from trendreview.daemon import (ReviewDaemon, JobError, parse_job,
+                                create_server, submit)
+
+# Relative to project src directory (not relative to __file__)
+FILEPATH = '../data/DD03.csv'
+
+# %%
+
+
+class TestDaemon(unittest.TestCase):
+    """Test file src/trendreview/daemon.py"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.daemon = ReviewDaemon()
+        cls.daemon.warm_up()
+        return None
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.daemon.close()
+        return None
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return None
+
+    def job(self, job_id, **options):
+        """JSON line of a job reviewing FILEPATH into its own directory"""
+        directory = os.path.join(self.directory, str(job_id))
+        os.makedirs(directory, exist_ok=True)
+        return json.dumps(dict({
+            'id': job_id, 'filepath': FILEPATH, 'type': 'ddvav',
+            'report_path': os.path.join(directory, 'report.txt')},
+            **options))
+
+    def test_parse_job(self):
+        """Jobs get default options, and jobs which are not valid raise
+        JobError"""
+        job = parse_job(self.job(1))
+        self.assertEqual(job['report_formats'], ['text'])
+        self.assertFalse(job['all_faults'])
+        for line in ['not json', '[1, 2]',
+                     json.dumps({'filepath': FILEPATH, 'type': 'ddvav'}),
+                     self.job(1, unknown=True), self.job(1, type='chiller'),
+                     self.job(1, report_formats=['xml'])]:
+            with self.subTest(line=line):
+                with self.assertRaises(JobError):
+                    parse_job(line)
+
+        return None
+
+    def test_serve(self):
+        """Each line is answered in order. Failed jobs do not stop later
+        jobs, and notices of rules are not written with the results"""
+        lines = [self.job(1, report_formats=['text', 'jsonl']),
+                 '\n',
+                 self.job(2, filepath='missing.csv'),
+                 'not json',
+                 self.job(3, all_faults=True)]
+        output = io.StringIO()
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.daemon.serve(lines, output.write)
+        results = [json.loads(line) for line in
+                   output.getvalue().splitlines()]
+
+        self.assertEqual([result['id'] for result in results],
+                         [1, 2, None, 3])
+        self.assertEqual([result['status'] for result in results],
+                         ['ok', 'error', 'error', 'ok'])
+        self.assertEqual(results[0]['issues'], 3)
+        self.assertGreater(results[3]['issues'], results[0]['issues'])
+        with open(results[0]['reports']['jsonl'], 'rt',
+                  encoding='UTF-8') as file:
+            self.assertEqual(len(file.readlines()), 3)
+        with open(results[0]['reports']['text'], 'rt',
+                  encoding='UTF-8') as file:
+            self.assertEqual(file.read().count('Issue #'), 3)
+
+        # Report files are emptied before a job, unless appended to
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.daemon.review(self.job(1))
+            self.daemon.review(self.job(1, append=True))
+        with open(results[0]['reports']['text'], 'rt',
+                  encoding='UTF-8') as file:
+            self.assertEqual(file.read().count('Issue #'), 6)
+
+        return None
+
+    def test_report_root(self):
+        """Jobs with reports outside of the report root fail before any
+        file is written"""
+        report_root = os.path.join(self.directory, '1')
+        daemon = ReviewDaemon(report_root=report_root)
+        outside = os.path.join(self.directory, 'outside.txt')
+        for report_path in [outside,
+                            os.path.join(report_root, '..', 'outside.txt')]:
+            with self.subTest(report_path=report_path):
+                result = daemon.review(self.job(1, report_path=report_path))
+                self.assertEqual(result['status'], 'error')
+                self.assertIn('JobError', result['error'])
+        self.assertFalse(os.path.exists(outside))
+        self.assertIsNone(daemon.figure_template)
+        daemon.check_report_path(os.path.join(report_root, 'report.txt'))
+
+        return None
+
+    @unittest.skipIf(not hasattr(__import__('socket'), 'AF_UNIX'),
+                     'Unix sockets are not supported')
+    def test_socket(self):
+        """Jobs sent to a socket are answered on the same connection"""
+        socket_path = os.path.join(self.directory, 'daemon.sock')
+        server = create_server(self.daemon, socket_path=socket_path)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            # The socket of a running daemon is not taken over
+            with self.assertRaises(OSError):
+                create_server(self.daemon, socket_path=socket_path)
+            with contextlib.redirect_stderr(io.StringIO()):
+                results = submit([json.loads(self.job(1)),
+                                  json.loads(self.job(2, type='sdvav'))],
+                                 socket_path=socket_path)
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        self.assertEqual([result['status'] for result in results],
+                         ['ok', 'error'])
+        self.assertEqual(results[0]['issues'], 3)
+
+        # The socket left by a stopped daemon is replaced
+        self.assertTrue(os.path.exists(socket_path))
+        create_server(self.daemon, socket_path=socket_path).server_close()
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,11 +8,28 @@ author: jvorsten
 # Python imports
 import unittest
 from typing import List
+import contextlib
+import csv
+import io
+import itertools
+import os
+import shutil
+import tempfile
 
 # Third party imports
+import pandas as pd
 
 # Local imports
 from scripts.data_cleaning_utilities import _fill_empty_line_with_previous_data
+from trendreview.data_cleaning_utilities import (
+    clean_csv, clean_frame, _is_line_empty, _is_line_primarily_numeric,
+    CLEANING_STEPS, FILTERS)
+from trendreview.ddvav import DDVAVRules, DDVAV_HEADERS, DDVAV_TYPES
+from trendreview.helpers import read_clean_csv
+
+# Relative to project src directory (not relative to __file__)
+FILEPATH = '../data/clean_csv_test.csv'
+DDVAV_FILEPATH = '../data/DD03.csv'
 
 
 # %%
@@ -69,5 +86,133 @@ class Test_data_cleaning_utilities(unittest.TestCase):
 
         return None
 
+
+class TestCleanCSV(unittest.TestCase):
+    """Test clean_csv in file src/trendreview/data_cleaning_utilities.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        # Repeat the test file so it is split into many byte ranges
+        with open(FILEPATH, 'rt', encoding='UTF-8') as file:
+            header, *lines = file.readlines()
+        self.input_filepath = os.path.join(self.directory, 'input.csv')
+        with open(self.input_filepath, 'wt', encoding='UTF-8') as file:
+            file.write(header)
+            for _ in range(50):
+                file.writelines(lines)
+
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return None
+
+    def _clean(self, **options) -> List[List[str]]:
+        output_filepath = os.path.join(self.directory, 'output.csv')
+        clean_csv(self.input_filepath, output_filepath, **options)
+        with open(output_filepath, 'rt', encoding='UTF-8', newline='') as file:
+            return list(csv.reader(file))
+
+    def test_filters_in_one_pass(self):
+        """Every filter is applied to each line, and each kept line is
+        written once"""
+        with open(self.input_filepath, 'rt', encoding='UTF-8',
+                  newline='') as file:
+            header, *lines = list(csv.reader(file))
+        expected = [header] + [
+            line for line in lines
+            if not _is_line_empty(line) and _is_line_primarily_numeric(line)]
+        cleaned = self._clean(filters=['empty', 'alphabetic'])
+        self.assertEqual(cleaned, expected)
+
+        return None
+
+    def test_byte_ranges_match_one_range(self):
+        """Output of small byte ranges across worker processes, including
+        filling empty fields across ranges, matches one byte range"""
+        for filters in (['alphabetic'], ['empty'], []):
+            expected = self._clean(filters=filters, fill_empty=True)
+            for workers, chunk_bytes in ((1, 100), (2, 57), (3, 1)):
+                self.assertEqual(
+                    self._clean(filters=filters, fill_empty=True,
+                                workers=workers, chunk_bytes=chunk_bytes),
+                    expected, msg=str((filters, workers, chunk_bytes)))
+        filled = self._clean(filters=['empty'], fill_empty=True)
+        self.assertFalse(any('' in line for line in filled[1:]))
+
+        return None
+
+
+class TestCleanFrame(unittest.TestCase):
+    """Test clean_frame in file src/trendreview/data_cleaning_utilities.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return None
+
+    def test_clean_frame_matches_clean_csv(self):
+        """Every combination of steps removes and fills the same lines as
+        the line filters of clean_csv"""
+        text = pd.read_csv(FILEPATH, dtype=str, keep_default_na=False)
+        output_filepath = os.path.join(self.directory, 'output.csv')
+        filters = ['empty', 'any-empty', 'alphabetic', 'columns']
+        for n_filters in range(3):
+            for steps in itertools.combinations(filters, n_filters):
+                for fill_empty in (False, True):
+                    clean_csv(FILEPATH, output_filepath, filters=steps,
+                              fill_empty=fill_empty)
+                    with open(output_filepath, 'rt', encoding='UTF-8',
+                              newline='') as file:
+                        expected = list(csv.reader(file))[1:]
+                    cleaned = clean_frame(
+                        text, list(steps) + ['fill'] * fill_empty)
+                    self.assertEqual(cleaned.values.tolist(), expected,
+                                     msg=str((steps, fill_empty)))
+        with self.assertRaises(ValueError):
+            clean_frame(text, ['not a step'])
+        # Steps are listed without importing this module, see options
+        self.assertEqual(CLEANING_STEPS, list(FILTERS) + ['fill'])
+
+        return None
+
+    def test_clean_before_rules(self):
+        """Rules evaluated on a cleaned file see the same data as a clean
+        file"""
+        with open(DDVAV_FILEPATH, 'rt', encoding='UTF-8') as file:
+            lines = file.readlines()
+        n_headers = lines[0].count(',') + 1
+        junk = [',' * (n_headers - 1) + '\n',
+                ',,,- 1 -' + ',' * (n_headers - 4) + '\n']
+        dirty_filepath = os.path.join(self.directory, 'dirty.csv')
+        with open(dirty_filepath, 'wt', encoding='UTF-8') as file:
+            file.writelines(lines[:100] + junk + lines[100:])
+
+        # Unused columns are printed, and test_parser closes sys.stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = DDVAVRules(DDVAV_FILEPATH).data
+            cleaned = DDVAVRules(dirty_filepath, chunksize=1000,
+                                 clean=['empty', 'columns']).data
+        pd.testing.assert_frame_equal(cleaned, expected)
+
+        return None
+
+    def test_clean_removes_every_row(self):
+        """Cleaning which removes every row raises ValueError, instead of
+        evaluating rules on no data"""
+        # Text fields (DateTime, HeatCoolMode) make every line alphabetic
+        with self.assertRaisesRegex(ValueError, 'removed all'):
+            read_clean_csv(DDVAV_FILEPATH, ['alphabetic'], DDVAV_HEADERS,
+                           DDVAV_TYPES)
+        with self.assertRaisesRegex(ValueError, 'removed all'), \
+                contextlib.redirect_stdout(io.StringIO()):
+            DDVAVRules(DDVAV_FILEPATH, clean=['empty', 'alphabetic', 'fill'])
+
+        return None
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
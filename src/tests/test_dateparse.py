@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 12:26:51 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+import warnings
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from trendreview.dateparse import (sniff_datetime_format, parse_datetimes,
+                                   combine_date_time, parse_date_columns,
+                                   EXCEL_FORMAT, DatetimeFormatWarning)
+from trendreview.GraphAll import GraphAll
+
+# Relative to project src directory (not relative to __file__)
+FILEPATH = '../data/DD03.csv'
+
+# %%
+
+
+class TestDateParse(unittest.TestCase):
+    """Test file src/trendreview/dateparse.py"""
+
+    def test_sniff_datetime_format(self):
+        """The first matching candidate format is returned"""
+        self.assertEqual(sniff_datetime_format(['2021-11-19T00:05']),
+                         '%Y-%m-%dT%H:%M')
+        self.assertEqual(sniff_datetime_format([None, '11/19/2021 0:05']),
+                         '%m/%d/%Y %H:%M')
+        self.assertEqual(sniff_datetime_format(['11/19/2021 1:05 PM']),
+                         '%m/%d/%Y %I:%M %p')
+        self.assertEqual(sniff_datetime_format(['19/11/2021 13:05']),
+                         '%d/%m/%Y %H:%M')
+        self.assertEqual(sniff_datetime_format(['44519'], [EXCEL_FORMAT]),
+                         EXCEL_FORMAT)
+        self.assertIsNone(sniff_datetime_format(['COOL']))
+        self.assertIsNone(sniff_datetime_format([]))
+
+        return None
+
+    def test_parse_datetimes_matches_pandas(self):
+        """Parsed datetimes equal pandas inference, including missing values
+        and values of a different format"""
+        values = pd.Series(['2021-11-19T00:00', None, '2021-11-19T00:10',
+                            '11/19/2021 13:15'])
+        expected = np.array(['2021-11-19T00:00', 'NaT', '2021-11-19T00:10',
+                             '2021-11-19T13:15'], dtype='datetime64[ns]')
+        np.testing.assert_array_equal(parse_datetimes(values), expected)
+
+        data = pd.read_csv(FILEPATH, dtype=str)
+        np.testing.assert_array_equal(parse_datetimes(data['DateTime']),
+                                      pd.to_datetime(data['DateTime']))
+
+        return None
+
+    def test_combine_date_time(self):
+        """Separate Date and Time columns equal the DateTime column"""
+        data = pd.read_csv(FILEPATH, dtype=str)
+        np.testing.assert_array_equal(
+            combine_date_time(data['Date'], data['Time']),
+            pd.to_datetime(data['DateTime']).to_numpy())
+        combined = combine_date_time(['44519', '11/20/2021', None],
+                                     ['0:00', '1:05 PM', '1:00'])
+        np.testing.assert_array_equal(combined, np.array(
+            ['2021-11-19T00:00', '2021-11-20T13:05', 'NaT'],
+            dtype='datetime64[ns]'))
+
+        # GraphAll combines Date and Time when there is no DateTime column
+        graphall = GraphAll(FILEPATH, parse_dates='Timestamp')
+        np.testing.assert_array_equal(
+            graphall.data['Timestamp'].to_numpy(),
+            graphall.data['DateTime'].to_numpy(dtype='datetime64[ns]'))
+
+        return None
+
+    def test_parse_date_columns(self):
+        """Formats sniffed from one chunk are reused, and columns which can
+        not be parsed are unchanged"""
+        chunk = pd.DataFrame({'DateTime': ['2021-11-19T00:00'],
+                              'HeatCoolMode': ['COOL']})
+        formats = parse_date_columns(chunk, ['DateTime', 'HeatCoolMode'])
+        self.assertEqual(formats['DateTime'], '%Y-%m-%dT%H:%M')
+        self.assertEqual(chunk['DateTime'].dtype.kind, 'M')
+        self.assertEqual(chunk['HeatCoolMode'].tolist(), ['COOL'])
+
+        return None
+
+    def test_unparsed_values_warned(self):
+        """Values which match no format are NaT, and values of the other
+        day and month order are not parsed by its formats. Their rows are
+        given in a warning"""
+        with self.assertWarnsRegex(DatetimeFormatWarning,
+                                   r"'DateTime'.*are NaT \(rows 12\)"):
+            chunk = pd.DataFrame({'DateTime': ['01/02/2022 00:00',
+                                               '02/02/2022 00:00', '#N/A']},
+                                 index=[10, 11, 12])
+            formats = parse_date_columns(chunk, ['DateTime'])
+        self.assertEqual(formats['DateTime'], '%m/%d/%Y %H:%M')
+        np.testing.assert_array_equal(chunk['DateTime'].to_numpy(), np.array(
+            ['2022-01-02', '2022-02-02', 'NaT'], dtype='datetime64[ns]'))
+
+        with self.assertWarnsRegex(DatetimeFormatWarning,
+                                   r'month first format.*\(rows 5\)'):
+            parse_datetimes(['02/13/2022 00:00'] * 5 + ['14/03/2022 00:00'])
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DatetimeFormatWarning)
+            parse_datetimes(['02/13/2022 00:00', '2022-02-13 00:10'])
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -117,6 +117,31 @@ class TestDDVAV(unittest.TestCase):
 
         return None
 
+    def test_simultaneous_heating_cooling_messages(self):
+        """Messages of simultaneous heating and cooling are unchanged from
+        the report before rules were compiled"""
+        with self.assertRaises(FDDException) as context:
+            self.ddvavRules.rule_simultaneous_heating_cooling(self.data3)
+        self.assertEqual(
+            context.exception.message,
+            "The maximum allowed instances of simultaneous heating and " +
+            "cooling (82 at 2% of samples) was exceeded (844 observed)")
+
+        # A run of 4 samples, less than 2% of samples
+        airflow = np.zeros(300, dtype=np.float32)
+        airflow[100:104] = 500
+        data = pd.DataFrame({
+            'DateTime': pd.date_range('2022-01-01', periods=300, freq='5min'),
+            'HeatingAirVolume': airflow, 'CoolingAirVolume': airflow})
+        plan = DDVAVRules.plan.select(['rule_simultaneous_heating_cooling'])
+        faults = plan.rule_faults(data)['rule_simultaneous_heating_cooling']
+        self.assertEqual(
+            [fault.message for fault in faults],
+            ["The maximum allowed consecutive instances of heating and " +
+             "cooling (3) was exceeded (1 observed)"])
+
+        return None
+
     def test_rule_cooling_airflow_on_closed_damper(self):
         """See rule and documentation defined in ddvav.py"""
 
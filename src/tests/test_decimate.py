@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 23:41:02 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from trendreview.decimate import (minmax_indices, lttb_indices,
+                                  decimation_indices, decimate_data)
+from trendreview.FDDExceptions import FDDException
+
+# %%
+
+
+class TestDecimate(unittest.TestCase):
+    """Test file src/trendreview/decimate.py"""
+
+    def setUp(self):
+        n_samples = 100000
+        self.datetimes = pd.date_range('2021-01-01', periods=n_samples,
+                                       freq='1min').to_numpy()
+        self.values = np.sin(np.arange(n_samples) / 500.0)
+        self.values[777] = 25  # Spike
+        self.values[1000:1010] = np.nan
+
+        return None
+
+    def test_minmax_keeps_extremes(self):
+        """The minimum and maximum of every bucket are kept"""
+        indices = minmax_indices(self.values, 100)
+        self.assertLessEqual(indices.shape[0], 2 * 100 + 2)
+        self.assertIn(777, indices)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], self.values.shape[0] - 1)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        # Short trends are not decimated
+        np.testing.assert_array_equal(minmax_indices(np.arange(10.0), 100),
+                                      np.arange(10))
+
+        return None
+
+    def test_lttb_keeps_spike(self):
+        """LTTB keeps n_out samples including end points and spikes"""
+        x_values = self.datetimes.astype(np.int64).astype(float)
+        indices = lttb_indices(x_values, self.values, 500)
+        self.assertEqual(indices.shape[0], 500)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], self.values.shape[0] - 1)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertIn(777, indices)
+
+        return None
+
+    def test_decimate_data(self):
+        """Decimated data is a valid FDDException payload, every column
+        keeps the same samples, and the original data is unchanged"""
+        categories = np.where(self.values > 0, 'Heat', 'Cool')
+        data = {'DateTime': self.datetimes,
+                'RoomTemperature': self.values,
+                'HeatCoolMode': categories,
+                'primary_axis_label': 'DateTime',
+                'dependent_axis_labels': ['RoomTemperature', 'HeatCoolMode']}
+        for method in ('minmax', 'lttb'):
+            decimated = decimate_data(data, 640, method)
+            FDDException('message', decimated)
+            self.assertEqual(decimated['DateTime'].dtype.kind, 'M')
+            n_kept = decimated['DateTime'].shape[0]
+            self.assertLess(n_kept, 4 * 640 + 4)
+            for label in decimated['dependent_axis_labels']:
+                self.assertEqual(decimated[label].shape[0], n_kept)
+            self.assertEqual(data['DateTime'].shape[0], self.values.shape[0])
+
+        self.assertIs(decimate_data(data, None), data)
+        with self.assertRaises(ValueError):
+            decimation_indices(self.datetimes, [self.values], 640, 'mean')
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
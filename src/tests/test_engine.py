@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 12:20:41 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+import tempfile
+import shutil
+import os
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from trendreview.engine import (RulePlan, MaskRule, HourlyDeviationRule,
+                                evaluate_condition,
+                                both, greater, less, equal,
+                                abs_difference_greater)
+from trendreview.ddvav import (DDVAVRules, DDVAV_HEADERS, DDVAV_TYPES,
+                               DDVAV_RULES)
+from trendreview.helpers import (read_csv, read_csv_chunks,
+                                 maximum_allowed_failures,
+                                 maximum_consecutive_failures)
+from trendreview.FDDExceptions import FDDException
+from trendreview.reporting import FDDReporting
+
+# Relative to project src directory (not relative to __file__)
+FILEPATH3 = '../data/ddvav_test.csv'
+
+# %%
+
+
+class TestRulePlan(unittest.TestCase):
+    """Test file src/trendreview/engine.py"""
+
+    def setUp(self):
+        self.data3 = read_csv(FILEPATH3, DDVAV_HEADERS, DDVAV_TYPES)
+        return None
+
+    def test_evaluate_condition(self):
+        """Conditions evaluate to boolean arrays, and shared sub-conditions
+        are evaluated once"""
+        columns = {'a': np.array([0., 20., 20., 5.]),
+                   'b': np.array([0., 1., 9., 9.]),
+                   'mode': np.array(['HEAT', 'COOL', 'COOL', 'HEAT'],
+                                    dtype=object)}
+        cache = {}
+        res = evaluate_condition(
+            both(greater('a', 10), equal('mode', 'COOL')), columns, cache)
+        np.testing.assert_array_equal(res, [False, True, True, False])
+        self.assertIn(greater('a', 10), cache)
+        self.assertIs(evaluate_condition(greater('a', 10), columns, cache),
+                      cache[greater('a', 10)])
+
+        res = evaluate_condition(less('b', 2), columns)
+        np.testing.assert_array_equal(res, [True, True, False, False])
+        res = evaluate_condition(abs_difference_greater('a', 'b', 5), columns)
+        np.testing.assert_array_equal(res, [False, True, True, False])
+
+        return None
+
+    def test_plan_matches_individual_rules(self):
+        """A fused plan reports the same faults as checking each rule mask
+        individually"""
+        exceptions = RulePlan(DDVAV_RULES).evaluate(self.data3)
+
+        for rule in filter(lambda rule: isinstance(rule, MaskRule),
+                           DDVAV_RULES):
+            mask = np.ma.array(evaluate_condition(
+                rule.condition, RulePlan([rule]).to_numpy(self.data3)))
+            expected = None
+            try:
+                maximum_allowed_failures(
+                    mask, self.data3, rule.failure_percent,
+                    rule.report_columns, rule.error_msg)
+                maximum_consecutive_failures(
+                    mask, self.data3, rule.failure_consecutive,
+                    rule.report_columns, rule.error_msg)
+            except FDDException as exception:
+                expected = exception
+
+            if expected is None:
+                self.assertIsNone(exceptions[rule.name])
+            else:
+                # Rules with their own messages are tested in test_ddvav
+                if rule.percent_msg is None and rule.consecutive_msg is None:
+                    self.assertEqual(exceptions[rule.name].message,
+                                     expected.message)
+                self.assertEqual(exceptions[rule.name].data.keys(),
+                                 expected.data.keys())
+                for key, values in expected.data.items():
+                    np.testing.assert_array_equal(
+                        exceptions[rule.name].data[key], values)
+
+        return None
+
+    def test_select(self):
+        """Selected plans contain only the named rules and are cached"""
+        plan = DDVAVRules.plan
+        selection = plan.select(['rule_cooling_damper_stuck', 'not_a_rule'])
+        self.assertEqual(selection.names, ['rule_cooling_damper_stuck'])
+        self.assertIs(selection, plan.select(['rule_cooling_damper_stuck']))
+        self.assertEqual(selection.columns,
+                         ['CoolingDamperCommand', 'CoolingDamperPosition'])
+
+        return None
+
+    def test_batched_consecutive_check(self):
+        """Runs on one rule's mask do not continue onto the next rule"""
+        data = pd.DataFrame({
+            'DateTime': pd.date_range('2021-11-19', periods=6, freq='5min'),
+            'a': [0., 0., 0., 0., 20., 20.],
+            'b': [20., 20., 0., 0., 0., 0.]})
+        rules = [
+            MaskRule('rule_a', greater('a', 10), ['DateTime', 'a'], 'a',
+                     failure_percent=1, failure_consecutive=3),
+            MaskRule('rule_b', greater('b', 10), ['DateTime', 'b'], 'b',
+                     failure_percent=1, failure_consecutive=3)]
+        exceptions = RulePlan(rules).evaluate(data)
+        self.assertIsNone(exceptions['rule_a'])
+        self.assertIsNone(exceptions['rule_b'])
+
+        rules[1].failure_consecutive = 2
+        exceptions = RulePlan(rules).evaluate(data)
+        self.assertIsNone(exceptions['rule_a'])
+        self.assertIsInstance(exceptions['rule_b'], FDDException)
+
+        return None
+
+
+    def test_collect_faults(self):
+        """Every episode of a rule is collected, and percent and consecutive
+        faults are both reported"""
+        data = pd.DataFrame({
+            'DateTime': pd.date_range('2021-11-19', periods=12, freq='5min'),
+            'a': [20., 20., 20., 0., 0., 20., 20., 20., 20., 0., 20., 0.]})
+        rule = MaskRule('rule_a', greater('a', 10), ['DateTime', 'a'], 'a',
+                        failure_percent=0.5, failure_consecutive=3)
+        faults = RulePlan([rule]).collect_faults(data)
+        self.assertEqual([fault.kind for fault in faults],
+                         ['percent', 'consecutive'])
+        percent, consecutive = faults
+        self.assertEqual(percent.count, 8)
+        self.assertEqual(percent.limit, 6)
+        self.assertEqual(percent.ranges.tolist(), [[0, 3], [5, 9], [10, 11]])
+        self.assertEqual(consecutive.count, 2)
+        self.assertEqual(consecutive.ranges.tolist(), [[0, 3], [5, 9]])
+        self.assertEqual(consecutive.severity, 4 / 3)
+
+        # The legacy exception is the first fault of the rule
+        exception = RulePlan([rule]).evaluate(data)['rule_a']
+        self.assertEqual(exception.message, percent.message)
+
+        return None
+
+    def test_deviation_faults(self):
+        """Every hour exceeding the deviation threshold is collected"""
+        data = pd.DataFrame({
+            'DateTime': pd.date_range('2021-11-19', periods=48, freq='15min'),
+            'ControlSetpoint': 70.,
+            'RoomTemperature': 70.})
+        data.loc[8:11, 'RoomTemperature'] = 66.
+        data.loc[40:43, 'RoomTemperature'] = 75.
+        rule = HourlyDeviationRule(
+            'rule_deviation', 'ControlSetpoint', 'RoomTemperature',
+            ['DateTime', 'ControlSetpoint', 'RoomTemperature'],
+            '{:.2f} deviation; threshold={}', failure_threshold=1)
+        faults = RulePlan([rule]).collect_faults(data)
+        self.assertEqual(len(faults), 1)
+        self.assertEqual(faults[0].kind, 'threshold')
+        self.assertEqual(faults[0].ranges.tolist(), [[8, 12], [40, 44]])
+        np.testing.assert_allclose(faults[0].values, [3., -3.75])
+        self.assertTrue(faults[0].message.startswith('3.00 deviation'))
+        self.assertEqual(faults[0].to_dict()['count'], 2)
+
+        return None
+
+    def test_ddvav_collect_faults(self):
+        """Collected faults include the first fault of every rule which
+        raises an exception"""
+        ddvavRules = DDVAVRules(FILEPATH3)
+        methods = ddvavRules.get_rules()
+        faults = ddvavRules.collect_faults(methods)
+        first_faults = {}
+        for fault in faults:
+            first_faults.setdefault(fault.rule, fault)
+        for method in methods:
+            try:
+                method(ddvavRules.data)
+                self.assertNotIn(method.__name__, first_faults)
+            except FDDException as exception:
+                self.assertEqual(first_faults[method.__name__].message,
+                                 exception.message)
+
+        return None
+
+
+
+class TestPlanState(unittest.TestCase):
+    """Streaming evaluation of a RulePlan over chunks of a trend"""
+
+    def assertFaultsEqual(self, expected, faults):
+        self.assertEqual(list(expected.keys()), list(faults.keys()))
+        for name in expected:
+            self.assertEqual(len(expected[name]), len(faults[name]), name)
+            for fault_a, fault_b in zip(expected[name], faults[name]):
+                self.assertEqual(fault_a.kind, fault_b.kind)
+                self.assertEqual(fault_a.message, fault_b.message)
+                self.assertEqual(fault_a.count, fault_b.count)
+                np.testing.assert_array_equal(fault_a.ranges, fault_b.ranges)
+                np.testing.assert_array_equal(fault_a.values, fault_b.values)
+                np.testing.assert_array_equal(fault_a.report_indices,
+                                              fault_b.report_indices)
+        return None
+
+    def test_stream_matches_full_load(self):
+        """Runs and hours which span chunk boundaries are joined, so
+        streamed faults equal faults of the whole trend for any chunk size"""
+        plan = DDVAVRules.plan
+        expected = plan.rule_faults(read_csv(FILEPATH3, DDVAV_HEADERS,
+                                             DDVAV_TYPES))
+        for chunksize in (13, 97, 1000, 100000):
+            state = plan.stream()
+            for chunk in read_csv_chunks(FILEPATH3, DDVAV_HEADERS,
+                                         DDVAV_TYPES, chunksize):
+                state.update(plan.to_numpy(chunk))
+            self.assertEqual(state.n_samples, 4147)
+            self.assertFaultsEqual(expected, state.rule_faults())
+
+        return None
+
+    def test_rule_faults_during_stream(self):
+        """Faults may be requested between chunks without changing state"""
+        data = pd.DataFrame({
+            'DateTime': pd.date_range('2021-11-19', periods=8, freq='5min'),
+            'a': [0., 20., 20., 20., 20., 0., 20., 20.]})
+        plan = RulePlan([MaskRule('rule_a', greater('a', 10),
+                                  ['DateTime', 'a'], 'a',
+                                  failure_percent=1, failure_consecutive=3)])
+        state = plan.stream()
+        state.update(plan.to_numpy(data.iloc[:3]))
+        self.assertEqual(state.rule_faults(), {'rule_a': []})
+        state.update(plan.to_numpy(data.iloc[3:]))
+        faults = state.rule_faults()['rule_a']
+        self.assertEqual(faults[0].ranges.tolist(), [[1, 5]])
+        self.assertFaultsEqual(plan.rule_faults(data), state.rule_faults())
+
+        return None
+
+    def test_ddvav_chunksize_report(self):
+        """A report of a streamed file is identical to a full load"""
+        directory = tempfile.mkdtemp()
+        try:
+            reports = []
+            for chunksize in (None, 500):
+                os.makedirs(os.path.join(directory, str(chunksize)))
+                log_filepath = os.path.join(directory, str(chunksize),
+                                            'report.txt')
+                reporter = FDDReporting(log_filepath)
+                ddvavRules = DDVAVRules(FILEPATH3, chunksize=chunksize)
+                self.assertEqual(ddvavRules.data is None,
+                                 chunksize is not None)
+                methods = ddvavRules.get_rules()
+                ddvavRules.evaluate_rules(methods, reporter)
+                faults = ddvavRules.collect_faults(methods)
+                data = ddvavRules.report_data(faults)
+                for fault in faults:
+                    reporter.log_fault(fault, data, create_image=False)
+                reporter.close()
+                with open(log_filepath, 'rt', encoding='UTF-8') as file:
+                    reports.append(file.read())
+            self.assertEqual(reports[0], reports[1])
+        finally:
+            shutil.rmtree(directory)
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 19:40:12 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+import subprocess
+import tempfile
+import shutil
+import contextlib
+import json
+import sys
+import io
+import os
+
+# Third party imports
+
+# Local imports
+from trendreview import equipment
+from trendreview.equipment import (register_equipment, equipment_class,
+                                   equipment_types, rule_names)
+from trendreview.reporting import FDDReporting
+from trendreview.trendreview import parser, review_file
+from benchmarks.synthetic import FAULTS, expected_rules, write_trend
+
+# %%
+
+
+class TestEquipment(unittest.TestCase):
+    """Test file src/trendreview/equipment.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        equipment._registry.pop('test_equipment', None)
+        return None
+
+    def test_builtin_types(self):
+        """Built-in equipment types are registered and reachable from the
+        command line"""
+        self.assertIn('ddvav', equipment_types())
+        self.assertIn('sdvav', equipment_types())
+        self.assertEqual(equipment_class('sdvav').__name__, 'SDVAVRules')
+        namespace = parser.parse_args(
+            ['--filepath', 'trend.csv', '--type', 'sdvav',
+             '--report-path', '-'])
+        self.assertEqual(namespace.type, 'sdvav')
+        with self.assertRaises(ValueError):
+            equipment_class('chiller')
+
+        return None
+
+    def test_rules_imported_when_used(self):
+        """Rule modules are not imported with the command line"""
+        code = ('import sys, trendreview.trendreview; ' +
+                'print(sorted(name for name in sys.modules ' +
+                'if name in ("trendreview.ddvav", "trendreview.sdvav")))')
+        output = subprocess.run([sys.executable, '-c', code],
+                                capture_output=True, text=True, check=True,
+                                cwd=os.getcwd()).stdout
+        self.assertEqual(output.strip(), '[]')
+
+        return None
+
+    def test_register_equipment(self):
+        """Decorated classes are registered and their rule methods are found
+        once"""
+        @register_equipment('test_equipment')
+        class TestRules:
+            def rule_b(self, data):
+                return None
+
+            @classmethod
+            def rule_a(cls, data):
+                return None
+
+            rule_limit = 5
+
+            def helper(self):
+                return None
+
+        self.assertIs(equipment_class('test_equipment'), TestRules)
+        self.assertEqual(TestRules._rule_names, ('rule_a', 'rule_b'))
+        self.assertEqual(rule_names(TestRules), ('rule_a', 'rule_b'))
+
+        return None
+
+    def test_review_sdvav(self):
+        """Single-duct terminal units are reviewed like dual-duct units"""
+        filepath = write_trend(os.path.join(self.directory, 'trend.csv'),
+                               'sdvav', 2000, list(FAULTS['sdvav']))
+        reporter = FDDReporting(os.path.join(self.directory, 'report.txt'),
+                                report_formats=['jsonl'])
+        try:
+            review_file(filepath, 'sdvav', reporter, all_faults=True)
+        finally:
+            reporter.close()
+        with open(os.path.join(self.directory, 'report_issues.jsonl'), 'rt',
+                  encoding='UTF-8') as file:
+            rules = {json.loads(line)['rule'] for line in file}
+        self.assertEqual(rules,
+                         set(expected_rules('sdvav', FAULTS['sdvav'])))
+
+        return None
+
+    def test_wrong_equipment_file(self):
+        """A file of other equipment is rejected with the missing headers,
+        from the registry and the command line"""
+        filepath = write_trend(os.path.join(self.directory, 'trend.csv'),
+                               'ddvav', 100, [])
+        with self.assertRaisesRegex(ValueError, 'Missing headers'), \
+                contextlib.redirect_stdout(io.StringIO()):
+            equipment_class('sdvav')(filepath)
+
+        output = subprocess.run(
+            [sys.executable, '-m', 'trendreview.trendreview',
+             '--filepath', filepath, '--type', 'sdvav', '--report-path',
+             os.path.join(self.directory, 'report.txt')],
+            capture_output=True, text=True, cwd=os.getcwd())
+        self.assertNotEqual(output.returncode, 0)
+        self.assertIn('Missing headers', output.stderr)
+        self.assertNotIn('Usecols', output.stderr)
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,7 +14,14 @@ import numpy as np
 import pandas as pd
 
 # Local imports
-from trendreview.helpers import read_csv, _correct_time_str_HM, _parse_date_time_str_YmdHM
+from trendreview.helpers import (read_csv, _correct_time_str_HM, _parse_date_time_str_YmdHM,
+                                 masked_rolling_sum, rolling_count, rolling_count_time,
+                                 maximum_windowed_failures,
+                                 _datetimes_to_seconds_deviation_from_start,
+                                 _hour_segment_indices_from_seconds,
+                                 hourly_integrals, hourly_deviation,
+                                 report_data_view)
+from trendreview.FDDExceptions import FDDException
 from trendreview.ddvav import DDVAV_HEADERS, DDVAV_TYPES
 
 # Read file into pandas dataframe
@@ -41,5 +48,145 @@ class TestNumpyDateTimeIterables(unittest.TestCase):
         return None
 
 
+class TestRollingCount(unittest.TestCase):
+    """Sliding window counts of failed test conditions"""
+
+    def test_rolling_count(self):
+        """Count of True elements within each sample-count window"""
+        data = np.ma.MaskedArray([1, 1, 0, 1, 1, 1])
+        np.testing.assert_array_equal(rolling_count(data, 3), [2, 2, 2, 3])
+        np.testing.assert_array_equal(rolling_count(data, 6), [5])
+        self.assertEqual(rolling_count(data, 7).shape[0], 0)
+
+        return None
+
+    def test_masked_rolling_sum(self):
+        """Window start indices where every element is True, including the
+        last window in the array"""
+        data = np.ma.MaskedArray([0, 1, 1, 1, 0, 1, 1, 1])
+        res = masked_rolling_sum(data, 3)
+        np.testing.assert_array_equal(res[0], [1, 5])
+
+        return None
+
+    def test_rolling_count_time(self):
+        """Count of True elements within a fixed duration window. Samples
+        are irregularly spaced"""
+        data = np.array([1, 1, 0, 1, 1, 0])
+        datetimes = pd.to_datetime(['2021-11-19T00:00', '2021-11-19T00:05',
+                                    '2021-11-19T00:10', '2021-11-19T00:30',
+                                    '2021-11-19T00:31', '2021-11-19T01:00'])
+        counts = rolling_count_time(data, datetimes, '15min')
+        np.testing.assert_array_equal(counts, [2, 1, 0, 2, 1, 0])
+
+        return None
+
+    def test_maximum_windowed_failures(self):
+        """Raise when too many failures occur inside a time window"""
+        data = pd.DataFrame({
+            'DateTime': pd.date_range('2021-11-19', periods=6, freq='5min'),
+            'Value': [0, 1, 0, 1, 0, 1]})
+        mask = np.ma.array(data['Value'] > 0)
+        # 2 failures within every 15 minutes of data
+        maximum_windowed_failures(mask, data, 3, '15min',
+                                  ['DateTime', 'Value'], 'Test')
+        with self.assertRaises(FDDException):
+            maximum_windowed_failures(mask, data, 2, '15min',
+                                      ['DateTime', 'Value'], 'Test')
+        with self.assertRaises(FDDException):
+            maximum_windowed_failures(mask, data, 2, 3,
+                                      ['DateTime', 'Value'], 'Test')
+
+        return None
+
+
+class TestHourlySegments(unittest.TestCase):
+    """Hour segmentation and integration of trended data"""
+
+    def test_seconds_deviation_past_one_day(self):
+        """Seconds from start must not wrap after 24 hours"""
+        datetimes = pd.to_datetime(['2021-11-19T00:00', '2021-11-20T00:05',
+                                    '2021-11-22T00:00'])
+        seconds = _datetimes_to_seconds_deviation_from_start(datetimes)
+        np.testing.assert_array_equal(seconds, [0, 86700, 259200])
+
+        return None
+
+    def test_hour_segment_indices(self):
+        """Indices are grouped into hour windows from the first element"""
+        seconds = [0, 900, 2700, 4500, 8100]
+        res = _hour_segment_indices_from_seconds(seconds)
+        self.assertEqual(res, [[0, 1, 2], [3], [4]])
+
+        return None
+
+    def test_hourly_integrals_match_trapezoid(self):
+        """Integral of each hour segment equals a trapezoid integration of
+        that segment alone"""
+        rng = np.random.default_rng(3)
+        seconds = np.cumsum(rng.integers(60, 900, 400)).astype(float)
+        values = rng.normal(0, 2, 400)
+        starts, ends, integrals = hourly_integrals(seconds, values)
+        segments = _hour_segment_indices_from_seconds(seconds)
+        self.assertEqual(len(segments), starts.shape[0])
+        for segment, integral, start, end in zip(segments, integrals, starts, ends):
+            self.assertEqual(segment, list(range(start, end)))
+            expected = np.sum((values[segment][1:] + values[segment][:-1]) *
+                              np.diff(seconds[segment]) / 2) / 3600
+            self.assertAlmostEqual(integral, expected)
+
+        return None
+
+    def test_hourly_deviation(self):
+        """Constant 2 degree deviation over an hour is 2 degree * hours on
+        every day of the trend"""
+        datetimes = pd.date_range('2021-11-19', periods=3 * 24 * 12 + 1,
+                                  freq='5min')
+        setpoint = np.full(datetimes.shape[0], 70.0)
+        process = setpoint - 2
+        _, _, deviation = hourly_deviation(datetimes, setpoint, process)
+        self.assertEqual(deviation.shape[0], 3 * 24 + 1)
+        # 11 intervals of 5 minutes within each hour segment
+        np.testing.assert_allclose(deviation[:-1], 2 * 55 / 60)
+        self.assertEqual(deviation[-1], 0)
+
+        return None
+
+
+class TestReportDataView(unittest.TestCase):
+    """Data passed to FDDException for plotting"""
+
+    def setUp(self):
+        self.data = pd.DataFrame({
+            'DateTime': pd.date_range('2021-11-19', periods=10, freq='5min'),
+            'RoomTemperature': np.arange(10, dtype=float)})
+        return None
+
+    def test_consecutive_indices_are_views(self):
+        """Consecutive rows are numpy views, datetimes stay datetime64"""
+        view = report_data_view(self.data, np.arange(2, 6),
+                                ['DateTime', 'RoomTemperature'])
+        self.assertEqual(view['primary_axis_label'], 'DateTime')
+        self.assertEqual(view['dependent_axis_labels'], ['RoomTemperature'])
+        self.assertEqual(view['DateTime'].dtype.kind, 'M')
+        np.testing.assert_array_equal(view['RoomTemperature'], [2, 3, 4, 5])
+        self.assertTrue(np.shares_memory(
+            view['RoomTemperature'], self.data['RoomTemperature'].to_numpy()))
+        FDDException('message', view)
+
+        return None
+
+    def test_index_labels(self):
+        """Report indices are index labels, like DataFrame.loc"""
+        data = self.data.set_index(self.data.index + 100)
+        view = report_data_view(data, [101, 103, 104],
+                                ['DateTime', 'RoomTemperature'])
+        np.testing.assert_array_equal(view['RoomTemperature'], [1, 3, 4])
+        with self.assertRaises(KeyError):
+            report_data_view(data, [1], ['DateTime', 'RoomTemperature'])
+
+        return None
+
+
 if __name__ == '__main__':
     unittest.main()
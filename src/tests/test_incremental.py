@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 12:20:31 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+import tempfile
+import shutil
+import os
+
+# Third party imports
+import numpy as np
+
+# Local imports
+from trendreview.ddvav import DDVAVRules
+from trendreview.engine import PlanState
+from trendreview.incremental import (CheckpointStore, last_line_end,
+                                     read_csv_range)
+from trendreview.profiling import Profiler
+from benchmarks.synthetic import FAULTS, generate_trend, write_trend
+
+# %%
+
+
+class TestIncremental(unittest.TestCase):
+    """Test file src/trendreview/incremental.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.checkpoints = CheckpointStore(
+            os.path.join(self.directory, 'checkpoints'))
+        full_filepath = write_trend(
+            os.path.join(self.directory, 'full.csv'), 'ddvav', 3000,
+            list(FAULTS['ddvav']))
+        with open(full_filepath, 'rb') as file:
+            self.lines = file.readlines()
+        self.expected = DDVAVRules(full_filepath).collect_faults()
+        self.filepath = os.path.join(self.directory, 'trend.csv')
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return None
+
+    def write(self, data: bytes, mode: str = 'ab'):
+        with open(self.filepath, mode) as file:
+            file.write(data)
+        return None
+
+    def review(self):
+        """Faults of self.filepath reviewed with checkpoints, and the number
+        of rows parsed"""
+        with Profiler() as profiler:
+            faults = DDVAVRules(self.filepath, chunksize=256,
+                                checkpoints=self.checkpoints
+                                ).collect_faults()
+        rows = sum(total['rows'] or 0 for total in profiler.totals()
+                   if total['name'] == 'read_csv_range')
+        return faults, rows
+
+    def assertFaultsEqual(self, faults, expected):
+        self.assertEqual([(fault.rule, fault.kind, fault.count)
+                          for fault in faults],
+                         [(fault.rule, fault.kind, fault.count)
+                          for fault in expected])
+        for fault, other in zip(faults, expected):
+            np.testing.assert_array_equal(fault.ranges, other.ranges)
+            np.testing.assert_allclose(fault.values, other.values)
+            self.assertAlmostEqual(fault.severity, other.severity)
+        return None
+
+    def test_plan_state_round_trip(self):
+        """A plan state restored from its arrays continues like the state it
+        was saved from"""
+        data = generate_trend('ddvav', 2000, list(FAULTS['ddvav']))
+        plan = DDVAVRules.plan
+        state = plan.stream()
+        state.update(plan.to_numpy(data.iloc[:1001]))
+        restored = PlanState.from_arrays(plan, state.to_arrays())
+        for each in (state, restored):
+            each.update(plan.to_numpy(data.iloc[1001:]))
+        faults, expected = restored.rule_faults(), state.rule_faults()
+
+        self.assertEqual(list(faults), list(expected))
+        for name in expected:
+            self.assertFaultsEqual(faults[name], expected[name])
+
+        return None
+
+    def test_append(self):
+        """Rows appended to a file are parsed once, and faults equal those of
+        reviewing the whole file. A last line without a line break is
+        reviewed when it has every field"""
+        self.write(b''.join(self.lines[:1000]), 'wb')
+        faults, rows = self.review()
+        self.assertEqual(rows, 999)
+
+        # Part of a line is still being written
+        partial = self.lines[1700][:10]
+        self.write(b''.join(self.lines[1000:1700]) + partial)
+        faults, rows = self.review()
+        self.assertEqual(rows, 700)
+
+        # The last line is complete, without a line break
+        self.write(self.lines[1700][10:] + b''.join(self.lines[1701:])[:-1])
+        faults, rows = self.review()
+        self.assertEqual(rows, len(self.lines) - 1700)
+        self.assertFaultsEqual(faults, self.expected)
+        self.assertGreater(len(faults), 0)
+
+        self.write(b'\n')
+        faults, rows = self.review()
+        self.assertEqual(rows, 1)
+        self.assertFaultsEqual(faults, self.expected)
+
+        # Nothing was appended
+        faults, rows = self.review()
+        self.assertEqual(rows, 0)
+        self.assertFaultsEqual(faults, self.expected)
+
+        return None
+
+    def test_changed_file(self):
+        """A file which was changed, not only appended to, is reviewed again
+        from its first row"""
+        self.write(b''.join(self.lines[:1000]), 'wb')
+        self.review()
+        self.write(b''.join(self.lines[:500] + self.lines[501:]), 'wb')
+        faults, rows = self.review()
+        self.assertEqual(rows, len(self.lines) - 2)
+        self.assertTrue(os.path.isfile(
+            self.checkpoints.checkpoint_filepath(self.filepath)))
+
+        return None
+
+    def test_read_csv_range(self):
+        """Rows of a range of bytes are numbered from first_row"""
+        self.write(b''.join(self.lines), 'wb')
+        start = sum(len(line) for line in self.lines[:11])
+        stop = start + sum(len(line) for line in self.lines[11:21])
+        formats = {}
+        chunks = list(read_csv_range(self.filepath, ['DateTime', 'HeatCoolMode'],
+                                     {'HeatCoolMode': str}, start, stop, 10, 4,
+                                     formats))
+        self.assertEqual([chunk.shape[0] for chunk in chunks], [4, 4, 2])
+        self.assertEqual(list(chunks[0].index), [10, 11, 12, 13])
+        self.assertEqual(str(chunks[0]['DateTime'].dtype), 'datetime64[ns]')
+        self.assertEqual(last_line_end(self.filepath),
+                         os.path.getsize(self.filepath))
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
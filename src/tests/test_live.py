@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:10:37 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+import contextlib
+import asyncio
+import time
+import json
+import io
+
+# Third party imports
+import numpy as np
+
+# Local imports
+from trendreview.engine import MaskRule, RulePlan, greater
+from trendreview.ddvav import DDVAVRules, DDVAV_TYPES
+from trendreview.live import (LiveState, Sample, live_faults, replay_trends,
+                              replay_files)
+from benchmarks.synthetic import FAULTS, generate_trend
+
+# Relative to project src directory (not relative to __file__)
+FILEPATH = '../data/DD03.csv'
+PLAN = RulePlan([MaskRule('rule_positive', greater('a', 0), ['DateTime', 'a'],
+                          'a is positive', failure_percent=0.2,
+                          failure_consecutive=2)])
+
+# %%
+
+
+def collect(events) -> list:
+    """Read every event of the async iterator events"""
+    async def read():
+        return [event async for event in events]
+
+    return asyncio.run(read())
+
+
+class TestLive(unittest.TestCase):
+    """Test file src/trendreview/live.py"""
+
+    def test_consecutive_matches_file_review(self):
+        """Consecutive events are raised on the samples where the faults of
+        reviewing the trend as a file reach failure_consecutive, also when a
+        batch holds several samples of a unit"""
+        data = generate_trend('ddvav', 2000, list(FAULTS['ddvav']))
+        expected = sorted(
+            (fault.rule, int(start) + fault.limit - 1)
+            for faults in DDVAVRules.plan.rule_faults(data).values()
+            for fault in faults if fault.kind == 'consecutive'
+            for start in fault.ranges[:, 0])
+        state = LiveState(DDVAVRules.plan, dtypes=DDVAV_TYPES)
+        records = data.to_dict('records')
+        events = []
+        for start in range(0, len(records), 300):
+            events.extend(state.update(
+                [Sample(unit, record['DateTime'], record)
+                 for record in records[start:start + 300]
+                 for unit in ('a', 'b')]))
+
+        for unit in ('a', 'b'):
+            failed = sorted((event.rule, event.sample) for event in events
+                            if event.unit == unit and
+                            event.kind == 'consecutive' and
+                            event.status == 'failed')
+            self.assertEqual(failed, expected)
+        self.assertGreater(len(expected), 0)
+
+        return None
+
+    def test_percent_window(self):
+        """Percent events count failed samples of a sliding window, and
+        points missing from a sample keep their last value"""
+        state = LiveState(PLAN, dtypes={'a': np.float64}, window=10)
+        values = [1, -1, 1, None, -1, -1, -1, -1, -1, -1, -1, -1, -1]
+        events = []
+        for timestamp, value in enumerate(values):
+            sample = Sample('unit', timestamp,
+                            {} if value is None else {'a': value})
+            events.extend(state.update([sample]))
+        self.assertEqual(
+            [(event.kind, event.status, event.sample, event.value)
+             for event in events],
+            [('consecutive', 'failed', 3, 2),  # Sample 3 keeps a = 1
+             ('percent', 'failed', 3, 3),
+             ('consecutive', 'cleared', 4, 2),
+             ('percent', 'cleared', 10, 2)])  # Sample 0 left the window
+        self.assertEqual(events[1].limit, 2)
+
+        return None
+
+    def test_live_faults(self):
+        """Events of a live source are yielded while the source is read, no
+        later than max_latency after its sample. Errors of sources are
+        raised"""
+        async def source():
+            for idx in range(20):
+                await asyncio.sleep(0.01)
+                yield Sample('unit', idx, {'a': 1 if idx % 3 else -1})
+
+        async def read():
+            events, times = [], []
+            async for event in live_faults(PLAN, [source()],
+                                           max_latency=0.05):
+                events.append(event)
+                times.append(time.perf_counter())
+            return events, times, time.perf_counter()
+
+        events, times, end = asyncio.run(read())
+        self.assertEqual([event.status for event in events],
+                         ['failed', 'cleared'] * 6)
+        self.assertLess(max(event.latency for event in events), 0.05 + 0.5)
+        self.assertLess(times[0], end - 0.05)
+
+        async def failing():
+            yield Sample('unit', 0, {'a': 1})
+            raise ValueError('feed disconnected')
+
+        with self.assertRaises(ValueError):
+            collect(live_faults(PLAN, [failing(), source()]))
+
+        return None
+
+    def test_replay(self):
+        """Replayed units are reviewed alike, and files are replayed from the
+        command line as JSON lines"""
+        data = generate_trend('ddvav', 700, list(FAULTS['ddvav']))
+        events = collect(live_faults(
+            DDVAVRules.plan, [replay_trends({str(unit): data
+                                             for unit in range(100)})],
+            dtypes=DDVAV_TYPES, max_batch=1000))
+        by_unit = {}
+        for event in events:
+            by_unit.setdefault(event.unit, []).append(
+                (event.rule, event.kind, event.status, event.sample))
+        self.assertEqual(len(by_unit), 100)
+        self.assertEqual(len({tuple(unit_events)
+                              for unit_events in by_unit.values()}), 1)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(io.StringIO()):
+            n_events = asyncio.run(replay_files([FILEPATH], 'ddvav',
+                                                write=output.write))
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(len(lines), n_events)
+        self.assertEqual({line['unit'] for line in lines}, {'DD03'})
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,8 +7,12 @@ Created on 2022-4-13
 
 # Python imports
 from itertools import filterfalse
+import contextlib
 import inspect
 import unittest
+import subprocess
+import sys
+import io
 import os
 from datetime import datetime
 
@@ -106,5 +110,36 @@ class TestGraphAll(unittest.TestCase):
         return None
 
 
+class TestStartup(unittest.TestCase):
+    """Test imports of the command line in file
+    src/trendreview/trendreview.py"""
+
+    def test_no_third_party_imports(self):
+        """numpy, pandas and matplotlib are imported when a file is
+        reviewed, not when arguments are parsed"""
+        code = ('import sys, trendreview.trendreview as cli; ' +
+                'cli.parser.parse_args(["-f", "x.csv", "-t", "sdvav", ' +
+                '"--report-path", "-"]); ' +
+                'print(sorted(name for name in ("numpy", "pandas", ' +
+                '"matplotlib", "trendreview.reporting") ' +
+                'if name in sys.modules))')
+        output = subprocess.run([sys.executable, '-c', code],
+                                capture_output=True, text=True, check=True,
+                                cwd=os.getcwd()).stdout
+        self.assertEqual(output.strip(), '[]')
+
+        return None
+
+    def test_unknown_type(self):
+        """Unknown equipment types are rejected while parsing"""
+        args = ['--filepath', FILEPATH, '--type', 'chiller']
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit):
+                parser.parse_args(args)
+        self.assertIn("invalid choice: 'chiller'", stderr.getvalue())
+
+        return None
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 16:05:44 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+import contextlib
+import io
+import json
+import tempfile
+import shutil
+import os
+
+# Third party imports
+import numpy as np
+
+# Local imports
+from trendreview.profiling import Profiler, stage, profiled, active
+from trendreview.ddvav import DDVAVRules, DDVAV_RULES
+from trendreview.reporting import FDDReporting
+
+# Relative to project src directory (not relative to __file__)
+FILEPATH = '../data/DD03.csv'
+
+# %%
+
+
+@profiled('double')
+def double(value):
+    return 2 * value
+
+
+class TestProfiling(unittest.TestCase):
+    """Test file src/trendreview/profiling.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return None
+
+    def test_inactive(self):
+        """Stages do nothing without an active profiler"""
+        self.assertIsNone(active())
+        with stage('read', rows=10) as record:
+            record.rows = 20
+        self.assertEqual(double(2), 4)
+
+        return None
+
+    def test_nested_stages(self):
+        """Nested stages record their depth, rows and peak RSS. The peak of
+        a stage includes the peak of its nested stages"""
+        with Profiler() as profiler:
+            self.assertIs(active(), profiler)
+            with stage('outer', rows=5):
+                with stage('inner') as record:
+                    data = np.ones(2**22)  # 32 MiB
+                    record.rows = data.shape[0]
+                    del data
+                self.assertEqual(double(3), 6)
+        self.assertIsNone(active())
+
+        records = {record['name']: record for record in profiler.records}
+        self.assertEqual(list(records), ['inner', 'double', 'outer'])
+        self.assertEqual(records['outer']['depth'], 0)
+        self.assertEqual(records['inner']['depth'], 1)
+        self.assertEqual(records['inner']['rows'], 2**22)
+        self.assertEqual(records['outer']['rows'], 5)
+        self.assertIsNone(records['double']['rows'])
+        self.assertGreaterEqual(records['outer']['seconds'],
+                                records['inner']['seconds'])
+        if records['inner']['peak_rss'] is not None:
+            self.assertGreaterEqual(records['outer']['peak_rss'],
+                                    records['inner']['peak_rss'])
+            self.assertGreater(records['inner']['peak_rss'], 2**25)
+
+        return None
+
+    def test_exception(self):
+        """A stage which raises is recorded"""
+        with Profiler() as profiler:
+            with self.assertRaises(ValueError):
+                with stage('failing'):
+                    raise ValueError()
+        self.assertEqual(profiler.records[0]['name'], 'failing')
+
+        return None
+
+    def test_totals_and_trace(self):
+        """Stages of the same name are added up in the summary, and the
+        trace is saved in the Chrome trace event format"""
+        with Profiler() as profiler:
+            for rows in (10, 20):
+                with stage('read', rows=rows):
+                    pass
+            with stage('render'):
+                pass
+        totals = {total['name']: total for total in profiler.totals()}
+        self.assertEqual(totals['read']['calls'], 2)
+        self.assertEqual(totals['read']['rows'], 30)
+        self.assertIsNone(totals['render']['rows'])
+        self.assertIn('read', profiler.summary())
+
+        filepath = os.path.join(self.directory, 'profile.json')
+        profiler.save_trace(filepath)
+        with open(filepath, 'rt', encoding='UTF-8') as file:
+            trace = json.load(file)
+        self.assertEqual(len(trace['traceEvents']), 3)
+        self.assertEqual(trace['traceEvents'][0]['ph'], 'X')
+        self.assertEqual(trace['traceEvents'][0]['args']['rows'], 10)
+        self.assertEqual(len(trace['summary']), 2)
+
+        return None
+
+    def test_review(self):
+        """Reading, each rule and logging an issue are recorded"""
+        with FDDReporting(os.path.join(self.directory, 'report.txt')
+                          ) as reporter, Profiler() as profiler, \
+                contextlib.redirect_stdout(io.StringIO()):
+            rules = DDVAVRules(FILEPATH)
+            rules.evaluate_rules(rules.get_rules(), reporter)
+        names = {record['name'] for record in profiler.records}
+        self.assertTrue({'read_trend', 'DDVAVRules.evaluate_rules',
+                         'FDDReporting.log_exception'}.issubset(names))
+        self.assertTrue({rule.name for rule in DDVAV_RULES}.issubset(names))
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 22:51:36 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+import io
+import tempfile
+import shutil
+import os
+import csv
+import json
+import gc
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+# Third party imports
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.image import imread
+
+# Local imports
+from trendreview.reporting import (FigureTemplate, FDDImageGeneration,
+                                   FDDReporting, ReportWriter)
+from trendreview.faults import Fault
+from trendreview.GraphAll import chart_properties
+
+# Relative to project src directory (not relative to __file__)
+FILEPATH = '../data/DD03.csv'
+
+# %%
+
+
+def _render_png(fig) -> np.ndarray:
+    """Pixels of a figure saved like FDDImageGeneration.save_image"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi='figure', bbox_inches='tight')
+    buffer.seek(0)
+    return imread(buffer)
+
+
+def _reserve_numbers(save_directory: str, count: int):
+    """Reserve image numbers within a worker process"""
+    generator = FDDImageGeneration(save_directory)
+    return [generator.reserve_image_filename() for _ in range(count)]
+
+
+class TestFigureTemplate(unittest.TestCase):
+    """Test FigureTemplate in file src/trendreview/reporting.py"""
+
+    def setUp(self):
+        self.data = pd.read_csv(FILEPATH, sep=',', parse_dates=['DateTime'])
+        self.template = FigureTemplate()
+
+        return None
+
+    def tearDown(self):
+        self.template.close()
+        return None
+
+    def _data_view(self, dependent_axis_names):
+        data_view = self.data.loc[:, ['DateTime'] + dependent_axis_names]\
+            .to_dict(orient='list')
+        data_view['primary_axis_label'] = 'DateTime'
+        data_view['dependent_axis_labels'] = dependent_axis_names
+        return data_view
+
+    def test_reused_figure_matches_new_figure(self):
+        """Images rendered on a reused figure are identical to images of a
+        new figure, including categorical data and changing line counts"""
+        specifications = [
+            (['DischargeTemperature'], chart_properties),
+            (['HeatCoolMode'], chart_properties),  # Categorical
+            (['CoolingAirVolume'], chart_properties),
+            (['CoolingSetpoint', 'RoomTemperature'], {}),
+            (['RoomTemperature'], {}),
+        ]
+        for dependent_axis_names, properties in specifications:
+            data_view = self._data_view(dependent_axis_names)
+            reused = _render_png(self.template.render(data_view, properties))
+            fig = FDDImageGeneration.generate_figure(data_view, properties)
+            expected = _render_png(fig)
+            plt.close(fig)
+            self.assertEqual(reused.shape, expected.shape)
+            self.assertTrue(np.array_equal(reused, expected),
+                            msg=str(dependent_axis_names))
+
+        return None
+
+    def test_figure_is_reused(self):
+        """Numeric data of the same kind is drawn on the same figure"""
+        fig = self.template.render(
+            self._data_view(['DischargeTemperature']), chart_properties)
+        self.assertIs(self.template.render(
+            self._data_view(['RoomTemperature']), chart_properties), fig)
+        self.assertEqual(len(fig.axes[0].get_lines()), 1)
+
+        return None
+
+
+
+class TestImageNumbering(unittest.TestCase):
+    """Test image numbering of FDDImageGeneration in file
+    src/trendreview/reporting.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return None
+
+    def _touch(self, name):
+        with open(os.path.join(self.directory, name), 'wb'):
+            pass
+        return None
+
+    def test_counter_starts_after_existing_images(self):
+        """A directory with existing images continues after the highest
+        image, and later generators do not scan the directory"""
+        self._touch('figure3.png')
+        self._touch('figure12.png')
+        generator = FDDImageGeneration(self.directory)
+        self.assertEqual(generator.image_number, 13)
+        self.assertTrue(generator.reserve_image_filename().endswith(
+            os.sep + 'figure13.png'))
+        self.assertEqual(generator.image_number, 14)
+
+        # Images added without the counter are not scanned again
+        self._touch('figure99.png')
+        generator = FDDImageGeneration(self.directory)
+        self.assertTrue(generator.reserve_image_filename().endswith(
+            os.sep + 'figure14.png'))
+
+        return None
+
+    def test_generators_share_counter(self):
+        """Generators of the same directory never reserve the same number"""
+        first = FDDImageGeneration(self.directory)
+        second = FDDImageGeneration(self.directory)
+        names = [first.reserve_image_filename(),
+                 second.reserve_image_filename(),
+                 first.reserve_image_filename()]
+        self.assertEqual([os.path.basename(name) for name in names],
+                         ['figure1.png', 'figure2.png', 'figure3.png'])
+
+        return None
+
+    def test_processes_share_counter(self):
+        """Processes saving into the same directory reserve unique numbers"""
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(_reserve_numbers, self.directory, 50)
+                       for _ in range(4)]
+            names = [name for future in futures for name in future.result()]
+        numbers = sorted(int(os.path.basename(name)[6:-4]) for name in names)
+        self.assertEqual(numbers, list(range(1, 201)))
+
+        return None
+
+
+class TestReportWriter(unittest.TestCase):
+    """Test ReportWriter and structured reports of FDDReporting in file
+    src/trendreview/reporting.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.log_filepath = os.path.join(self.directory, 'report.txt')
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return None
+
+    def _read(self, name):
+        with open(os.path.join(self.directory, name), 'rt',
+                  encoding='UTF-8', newline='') as file:
+            return file.read()
+
+    def test_text_report(self):
+        """The text report is written like the report before structured
+        formats"""
+        writer = ReportWriter(self.log_filepath)
+        writer.write(1, 'First issue', 'figure1.png')
+        writer.write(2, 'Second issue')
+        writer.close()
+        self.assertEqual(
+            self._read('report.txt'),
+            'Issue #1\nFirst issue\nSee figure1.png\n\n\n' +
+            'Issue #2\nSecond issue\n\n\n')
+        self.assertEqual(os.listdir(self.directory), ['report.txt'])
+
+        return None
+
+    def test_fault_records(self):
+        """Faults logged by FDDReporting keep their rule, kind, severity and
+        episodes in JSON Lines and CSV reports"""
+        data = pd.DataFrame({'time': np.arange(10, dtype=float),
+                             'a': np.arange(10, dtype=float)})
+        fault = Fault('DAT_STPT', 'consecutive', 'Too hot', ['time', 'a'],
+                      ranges=[[0, 2], [5, 9]], values=[2, 4], count=2,
+                      limit=2, report_indices=np.arange(10))
+        reporter = FDDReporting(self.log_filepath,
+                                report_formats=['text', 'jsonl', 'csv'])
+        reporter.log_fault(fault, data, create_image=False)
+        reporter.close()
+
+        record = json.loads(self._read('report_issues.jsonl'))
+        self.assertEqual(record['issue'], 1)
+        self.assertEqual(record['message'], 'Too hot')
+        self.assertEqual(record['rule'], 'DAT_STPT')
+        self.assertEqual(record['kind'], 'consecutive')
+        self.assertEqual(record['ranges'], [[0, 2], [5, 9]])
+        self.assertAlmostEqual(record['severity'], 2.0)
+        rows = list(csv.DictReader(io.StringIO(
+            self._read('report_issues.csv'))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['rule'], 'DAT_STPT')
+        self.assertEqual(rows[0]['episodes'], '2')
+        self.assertIn('Too hot', self._read('report.txt'))
+
+        return None
+
+    def test_buffered_until_flush(self):
+        """Issues are written to disk every flush_every issues, and on close.
+        Reopened reports are appended without a second CSV header"""
+        writer = ReportWriter(self.log_filepath, ['jsonl', 'csv'],
+                              flush_every=3)
+        writer.write(1, 'One')
+        writer.write(2, 'Two')
+        self.assertEqual(self._read('report_issues.jsonl'), '')
+        writer.write(3, 'Three')
+        self.assertEqual(
+            self._read('report_issues.jsonl').count('\n'), 3)
+        writer.write(4, 'Four')
+        writer.close()
+        writer.write(5, 'Five')
+        writer.close()
+
+        self.assertEqual(
+            self._read('report_issues.jsonl').count('\n'), 5)
+        rows = list(csv.DictReader(io.StringIO(
+            self._read('report_issues.csv'))))
+        self.assertEqual([row['issue'] for row in rows],
+                         ['1', '2', '3', '4', '5'])
+
+        return None
+
+    def test_reporter_closed(self):
+        """A reporter used as a context manager is closed on exit. A
+        reporter which is never closed still writes its report when it is
+        garbage collected, without leaving report files open"""
+        with FDDReporting(self.log_filepath) as reporter:
+            reporter.log_rendered('First issue')
+            self.assertEqual(self._read('report.txt'), '')
+        self.assertEqual(self._read('report.txt'),
+                         'Issue #1\nFirst issue\n\n\n')
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', ResourceWarning)
+            reporter = FDDReporting(self.log_filepath)
+            reporter.log_rendered('Second issue')
+            del reporter
+            gc.collect()
+        self.assertIn('Second issue', self._read('report.txt'))
+        self.assertEqual([warning for warning in caught
+                          if issubclass(warning.category, ResourceWarning)],
+                         [])
+
+        return None
+
+    def test_unknown_format(self):
+        """Unknown report formats raise ValueError"""
+        with self.assertRaises(ValueError):
+            ReportWriter(self.log_filepath, ['text', 'xml'])
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 09:40:02 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+
+# Third party imports
+import numpy as np
+
+# Local imports
+from trendreview.runlength import (run_lengths, consecutive_runs, rising_edges,
+                                   run_indices)
+from trendreview.helpers import masked_consecutive_elements
+
+# %%
+
+
+def _loop_rising_edges(data, n_consecutive_elements):
+    """Reference implementation iterating over every element"""
+    rising_edge = []
+    pushed = False
+    consecutive_count = 0
+    for i in range(0, len(data)):
+        if data[i]:
+            consecutive_count += 1
+            if consecutive_count == n_consecutive_elements and not pushed:
+                rising_edge.append(i - n_consecutive_elements + 1)
+                pushed = True
+        else:
+            consecutive_count = 0
+            pushed = False
+    return rising_edge
+
+
+class TestRunLength(unittest.TestCase):
+    """Test file src/trendreview/runlength.py"""
+
+    def test_run_lengths(self):
+        """Every run of True values is reported with start, length, end"""
+        data = np.array([0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1, 1, 1], dtype=bool)
+        starts, lengths, ends = run_lengths(data)
+        np.testing.assert_array_equal(starts, [4, 10])
+        np.testing.assert_array_equal(lengths, [3, 3])
+        np.testing.assert_array_equal(ends, [7, 13])
+
+        # Runs touching both ends of the array
+        starts, lengths, ends = run_lengths([1, 1, 0, 1])
+        np.testing.assert_array_equal(starts, [0, 3])
+        np.testing.assert_array_equal(lengths, [2, 1])
+        np.testing.assert_array_equal(ends, [2, 4])
+
+        # No runs
+        starts, lengths, ends = run_lengths(np.zeros(5, dtype=bool))
+        self.assertEqual(starts.shape[0], 0)
+        starts, lengths, ends = run_lengths([])
+        self.assertEqual(starts.shape[0], 0)
+
+        return None
+
+    def test_consecutive_runs(self):
+        """Only runs at least n elements long are reported"""
+        data = [1, 0, 1, 1, 0, 1, 1, 1, 1, 0]
+        starts, lengths, ends = consecutive_runs(data, 2)
+        np.testing.assert_array_equal(starts, [2, 5])
+        np.testing.assert_array_equal(lengths, [2, 4])
+        np.testing.assert_array_equal(ends, [4, 9])
+
+        return None
+
+    def test_masked_elements_are_false(self):
+        """Masked elements of a masked array do not count as failures"""
+        data = np.ma.MaskedArray([1, 1, 1, 1], mask=[0, 1, 0, 0])
+        np.testing.assert_array_equal(rising_edges(data, 2), [2])
+
+        return None
+
+    def test_rising_edges_match_loop(self):
+        """Vectorized rising edges equal the element by element result"""
+        rng = np.random.default_rng(1)
+        for n_consecutive in (1, 2, 3, 5):
+            data = np.ma.MaskedArray(rng.integers(0, 2, 500))
+            self.assertEqual(
+                masked_consecutive_elements(data, n_consecutive),
+                _loop_rising_edges(data, n_consecutive))
+
+        return None
+
+    def test_run_indices(self):
+        """Indices covered by runs, optionally only the first limit"""
+        rng = np.random.default_rng(2)
+        data = rng.integers(0, 2, 300).astype(bool)
+        starts, lengths, _ = run_lengths(data)
+        np.testing.assert_array_equal(run_indices(starts, lengths),
+                                      np.flatnonzero(data))
+        for limit in (0, 1, 7, 100, 1000):
+            np.testing.assert_array_equal(run_indices(starts, lengths, limit),
+                                          np.flatnonzero(data)[:limit])
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
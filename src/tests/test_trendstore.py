@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:02:45 2026
+
+@author: jvorsten
+"""
+
+# Python imports
+import unittest
+from unittest import mock
+import contextlib
+import sys
+import io
+import tempfile
+import shutil
+import os
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from trendreview import equipment
+from trendreview.equipment import register_equipment
+from trendreview.trendstore import (import_csv, is_trend_store, TrendStore,
+                                    main, parser)
+from trendreview.helpers import read_csv
+from trendreview.ddvav import DDVAV_HEADERS, DDVAV_TYPES, DDVAVRules
+from trendreview.GraphAll import GraphAll
+
+# Relative to project src directory (not relative to __file__)
+FILEPATH = '../data/DD03.csv'
+
+# %%
+
+
+class TestTrendStore(unittest.TestCase):
+    """Test file src/trendreview/trendstore.py"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store_filepath = os.path.join(self.directory, 'DD03.trend')
+
+        return None
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return None
+
+    def test_import_matches_csv(self):
+        """Columns of an imported store are equal to the parsed CSV file,
+        including text columns split across chunks"""
+        store = import_csv(FILEPATH, self.store_filepath, dtypes=DDVAV_TYPES,
+                           chunksize=500)
+        self.assertTrue(is_trend_store(self.store_filepath))
+        self.assertFalse(is_trend_store(FILEPATH))
+        expected = read_csv(FILEPATH, DDVAV_HEADERS, DDVAV_TYPES)
+        self.assertEqual(store.n_rows, expected.shape[0])
+        pd.testing.assert_frame_equal(store.frame(DDVAV_HEADERS), expected)
+        self.assertIsInstance(store.column('RoomTemperature'), np.memmap)
+        with self.assertRaises(KeyError):
+            store.frame(['NotAColumn'])
+
+        # Inferred dtypes
+        store = import_csv(FILEPATH, self.store_filepath)
+        expected = GraphAll(FILEPATH).data
+        pd.testing.assert_frame_equal(store.frame(), expected,
+                                      check_dtype=False)
+
+        return None
+
+    def test_rules_on_store(self):
+        """Rules find the same faults in a store and in the CSV file"""
+        import_csv(FILEPATH, self.store_filepath, dtypes=DDVAV_TYPES)
+        # Unused columns are printed, and test_parser closes sys.stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            csv_rules = DDVAVRules(FILEPATH)
+            store_rules = DDVAVRules(self.store_filepath, chunksize=1000)
+        self.assertIsNotNone(store_rules.data)
+        methods = csv_rules.get_rules()
+        expected = csv_rules.collect_faults(methods)
+        faults = store_rules.collect_faults(store_rules.get_rules())
+        self.assertEqual(len(faults), len(expected))
+        for fault, expected_fault in zip(faults, expected):
+            self.assertEqual((fault.rule, fault.kind, fault.message),
+                             (expected_fault.rule, expected_fault.kind,
+                              expected_fault.message))
+            np.testing.assert_array_equal(fault.ranges, expected_fault.ranges)
+        self.assertEqual(len(GraphAll(self.store_filepath).data.columns),
+                         len(TrendStore(self.store_filepath).columns))
+
+        return None
+
+    def test_command_line_types(self):
+        """Columns are imported with the dtypes of any registered equipment
+        type, and unknown types are rejected"""
+        @register_equipment('test_store_equipment')
+        class TestRules:
+            dtypes = {'RoomTemperature': np.float32}
+
+        argv = ['trendstore', FILEPATH, self.store_filepath, '--type']
+        try:
+            with mock.patch.object(sys, 'argv',
+                                   argv + ['test_store_equipment']), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                main(parser)
+        finally:
+            equipment._registry.pop('test_store_equipment', None)
+        store = TrendStore(self.store_filepath)
+        self.assertEqual(store.column('RoomTemperature').dtype, np.float32)
+        self.assertEqual(store.column('DischargeTemperature').dtype,
+                         np.float64)
+
+        with mock.patch.object(sys, 'argv', argv + ['chiller']), \
+                contextlib.redirect_stderr(io.StringIO()), \
+                self.assertRaises(SystemExit):
+            main(parser)
+
+        return None
+
+
+if __name__ == '__main__':
+    unittest.main()
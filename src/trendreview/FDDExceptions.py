@@ -11,6 +11,7 @@ Custom exceptions raised during fault detection
 from typing import List, MutableMapping, Union
 
 # Third party imports
+import numpy as np
 
 # Local imports
 
@@ -20,12 +21,15 @@ from typing import List, MutableMapping, Union
 class FDDException(Exception):
     """Base class for exceptions on fault detection and diagnostics"""
 
-    def __init__(self, message: str, data: MutableMapping[str, Union[str, List]]):
+    def __init__(self, message: str,
+                 data: MutableMapping[str, Union[str, List, np.ndarray]]):
         """inputs
         -------
         message: (str) error mesage
         data: (dict) with required keys ['primary_axis_label',
-                                         'dependent_axis_labels']"""
+                                         'dependent_axis_labels']
+        Values of data columns are lists or np.ndarray (including
+        datetime64 arrays), which are plotted without conversion"""
         super().__init__()
         # Exception message, and also message that will be logged for reporting
         self.message = message
@@ -41,14 +45,20 @@ class FDDException(Exception):
                     f"Required key not found in dict: {label}")
         primary_axis_key = data['primary_axis_label']
         dependent_labels = data['dependent_axis_labels']
-        if not data.get(primary_axis_key):
+        if _is_empty(data.get(primary_axis_key)):
             msg = f"Designated primary_axis_label key '{primary_axis_key}' is not found or empty"
             raise KeyError(msg)
         for label in dependent_labels:
-            if not data.get(label):
+            if _is_empty(data.get(label)):
                 msg = f"Designated dependent_axis_labels key '{primary_axis_key}' is not found or empty"
                 raise KeyError(msg)
 
         self.data = data
 
         return None
+
+
+def _is_empty(values) -> bool:
+    """True if a data column is missing or has no values. The truth value
+    of a np.ndarray is ambiguous, so its length is checked instead"""
+    return values is None or len(values) == 0
@@ -24,6 +24,12 @@ import numpy as np
 # Local imports
 from .FDDExceptions import FDDException
 from .reporting import FDDReporting
+from .cache import TrendCache
+from .helpers import read_clean_csv
+from .profiling import stage
+from .trendstore import is_trend_store, read_trend_store
+from .dateparse import (parse_date_columns, combine_date_time,
+                        DATE_TIME_HEADERS)
 
 # Declarations
 HEADERS = ['DateTime',
@@ -47,14 +53,48 @@ class GraphAll:
     """Collection of rules to check on trended data for dual-duct terminal
     units"""
 
-    def __init__(self, filepath: str, parse_dates='DateTime'):
+    def __init__(self, filepath: str, parse_dates='DateTime',
+                 cache: TrendCache = None, clean: List[str] = None):
         """Inputs
         ------
         filepath: (string) name of CSV file related to a dual-duct terminal
-        unit to open, parse, and apply rule checks to"""
+        unit to open, parse, and apply rule checks to
+        cache: (TrendCache) cache of parsed trend files, or None to always
+        parse the file
+        filepath may also be a trend store (see trendstore), whose columns
+        are memory-mapped instead of parsed
+        When the file has no parse_dates column but has separate Date and
+        Time columns, they are combined into the parse_dates column
+        clean: (list) of cleaning steps applied to the file before it is
+        graphed, see data_cleaning_utilities.CLEANING_STEPS"""
+
+        def read():
+            if clean:
+                data = read_clean_csv(filepath, clean)
+            else:
+                data = pd.read_csv(filepath, sep=',')
+            if (parse_dates not in data.columns and
+                    set(DATE_TIME_HEADERS).issubset(data.columns)):
+                data.insert(0, parse_dates, combine_date_time(
+                    *(data[header] for header in DATE_TIME_HEADERS)))
+            if parse_dates not in data.columns:
+                raise ValueError("Missing column provided to 'parse_dates': " +
+                                 f"'{parse_dates}'")
+            parse_date_columns(data, [parse_dates])
+            return data
 
         self.csv_filepath = filepath
-        self.data = pd.read_csv(filepath, sep=',', parse_dates=[parse_dates])
+        with stage('GraphAll.read') as record:
+            if is_trend_store(filepath):
+                self.data = read_trend_store(filepath)
+            elif cache is None:
+                self.data = read()
+            else:
+                self.data = cache.load(
+                    filepath, {'parse_dates': [parse_dates],
+                               'date_time_headers': DATE_TIME_HEADERS,
+                               'clean': sorted(clean or [])}, read)
+            record.rows = self.data.shape[0]
 
         return None
 
@@ -78,25 +118,22 @@ class GraphAll:
             dependent_axis_names = self.get_dependent_axis_names(
                 independent_axis_name)
 
-        for dependent_axis_name in dependent_axis_names:
-            # Generic message
-            msg = "Graph of {} versus {}".format(dependent_axis_name,
-                                                 independent_axis_name)
-            # Collect data
-            data_view = self.data.loc[:, [independent_axis_name, dependent_axis_name]]\
-                .to_dict(orient='list')
-            data_view['primary_axis_label'] = independent_axis_name
-            data_view['dependent_axis_labels'] = [dependent_axis_name]
+        # Every graph has the same layout, so one figure is reused
+        with reporter.reuse_figure():
+            for dependent_axis_name in dependent_axis_names:
+                # Generic message
+                msg = "Graph of {} versus {}".format(dependent_axis_name,
+                                                     independent_axis_name)
+                # Collect data, columns are arrays viewing self.data
+                data_view = self._data_view(
+                    independent_axis_name, [dependent_axis_name])
 
-            # Cast pandas timestamp to string
-            self._timestamp_to_string(data_view[independent_axis_name])
+                # The exception holds message and data
+                fddexception = FDDException(msg, data_view)
 
-            # The exception holds message and data
-            fddexception = FDDException(msg, data_view)
-
-            # Create visualization and report
-            reporter.log_exception(fddexception, create_image=True,
-                                   chart_properties=chart_properties)
+                # Create visualization and report
+                reporter.log_exception(fddexception, create_image=True,
+                                       chart_properties=chart_properties)
 
         return None
 
@@ -125,20 +162,9 @@ class GraphAll:
 
         # Generic message
         msg = f"Graph of {dependent_axis_names} versus {independent_axis_name}"
-        # Collect data
-        columns: List[str] = []
-        columns.append(independent_axis_name)
-        for dependent_axis_name in dependent_axis_names:
-            columns.append(dependent_axis_name)
-
         # Create a data view (dictionary containing data to be plotted)
-        data_view = self.data.loc[:, columns]\
-            .to_dict(orient='list')
-        data_view['primary_axis_label'] = independent_axis_name  # Sring
-        data_view['dependent_axis_labels'] = dependent_axis_names  # List
-
-        # Cast pandas timestamp to string
-        self._timestamp_to_string(data_view[independent_axis_name])
+        data_view = self._data_view(independent_axis_name,
+                                    dependent_axis_names)
 
         # The exception holds message and data
         fddexception = FDDException(msg, data_view)
@@ -150,13 +176,16 @@ class GraphAll:
 
         return None
 
-    @classmethod
-    def _timestamp_to_string(cls, data: List):
+    def _data_view(self, independent_axis_name: str,
+                   dependent_axis_names: List[str]) -> Dict:
+        """Create the data passed to a FDDException for plotting. Columns
+        are np.ndarray views of self.data, datetime columns are datetime64"""
+        data_view = {column: self.data[column].to_numpy() for column in
+                     [independent_axis_name] + list(dependent_axis_names)}
+        data_view['primary_axis_label'] = independent_axis_name  # String
+        data_view['dependent_axis_labels'] = list(dependent_axis_names)
 
-        for i in range(0, len(data)):
-            data[i] = str(data[i])  # Modify timestamp value in place
-
-        return None
+        return data_view
 
     def get_dependent_axis_names(self, independent_axis_name: str) -> List[str]:
         """Get a list of dependent axis names based on header data
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 14:10:27 2026
+
+@author: jvorsten
+
+Review many trend files in parallel and write one consolidated report
+
+Logic
+1. Files are handed to a pool of worker processes. At most max_pending files
+are queued at once, so a directory of thousands of files does not queue
+thousands of jobs
+2. Each worker reviews a file and renders its images into a private staging
+directory inside the report directory
+3. The main process logs the results of each file in input order. Staged
+images are moved next to the report and numbered as they are logged, so
+figure numbers do not depend on which worker finished first
+
+Example
+filepaths = gather_csv_filenames('c:/path/to/site/trends')
+run_batch(filepaths, 'ddvav', 'c:/path/to/report.txt', workers=8)
+"""
+
+# Python imports
+from concurrent.futures import (ProcessPoolExecutor, Future, wait,
+                                FIRST_COMPLETED)
+from pathlib import Path
+from typing import Dict, List, Mapping, MutableMapping, Optional, Tuple
+import os
+import shutil
+import tempfile
+
+# Third party imports
+
+# Local imports
+from trendreview.FDDExceptions import FDDException
+from trendreview.reporting import FDDReporting
+from trendreview.trendreview import review_file
+from trendreview.profiling import Profiler, active, profiled
+
+# Declarations
+
+# %%
+
+
+def gather_csv_filenames(search_directory: str) -> List[str]:
+    """Return all comma-separated files within a base directory, sorted so
+    that reports are repeatable"""
+    return sorted(str(path) for path in Path(search_directory).glob('**/*.csv'))
+
+
+class _StagingReporter(FDDReporting):
+    """Reporter used within worker processes. Images are rendered into a
+    staging directory and issues are kept in memory, to be logged into the
+    consolidated report by the main process"""
+
+    def __init__(self, staging_directory: str, **reporter_options):
+        super().__init__(os.path.join(staging_directory, 'report.txt'),
+                         **reporter_options)
+        self.issues: List[Tuple[str, Optional[str], Optional[Dict]]] = []
+
+        return None
+
+    @profiled('FDDReporting.log_exception')
+    def log_exception(self, exception: FDDException,
+                      create_image: bool = True,
+                      chart_properties: MutableMapping[str, str] = {},
+                      details: Mapping = None):
+        """Render the image of an exception and keep the issue in memory"""
+        image_filepath = None
+        if create_image:
+            image_filepath = self.save_figure(exception, chart_properties)
+        self.issues.append((exception.message, image_filepath,
+                            None if details is None else dict(details)))
+
+        return None
+
+
+def _initialize_worker():
+    """Worker processes only render images to files"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+    return None
+
+
+def _review_job(index: int, filepath: str, equipment_type: str,
+                staging_directory: str, options: Dict,
+                reporter_options: Dict, profile: bool = False) -> Dict:
+    """Review a single file within a worker process
+    inputs
+    -------
+    options: (dict) keyword arguments of trendreview.review_file
+    reporter_options: (dict) keyword arguments of FDDReporting
+    profile: (bool) record the stages of the review (see profiling)
+    outputs
+    -------
+    result: (dict) with keys index, filepath, issues (list of message,
+    staged image path and details), error (message if the file could not be
+    reviewed) and profile (list of stage records, or None)"""
+    job_directory = os.path.join(staging_directory, str(index))
+    os.makedirs(job_directory, exist_ok=True)
+    reporter = _StagingReporter(job_directory, **reporter_options)
+    profiler = Profiler() if profile else None
+    error = None
+    try:
+        if profiler is None:
+            review_file(filepath, equipment_type, reporter, **options)
+        else:
+            with profiler:
+                review_file(filepath, equipment_type, reporter, **options)
+    except Exception as exception:  # Report the file and continue the batch
+        error = f"{type(exception).__name__}: {exception}"
+
+    return {'index': index, 'filepath': filepath,
+            'issues': reporter.issues, 'error': error,
+            'profile': None if profiler is None else profiler.records}
+
+
+def _log_result(reporter: FDDReporting, result: Dict) -> None:
+    """Log the issues of a reviewed file into the consolidated report"""
+    file_msg = "File: " + result['filepath']
+    for message, image_filepath, details in result['issues']:
+        reporter.log_rendered(file_msg + '\n' + message, image_filepath,
+                              dict(details or {}, file=result['filepath']))
+    if result['error'] is not None:
+        reporter.log_rendered(file_msg + '\nUnable to review file. ' +
+                              result['error'],
+                              details={'file': result['filepath']})
+
+    return None
+
+
+def run_batch(filepaths: List[str], equipment_type: str, log_filepath: str,
+              workers: int = None, max_pending: int = None,
+              target_width: int = None, decimation: str = 'minmax',
+              report_formats: List[str] = ('text',),
+              **options) -> FDDReporting:
+    """Review each file in filepaths across a pool of worker processes and
+    write one consolidated report
+    inputs
+    -------
+    filepaths: (list) of paths to trended data in CSV format
+    equipment_type: (str) see trendreview.SUPPORTED_EQUIPMENT
+    log_filepath: (str) report path, images are saved in the same directory
+    workers: (int) number of worker processes (default: number of CPUs).
+    When 1, files are reviewed within this process
+    max_pending: (int) maximum number of files queued to workers, or
+    reviewed and waiting to be logged in input order, at once (default:
+    2 x workers)
+    target_width, decimation: image decimation, see FDDReporting
+    report_formats: (list) of reporting.REPORT_FORMATS written
+    options: keyword arguments passed to trendreview.review_file
+    While a profiler is active (see profiling), the stages of workers are
+    added to it
+    outputs
+    -------
+    reporter: (FDDReporting) reporter of the consolidated report. Its report
+    files are closed (and reopened if more issues are logged)"""
+    workers = workers or os.cpu_count() or 1
+    max_pending = max(max_pending or 2 * workers, 1)
+    reporter = FDDReporting(log_filepath=log_filepath,
+                            report_formats=report_formats)
+    reporter_options = {'target_width': target_width,
+                        'decimation': decimation}
+    staging_directory = tempfile.mkdtemp(
+        prefix='.trendreview-', dir=reporter.imageGenerator.save_directory)
+
+    try:
+        if workers == 1:
+            for index, filepath in enumerate(filepaths):
+                _log_result(reporter, _review_job(
+                    index, filepath, equipment_type, staging_directory,
+                    options, reporter_options))
+            return reporter
+
+        # Results are logged in input order as soon as they are available
+        profiler = active()
+        completed: Dict[int, Dict] = {}
+        next_index = 0
+        pending: Dict[Future, int] = {}
+        jobs = enumerate(filepaths)
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_initialize_worker) as executor:
+            while True:
+                # Files waiting to be logged in order count as queued, so
+                # results held back by a slow file do not grow without bound
+                while len(pending) + len(completed) < max_pending:
+                    job = next(jobs, None)
+                    if job is None:
+                        break
+                    index, filepath = job
+                    future = executor.submit(
+                        _review_job, index, filepath, equipment_type,
+                        staging_directory, options, reporter_options,
+                        profiler is not None)
+                    pending[future] = index
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.pop(future)
+                    result = future.result()
+                    completed[result['index']] = result
+                    if profiler is not None:
+                        profiler.merge(result['profile'])
+                while next_index in completed:
+                    _log_result(reporter, completed.pop(next_index))
+                    next_index += 1
+    finally:
+        shutil.rmtree(staging_directory, ignore_errors=True)
+        reporter.close()
+
+    return reporter
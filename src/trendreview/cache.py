@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:05:37 2026
+
+@author: jvorsten
+
+On-disk cache of parsed trend files
+Parsing a CSV file (especially the DateTime column) is the slowest part of
+a review. Trend files are reviewed many times while they do not change, so
+the parsed columns are saved in a binary columnar format and memory-mapped
+the next time the same file is loaded
+
+Format
+Each cache entry is a directory containing one .npy file per column and a
+meta.json file describing the columns. Numeric and boolean columns are
+saved with their dtype, datetime columns as int64 nanoseconds, and text
+columns as integer codes into a list of categories (-1 for missing values)
+
+Invalidation
+Entries are keyed by a hash of the file contents and the options used to
+parse the file, so a changed file or changed parsing options never use a
+stale entry. Hashing is skipped for a file whose size and modification time
+match the last time it was hashed. Entries of an older cache format are
+ignored
+
+Eviction
+When the total size of the cache exceeds max_bytes, the least recently used
+entries are removed
+
+Example
+cache = TrendCache('c:/path/to/cache', max_bytes=2**30)
+data = cache.load('c:/path/to/trend.csv', options, read_function)
+"""
+
+# Python imports
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+
+# Declarations
+CACHE_FORMAT_VERSION = 1
+DEFAULT_MAX_BYTES = 2**30  # 1 GiB
+HASH_BLOCK_SIZE = 2**20
+
+# %%
+
+
+def default_cache_directory() -> str:
+    """Directory of the cache when none is given. The environment variable
+    TRENDREVIEW_CACHE_DIR overrides the default ~/.cache/trendreview"""
+    return os.environ.get(
+        'TRENDREVIEW_CACHE_DIR',
+        os.path.join(os.path.expanduser('~'), '.cache', 'trendreview'))
+
+
+def file_digest(filepath: str) -> str:
+    """Return the sha256 hex digest of the contents of a file"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _encode_column(values: pd.Series) -> Tuple[np.ndarray, Dict]:
+    """Return the array saved for a column and its description"""
+    if pd.api.types.is_datetime64_dtype(values.dtype):
+        return (values.to_numpy(dtype='datetime64[ns]').view(np.int64),
+                {'kind': 'datetime'})
+    if values.dtype.kind in 'biuf':
+        return values.to_numpy(), {'kind': 'numeric'}
+
+    codes, categories = pd.factorize(values)
+    categories = categories.tolist()
+    if not all(isinstance(category, str) for category in categories):
+        raise TypeError(f"Column {values.name} can not be cached, only " +
+                        "numeric, datetime and text columns are supported")
+
+    return codes.astype(np.int32), {'kind': 'category',
+                                    'categories': categories}
+
+
+def _decode_column(array: np.ndarray, description: Mapping) -> np.ndarray:
+    """Inverse of _encode_column"""
+    if description['kind'] == 'datetime':
+        return array.view('datetime64[ns]')
+    if description['kind'] == 'numeric':
+        return array
+
+    categories = np.array(description['categories'] + [np.nan],
+                          dtype=object)
+    return categories[array]  # Code -1 selects the trailing NaN
+
+
+class TrendCache:
+    """Content-addressed cache of parsed trend files"""
+
+    def __init__(self, directory: str = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """inputs
+        -------
+        directory: (str) cache directory, created when missing (default: see
+        default_cache_directory)
+        max_bytes: (int) maximum total size of cache entries"""
+        self.directory = os.path.abspath(directory or default_cache_directory())
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(self.directory, 'stat'), exist_ok=True)
+
+        return None
+
+    def __repr__(self):
+        return f"TrendCache({self.directory!r}, max_bytes={self.max_bytes})"
+
+    def key(self, filepath: str, options: Mapping) -> str:
+        """Return the cache key of a file parsed with options
+        inputs
+        -------
+        filepath: (str) path of the trend file
+        options: (dict) parsing options, converted to text with repr"""
+        options = repr(sorted((str(key), repr(value))
+                              for key, value in options.items()))
+        key = hashlib.sha256()
+        key.update(f"{CACHE_FORMAT_VERSION}\n{options}\n".encode('UTF-8'))
+        key.update(self._content_digest(filepath).encode('UTF-8'))
+
+        return key.hexdigest()
+
+    def _content_digest(self, filepath: str) -> str:
+        """Digest of a file. The digest of a file whose size and modification
+        time are unchanged since it was last hashed is reused"""
+        filepath = os.path.abspath(filepath)
+        stat = os.stat(filepath)
+        name = hashlib.sha256(filepath.encode('UTF-8')).hexdigest() + '.json'
+        stat_filepath = os.path.join(self.directory, 'stat', name)
+        try:
+            with open(stat_filepath, 'rt', encoding='UTF-8') as file:
+                record = json.load(file)
+            if (record['size'] == stat.st_size and
+                    record['mtime_ns'] == stat.st_mtime_ns):
+                return record['digest']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        digest = file_digest(filepath)
+        record = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                  'digest': digest}
+        _write_json_atomic(stat_filepath, record)
+
+        return digest
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Return the data of a cache entry, or None when not cached. Columns
+        are memory-mapped copy-on-write, so they are read from disk only
+        when used and may be modified without changing the entry"""
+        entry = os.path.join(self.directory, key)
+        meta_filepath = os.path.join(entry, 'meta.json')
+        try:
+            with open(meta_filepath, 'rt', encoding='UTF-8') as file:
+                meta = json.load(file)
+            if meta['version'] != CACHE_FORMAT_VERSION:
+                return None
+            columns = {}
+            for idx, description in enumerate(meta['columns']):
+                array = np.load(os.path.join(entry, f'{idx}.npy'),
+                                mmap_mode='c')
+                columns[description['name']] = _decode_column(
+                    array, description)
+            os.utime(meta_filepath)  # Mark as recently used
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # Without copy=False, columns of one dtype are copied into one block
+        return pd.DataFrame(columns, columns=[description['name'] for
+                                              description in meta['columns']],
+                            copy=False)
+
+    def put(self, key: str, data: pd.DataFrame) -> None:
+        """Save data as a cache entry, then evict least recently used entries
+        if the cache is larger than max_bytes. Columns which can not be
+        saved leave the cache unchanged"""
+        entry = os.path.join(self.directory, key)
+        if os.path.isdir(entry):
+            return None
+        try:
+            encoded = [_encode_column(data[name]) for name in data.columns]
+        except TypeError:
+            return None
+
+        # Write into a temporary directory and rename, so other processes
+        # never read a partial entry
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=self.directory)
+        try:
+            descriptions = []
+            for idx, (name, (array, description)) in enumerate(
+                    zip(data.columns, encoded)):
+                np.save(os.path.join(staging, f'{idx}.npy'), array)
+                descriptions.append(dict(description, name=name))
+            _write_json_atomic(os.path.join(staging, 'meta.json'), {
+                'version': CACHE_FORMAT_VERSION, 'n_rows': data.shape[0],
+                'columns': descriptions})
+            os.replace(staging, entry)
+        except OSError:
+            pass  # Another process saved the same entry
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+        return None
+
+    def load(self, filepath: str, options: Mapping,
+             read: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Return the cached data of a file, or read and cache it
+        inputs
+        -------
+        filepath: (str) path of the trend file
+        options: (dict) options which change how the file is parsed
+        read: (callable) returns the parsed file when it is not cached"""
+        key = self.key(filepath, options)
+        data = self.get(key)
+        if data is None:
+            data = read()
+            self.put(key, data)
+
+        return data
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """Return (last used time, size in bytes, path) of each entry"""
+        entries = []
+        for item in os.scandir(self.directory):
+            if not item.is_dir() or item.name in ('stat',) or \
+                    item.name.startswith('.'):
+                continue
+            try:
+                size = sum(file.stat().st_size
+                           for file in os.scandir(item.path))
+                last_used = os.stat(os.path.join(item.path,
+                                                 'meta.json')).st_mtime
+            except OSError:
+                continue
+            entries.append((last_used, size, item.path))
+
+        return entries
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the total size of the
+        cache is at most max_bytes"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            # Entries memory-mapped by another process may not be removable
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+        return None
+
+    def clear(self) -> None:
+        """Remove every entry of the cache"""
+        for _, _, path in self.entries():
+            shutil.rmtree(path, ignore_errors=True)
+
+        return None
+
+
+def _write_json_atomic(filepath: str, record: Mapping) -> None:
+    """Write a json file through a temporary file and rename"""
+    directory = os.path.dirname(filepath)
+    handle, temporary = tempfile.mkstemp(prefix='.tmp-', dir=directory)
+    with os.fdopen(handle, 'wt', encoding='UTF-8') as file:
+        json.dump(record, file)
+    os.replace(temporary, filepath)
+
+    return None
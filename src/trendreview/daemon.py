@@ -0,0 +1,425 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:12:27 2026
+
+@author: jvorsten
+
+Resident review worker
+Starting python -m trendreview for each trend file pays for the interpreter,
+imports and the matplotlib font cache every time. The daemon pays for them
+once: it imports the equipment rules (whose rule plans are compiled when
+their class is defined), renders a figure, and then reviews jobs with a
+figure template kept open between jobs
+
+Jobs are JSON objects, one per line, read from stdin or from connections to
+a local socket. Each job is answered by one JSON line, in order
+{"id": 1, "filepath": "c:/trends/DD03.csv", "type": "ddvav",
+ "report_path": "c:/reports/DD03.txt"}
+{"id": 1, "status": "ok", "issues": 3, "seconds": 0.04,
+ "reports": {"text": "c:/reports/DD03.txt"}}
+A job which fails is answered with "status": "error" and an "error"
+message, and later jobs are still reviewed
+
+Optional keys of a job (see JOB_OPTIONS), like the command line options:
+report_formats, all_faults, chunksize, datetime_header, graph_columns,
+clean, target_width and decimation. Report files are emptied before the
+job unless "append" is true. Jobs are reviewed one at a time, even from
+several connections; start more daemons to review files in parallel
+
+Security
+Jobs are not authenticated. Any process of this computer which can connect
+to the socket (limited by the permissions of the socket file) or to the
+TCP port (any local user) can submit jobs, and a job writes its reports to
+report_path. Start the daemon with a report root (--report-root) to reject
+jobs whose report files are outside of it. --port requires a report root.
+A socket which is in use by a running daemon is not replaced
+
+Example
+python -m trendreview.daemon < jobs.jsonl > results.jsonl
+python -m trendreview.daemon --socket /tmp/trendreview.sock
+python -m trendreview.daemon --port 8765 --report-root c:/reports
+results = submit(jobs, socket_path='/tmp/trendreview.sock')
+"""
+
+# Python imports
+from typing import Callable, Dict, Iterable, List, Mapping
+import argparse
+import contextlib
+import errno
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+# Third party imports
+
+# Local imports
+from trendreview.equipment import (BUILTIN_EQUIPMENT, equipment_class,
+                                   is_registered)
+from trendreview.options import REPORT_FORMATS, DECIMATION_METHODS
+
+# Declarations
+REQUIRED_KEYS = ['filepath', 'type', 'report_path']
+# Optional keys of a job, and their default values
+JOB_OPTIONS = {
+    'id': None,
+    'append': False,
+    'report_formats': ['text'],
+    'all_faults': False,
+    'chunksize': None,
+    'datetime_header': 'DateTime',
+    'graph_columns': None,
+    'clean': None,
+    'target_width': None,
+    'decimation': 'minmax',
+}
+LOCALHOST = '127.0.0.1'
+
+# %%
+
+
+class JobError(ValueError):
+    """A job is not valid"""
+
+
+def parse_job(line: str) -> Dict:
+    """Parse a JSON line into a job with every key of JOB_OPTIONS
+    inputs
+    -------
+    line: (str) JSON object with the keys REQUIRED_KEYS and optionally the
+    keys of JOB_OPTIONS
+    outputs
+    -------
+    job: (dict)"""
+    try:
+        job = json.loads(line)
+    except json.JSONDecodeError as error:
+        raise JobError(f"Job is not valid JSON: {error}") from None
+    if not isinstance(job, dict):
+        raise JobError("Job must be a JSON object")
+    missing = [key for key in REQUIRED_KEYS if key not in job]
+    unknown = set(job).difference(REQUIRED_KEYS, JOB_OPTIONS)
+    if missing or unknown:
+        raise JobError(f"Job is missing keys {missing} or has unknown " +
+                       f"keys {sorted(unknown)}")
+    if job['type'] != 'GraphAll' and not is_registered(job['type']):
+        raise JobError(f"Unknown equipment type {job['type']}")
+    job = dict(JOB_OPTIONS, **job)
+    if isinstance(job['report_formats'], str):
+        job['report_formats'] = [job['report_formats']]
+    if set(job['report_formats']).difference(REPORT_FORMATS) or \
+            job['decimation'] not in DECIMATION_METHODS:
+        raise JobError(f"Report formats must be in {REPORT_FORMATS} and " +
+                       f"decimation in {DECIMATION_METHODS}")
+
+    return job
+
+
+def _job_id(line: str):
+    """id of a job which is not valid, or None"""
+    try:
+        return json.loads(line).get('id')
+    except (ValueError, AttributeError):
+        return None
+
+
+class ReviewDaemon:
+    """Review jobs in a process which stays warm between jobs
+
+    Example
+    daemon = ReviewDaemon()
+    daemon.warm_up()
+    result = daemon.review('{"filepath": ..., "type": ..., ...}')
+    daemon.close()
+    """
+
+    def __init__(self, cache_directory: str = None, cache_size: int = 1024,
+                 checkpoint_directory: str = None, report_root: str = None):
+        """inputs
+        -------
+        cache_directory: (str) cache parsed trend files in this directory,
+        see cache.TrendCache. When None (default) files are always parsed
+        cache_size: (int) maximum size of the cache in MB
+        checkpoint_directory: (str) save checkpoints of reviewed files in
+        this directory, so files which were appended to are reviewed
+        incrementally, see incremental. When None (default) whole files
+        are reviewed
+        report_root: (str) jobs must write their reports within this
+        directory, see module documentation. When None (default) reports
+        are written to any path"""
+        self.cache_directory = cache_directory
+        self.cache_size = cache_size
+        self.checkpoint_directory = checkpoint_directory
+        self.report_root = None if report_root is None \
+            else os.path.realpath(report_root)
+        self.cache = None
+        self.checkpoints = None
+        self.figure_template = None
+        # Jobs of every connection are reviewed one at a time
+        self.lock = threading.Lock()
+
+        return None
+
+    def warm_up(self) -> None:
+        """Import the rules of built-in equipment and render a figure, so
+        the first job is as fast as later jobs"""
+        from trendreview.reporting import FigureTemplate
+        from trendreview.cache import TrendCache
+        from trendreview.incremental import CheckpointStore
+        import trendreview.GraphAll  # noqa: F401
+        import numpy as np
+        for name in BUILTIN_EQUIPMENT:
+            equipment_class(name)
+        if self.cache_directory is not None and self.cache is None:
+            self.cache = TrendCache(self.cache_directory,
+                                    max_bytes=self.cache_size * 2**20)
+        if self.checkpoint_directory is not None and self.checkpoints is None:
+            self.checkpoints = CheckpointStore(self.checkpoint_directory)
+        if self.figure_template is None:
+            self.figure_template = FigureTemplate()
+        # Load fonts and the renderer
+        fig = self.figure_template.render({
+            'primary_axis_label': 'DateTime',
+            'dependent_axis_labels': ['Value'],
+            'DateTime': np.arange('2022-01-01', '2022-01-03',
+                                  dtype='datetime64[D]'),
+            'Value': np.array([0.0, 1.0])}, {})
+        fig.savefig(io.BytesIO(), dpi='figure', format='png',
+                    bbox_inches='tight')
+
+        return None
+
+    def review(self, line: str) -> Dict:
+        """Review the job of a JSON line, and return its result"""
+        start = time.perf_counter()
+        job_id = None
+        try:
+            job = parse_job(line)
+            job_id = job['id']
+            with self.lock:
+                result = self._review(job)
+        except Exception as error:  # Answer every job, see module
+            job_id = job_id if job_id is not None else _job_id(line)
+            result = {'status': 'error',
+                      'error': f"{type(error).__name__}: {error}"}
+        result = dict({'id': job_id}, **result)
+        result['seconds'] = time.perf_counter() - start
+
+        return result
+
+    def check_report_path(self, report_path: str) -> None:
+        """Raise JobError if report_path is not within the report root"""
+        if self.report_root is None:
+            return None
+        path = os.path.realpath(report_path)
+        if os.path.commonpath([self.report_root, path]) != self.report_root:
+            raise JobError(f"Reports must be within {self.report_root}. " +
+                           f"Got {report_path}")
+
+        return None
+
+    def _review(self, job: Mapping) -> Dict:
+        """Review a parsed job, see parse_job"""
+        from trendreview.reporting import FDDReporting, report_filepaths
+        from trendreview.trendreview import review_file
+        log_filepath = os.path.abspath(job['report_path'])
+        reports = report_filepaths(log_filepath, job['report_formats'])
+        for report_filepath in reports.values():
+            self.check_report_path(report_filepath)
+        if self.figure_template is None:
+            self.warm_up()
+        if not job['append']:
+            for report_filepath in reports.values():
+                open(report_filepath, 'wb').close()
+        reporter = FDDReporting(log_filepath,
+                                target_width=job['target_width'],
+                                decimation=job['decimation'],
+                                report_formats=job['report_formats'],
+                                figure_template=self.figure_template)
+        # Notices printed by rules must not mix with results on stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            try:
+                review_file(os.path.abspath(job['filepath']), job['type'],
+                            reporter,
+                            independent_axis_name=job['datetime_header'],
+                            graph_columns=job['graph_columns'],
+                            all_faults=job['all_faults'],
+                            chunksize=job['chunksize'], cache=self.cache,
+                            clean=job['clean'], checkpoints=self.checkpoints)
+            finally:
+                reporter.close()
+
+        return {'status': 'ok', 'issues': reporter.log_index - 1,
+                'reports': reports}
+
+    def serve(self, lines: Iterable[str], write: Callable[[str], None]
+              ) -> None:
+        """Review the job of each line and write a result line for it.
+        Blank lines are skipped"""
+        for line in lines:
+            if line.strip():
+                write(json.dumps(self.review(line)) + '\n')
+
+        return None
+
+    def close(self) -> None:
+        """Close the figure template"""
+        if self.figure_template is not None:
+            self.figure_template.close()
+            self.figure_template = None
+
+        return None
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    """Review the jobs of a connection, see ReviewDaemon.serve"""
+
+    def handle(self):
+        def write(text: str) -> None:
+            self.wfile.write(text.encode('UTF-8'))
+            self.wfile.flush()
+        self.server.daemon.serve(
+            (line.decode('UTF-8') for line in self.rfile), write)
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:  # Windows
+    _UnixServer = None
+
+
+def _socket_in_use(socket_path: str) -> bool:
+    """True if a server accepts connections on the unix socket"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+
+    return True
+
+
+def create_server(daemon: ReviewDaemon, socket_path: str = None,
+                  port: int = None) -> socketserver.BaseServer:
+    """Create a server which reviews jobs of connections to a unix socket
+    at socket_path, or to a TCP port of this computer (127.0.0.1). Call
+    serve_forever() to accept connections. Raises OSError (EADDRINUSE) if
+    another daemon accepts connections on the socket or port
+    outputs
+    -------
+    server: (socketserver.BaseServer) with the attribute daemon"""
+    if socket_path is not None:
+        if _UnixServer is None:
+            raise ValueError("Unix sockets are not supported, use a port")
+        if os.path.exists(socket_path):
+            if _socket_in_use(socket_path):
+                raise OSError(errno.EADDRINUSE, "A daemon is already " +
+                              "accepting jobs on the socket", socket_path)
+            os.remove(socket_path)  # Left by a daemon which was stopped
+        server = _UnixServer(socket_path, _JobHandler)
+    else:
+        server = _TCPServer((LOCALHOST, port), _JobHandler)
+    server.daemon = daemon
+
+    return server
+
+
+def submit(jobs: Iterable[Mapping], socket_path: str = None,
+           port: int = None) -> List[Dict]:
+    """Send jobs to a running daemon and return the result of each job
+    inputs
+    -------
+    jobs: (iterable) of jobs, see parse_job
+    socket_path: (str) unix socket of the daemon, or None to connect to port
+    port: (int) TCP port of the daemon on this computer"""
+    if socket_path is not None:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(socket_path)
+    else:
+        connection = socket.create_connection((LOCALHOST, port))
+    with connection, connection.makefile('rwb') as file:
+        results = []
+        for job in jobs:
+            file.write((json.dumps(job) + '\n').encode('UTF-8'))
+            file.flush()
+            results.append(json.loads(file.readline()))
+
+    return results
+
+
+parser = argparse.ArgumentParser(
+    description=('Review trend files sent as JSON lines on stdin, or to a ' +
+                 'local socket, in one long-running process'))
+parser.add_argument('--socket', type=os.path.abspath, required=False,
+                    dest='socket_path', default=None,
+                    help='Accept jobs on this unix socket')
+parser.add_argument('--port', type=int, required=False, dest='port',
+                    default=None,
+                    help='Accept jobs on this TCP port of 127.0.0.1')
+parser.add_argument('--cache-dir', type=os.path.abspath, required=False,
+                    dest='cache_directory', default=None,
+                    help=('Cache parsed trend files in this directory ' +
+                          '(default: no cache)'))
+parser.add_argument('--cache-size', type=int, required=False,
+                    dest='cache_size', default=1024,
+                    help='Maximum size of the cache in MB (default: 1024)')
+parser.add_argument('--checkpoint-dir', type=os.path.abspath, required=False,
+                    dest='checkpoint_directory', default=None,
+                    help=('Review only rows appended to files since they ' +
+                          'were last reviewed, with checkpoints saved in ' +
+                          'this directory (default: review whole files)'))
+parser.add_argument('--report-root', type=os.path.abspath, required=False,
+                    dest='report_root', default=None,
+                    help=('Reject jobs with reports outside of this ' +
+                          'directory. Required with --port, which accepts ' +
+                          'jobs of any local user (default: any directory)'))
+
+
+def main(parser: argparse.ArgumentParser):
+    """Entrypoint. Review jobs from stdin until it is closed, or from a
+    socket until the process is interrupted"""
+    namespace = parser.parse_args()
+    if namespace.port is not None and namespace.report_root is None:
+        parser.error("--port requires --report-root, see module " +
+                     "documentation")
+    daemon = ReviewDaemon(namespace.cache_directory, namespace.cache_size,
+                          namespace.checkpoint_directory,
+                          namespace.report_root)
+    daemon.warm_up()
+    try:
+        if namespace.socket_path is None and namespace.port is None:
+            def write(text: str) -> None:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            daemon.serve(sys.stdin, write)
+            return None
+
+        server = create_server(daemon, namespace.socket_path, namespace.port)
+        print(f"Reviewing jobs on {namespace.socket_path or namespace.port}",
+              file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if namespace.socket_path is not None:
+                os.remove(namespace.socket_path)
+    finally:
+        daemon.close()
+
+    return None
+
+
+if __name__ == '__main__':
+    sys.exit(main(parser))
@@ -8,22 +8,48 @@ Remove bad lines from a .csv file based on a set of rules
 word characters then remove the line
 
 Lines are read from an existing .csv file, and written to a new file if the line passes
-both rules listed. This script does NOT check for headers
+every filter. The first line of the file is the header, and is always written
+
+Pipeline (see clean_csv)
+Every filter is applied to each line in one pass, then empty fields of the
+remaining lines are optionally filled with the previous line. Large files
+are split into byte ranges at line boundaries and cleaned by a pool of
+worker processes. Filling empty fields depends on the previous line, so
+each worker fills within its range and the first lines of each range are
+completed in order by the main process. Output is written in input order and
+is identical to cleaning the file in one process.
+Fields must not contain line breaks, which trend exports do not
+
+Frames (see clean_frame)
+The same filters applied to a whole block of text loaded into a dataframe,
+using pandas string and null operations instead of a loop over lines. Used
+to clean a trend file while it is loaded for review, without writing an
+intermediate file
 
 author John Vorsten
 """
 
 # Python imports
+from concurrent.futures import (ProcessPoolExecutor, Future, wait,
+                                FIRST_COMPLETED)
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 import csv
-from typing import List, Callable
+import io
 import os
 
 # Third party imports
+import numpy as np
+import pandas as pd
 
 # Local imports
+from trendreview.options import CLEANING_STEPS
 
 # Declarations
 DEFAULT_OUTPUT_CSV = 'clean_csv.csv'
+DEFAULT_CHUNK_BYTES = 2**24  # 16 MiB
+ENCODING = 'UTF-8'
+Filter = Callable[[List[str]], bool]
 
 # Rules for line deletion
 
@@ -102,41 +128,238 @@ def _replace_empty_with_previous_value(line: List[str], previous_line: List[str]
 
     return line
 
-def main(input_filepath: str, *filters:Callable, output_filepath:str=None) -> None:
+def _is_line_alphabetic(line: List[str]) -> bool:
+    """Inverse of _is_line_primarily_numeric, True for lines to remove"""
+    return not _is_line_primarily_numeric(line)
+
+
+def _is_number_of_columns_mismatched(line: List[str], n_headers: int) -> bool:
+    """Inverse of _is_number_of_colmns_match_header_columns, True for lines
+    to remove"""
+    return not _is_number_of_colmns_match_header_columns(line, n_headers)
+
+
+# Filters by name. Each returns a filter given the header line, and a filter
+# returns True for lines to remove
+FILTERS: Dict[str, Callable[[List[str]], Filter]] = {
+    'empty': lambda header: _is_line_empty,
+    'any-empty': lambda header: _is_any_text_empty,
+    'alphabetic': lambda header: _is_line_alphabetic,
+    'columns': lambda header: partial(_is_number_of_columns_mismatched,
+                                      n_headers=len(header)),
+}
+
+
+def clean_frame(data: pd.DataFrame, steps: Iterable[str] = CLEANING_STEPS,
+                threshold: float = 0.05) -> pd.DataFrame:
+    """Vectorized equivalent of clean_csv for a block of lines loaded as a
+    dataframe of text
+    inputs
+    -------
+    data: (pd.DataFrame) one column per header. Missing values (NaN) and
+    empty strings are empty fields
+    steps: (iterable) of CLEANING_STEPS. Rows are removed by every filter,
+    then empty fields are filled with the previous row when 'fill' is given
+    threshold: (float) alphabetic ratio, see _is_line_primarily_numeric
+    outputs
+    -------
+    data: (pd.DataFrame) the remaining rows as text, with a new index"""
+    steps = set(steps)
+    unknown = steps.difference(CLEANING_STEPS)
+    if unknown:
+        raise ValueError(f"Cleaning steps must be in {CLEANING_STEPS}. " +
+                         f"Got {sorted(unknown)}")
+    text = data.fillna('').astype(str)
+    values = text.to_numpy(dtype=object)
+    empty = values == ''
+    keep = np.ones(values.shape[0], dtype=bool)
+
+    if 'empty' in steps:
+        keep &= ~empty.all(axis=1)
+    if 'any-empty' in steps:
+        keep &= ~empty.any(axis=1)
+    if 'columns' in steps:
+        keep &= (~empty).sum(axis=1) == values.shape[1]
+    if 'alphabetic' in steps:
+        cells = pd.Series(values.ravel(), dtype=object)
+        numeric = cells.str.replace('.', '', n=1, regex=False)\
+            .str.isnumeric().to_numpy(dtype=bool).reshape(values.shape)
+        alphabetic = cells.str.isalpha().to_numpy(dtype=bool)\
+            .reshape(values.shape) & ~numeric
+        n_numeric = numeric.sum(axis=1)
+        n_alphabetic = alphabetic.sum(axis=1)
+        n_total = n_numeric + n_alphabetic
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = n_alphabetic / n_total
+        keep &= (n_total > 0) & (ratio < threshold)
+
+    text = text.loc[keep].reset_index(drop=True)
+    if 'fill' in steps:
+        text = text.replace('', np.nan).ffill().fillna('')
+
+    return text
+
+
+def _fill_empty(line: List[str], previous_line: Optional[List[str]]
+                ) -> List[str]:
+    """_replace_empty_with_previous_value for lines which may be longer than
+    the previous line, or the first line (previous_line is None)"""
+    if previous_line is None:
+        return line
+    for index, text in enumerate(line[:len(previous_line)]):
+        if text == '':
+            line[index] = previous_line[index]
+
+    return line
+
+
+def _line_ranges(input_filepath: str, chunk_bytes: int
+                 ) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """Return the header line and byte ranges of the remaining lines. Each
+    range starts at the beginning of a line and ends after a line break"""
+    with open(input_filepath, 'rb') as file:
+        header_line = file.readline()
+        size = os.fstat(file.fileno()).st_size
+        boundaries = [file.tell()]
+        while boundaries[-1] < size:
+            file.seek(max(boundaries[-1] + chunk_bytes - 1, boundaries[-1]))
+            file.readline()  # Move to the start of the next line
+            boundaries.append(min(file.tell(), size))
+    header = next(csv.reader([header_line.decode(ENCODING)]), [])
+
+    return header, list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def _clean_range(input_filepath: str, start: int, end: int,
+                 filters: List[Filter], fill_empty: bool
+                 ) -> Tuple[List[List[str]], str, Optional[List[str]]]:
+    """Clean the lines within a byte range of a file
+    outputs
+    -------
+    head: (list) of leading lines which still contain empty fields, to be
+    filled with the lines before this range (only when fill_empty)
+    text: (str) csv text of the lines after head
+    last_line: (list) the last kept line, or None when no line is kept"""
+    with open(input_filepath, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode(ENCODING)
+
+    lines = []
+    previous_line = None
+    for line in csv.reader(io.StringIO(text, newline=''), delimiter=',',
+                           quotechar='"', quoting=csv.QUOTE_MINIMAL):
+        if any(filter_func(line) for filter_func in filters):
+            continue
+        if fill_empty:
+            previous_line = _fill_empty(line, previous_line)
+        lines.append(line)
+
+    n_head = 0
+    if fill_empty:
+        for index, line in enumerate(lines):
+            if '' in line:
+                n_head = index + 1
+
+    output = io.StringIO(newline='')
+    writer = csv.writer(output, delimiter=',', quotechar='"',
+                        quoting=csv.QUOTE_MINIMAL)
+    writer.writerows(lines[n_head:])
+
+    return lines[:n_head], output.getvalue(), (lines[-1] if lines else None)
+
+
+def clean_csv(input_filepath: str, output_filepath: str,
+              filters: Iterable[Union[str, Filter]] = (),
+              fill_empty: bool = False,
+              workers: int = 1,
+              chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> None:
+    """Write the lines of a .csv file which pass every filter to a new file
+    inputs
+    -------
+    input_filepath: (str) .csv file to clean
+    output_filepath: (str) cleaned .csv file to create
+    filters: (iterable) of filter names (see FILTERS) or functions of a
+    line (list of str) returning True for lines to remove. Functions must be
+    defined at module level when workers > 1
+    fill_empty: (bool) replace empty fields of a line with the field of the
+    previous written line
+    workers: (int) number of worker processes (default: 1, clean within
+    this process). None for the number of CPUs
+    chunk_bytes: (int) approximate size of the byte range of each job"""
+    header, ranges = _line_ranges(input_filepath, chunk_bytes)
+    filters = [FILTERS[filter_func](header) if isinstance(filter_func, str)
+               else filter_func for filter_func in filters]
+    workers = workers or os.cpu_count() or 1
+
+    with open(output_filepath, 'wt', encoding=ENCODING, newline='') as output_file:
+        writer = csv.writer(output_file, delimiter=',',
+                            quotechar='"', quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(header)
+        previous_line: List[str] = None
+
+        def write(result):
+            nonlocal previous_line
+            head, text, last_line = result
+            for line in head:
+                previous_line = _fill_empty(line, previous_line)
+                writer.writerow(line)
+            output_file.write(text)
+            if text:
+                previous_line = last_line
+
+        if workers == 1:
+            for start, end in ranges:
+                write(_clean_range(input_filepath, start, end, filters,
+                                   fill_empty))
+            return None
+
+        # Results are written in input order as soon as they are available
+        completed: Dict[int, Tuple] = {}
+        next_index = 0
+        pending: Dict[Future, int] = {}
+        jobs = enumerate(ranges)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                for index, (start, end) in jobs:
+                    future = executor.submit(
+                        _clean_range, input_filepath, start, end, filters,
+                        fill_empty)
+                    pending[future] = index
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    completed[pending.pop(future)] = future.result()
+                while next_index in completed:
+                    write(completed.pop(next_index))
+                    next_index += 1
+
+    return None
+
+
+def main(input_filepath: str, *filters: Filter, output_filepath: str = None) -> None:
     """Main function for data filtering operations
+    Lines for which any filter returns True are removed
     Example
     -------
     from data_cleaning_utilities import _is_line_empty, _is_number_of_colmns_match_header_columns, _is_any_text_empty
 
     def custom_filter_factory_function(line: List[str]):
         n_headers = 6 # We expect 6 header columns
-        return _is_number_of_colmns_match_header_columns(line, n_headers)
+        return not _is_number_of_colmns_match_header_columns(line, n_headers)
 
     filters = [_is_line_empty, custom_filter_factory_function, _is_any_text_empty]
     input_filepath = './path/to/input_file.csv'
     output_filepath = './path/to/output_file.csv'
-    main(input_filepath, filters, output_filepath)
+    main(input_filepath, *filters, output_filepath=output_filepath)
 
     """
-    output_filepath = os.path.join(os.path.dirname(input_filepath), DEFAULT_OUTPUT_CSV)
-
-    with open(input_filepath, 'rt', encoding='UTF-8') as input_file, \
-            open(output_filepath, 'wt', encoding='UTF-8', newline='') as output_file:
-        # Iterate line by line
-        reader = csv.reader(input_file, delimiter=',',
-                            quotechar='"', quoting=csv.QUOTE_MINIMAL)
-        writer = csv.writer(output_file, delimiter=',',
-                            quotechar='"', quoting=csv.QUOTE_MINIMAL)
-
-        row: List[str]
-        for row in reader:
-            # Filter out rows based on the input filters passed
-            for filter_func in filters:
-                if filter_func(row):
-                    # If the filter evaluates to true then we do not want the line anymore
-                    # Do not write it to the clean file
-                    pass
-                else:
-                    writer.writerow(row)
+    if output_filepath is None:
+        output_filepath = os.path.join(
+            os.path.dirname(input_filepath), DEFAULT_OUTPUT_CSV)
+    clean_csv(input_filepath, output_filepath, filters=filters)
 
     return None
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:40:26 2026
+
+@author: jvorsten
+
+Datetime parsing for trend files
+Parsing text datetimes without a format makes pandas infer the format of
+each value, which is the slowest part of reading a trend file when the
+datetime is not ISO 8601 (for example separate Date and Time columns like
+11/19/2021,0:00). Instead, the format is sniffed from the first values of a
+column and the whole column is parsed with that explicit format.
+Values of a column which do not match its format are parsed with the other
+candidate formats of the same day and month order. Values which match none
+are parsed by pandas, or are NaT, with a DatetimeFormatWarning naming their
+rows, so dates are not silently read with days and months swapped.
+Separate date and time columns repeat the same values on many rows, so only
+their unique values are parsed
+
+Example
+data = pd.read_csv(filepath, dtype={'DateTime': str})
+formats = parse_date_columns(data, ['DateTime'])
+# Later chunks of the same file reuse the sniffed formats
+parse_date_columns(next_chunk, ['DateTime'], formats)
+"""
+
+# Python imports
+from typing import Dict, Iterable, List, Optional, Tuple
+import warnings
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+
+# Declarations
+# Candidate formats, in order of preference. Ambiguous dates (month and day
+# both <= 12) are parsed month first, like the building automation systems
+# which export these trends
+DATETIME_FORMATS = [
+    '%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f',
+    '%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %I:%M %p', '%m/%d/%Y %I:%M:%S %p',
+    '%m/%d/%y %H:%M', '%m/%d/%y %H:%M:%S',
+    '%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S',
+    '%Y/%m/%d %H:%M', '%Y/%m/%d %H:%M:%S',
+    '%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y', '%d/%m/%Y', '%Y/%m/%d',
+]
+DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y', '%d/%m/%Y', '%Y/%m/%d']
+TIME_FORMATS = ['%H:%M', '%H:%M:%S', '%H:%M:%S.%f', '%I:%M %p',
+                '%I:%M:%S %p']
+# Spreadsheet serial dates (days since 1899-12-30), like 44519
+EXCEL_FORMAT = 'excel'
+EXCEL_ORIGIN = pd.Timestamp('1899-12-30')
+# Headers of separate date and time columns, see combine_date_time
+DATE_TIME_HEADERS = ('Date', 'Time')
+SNIFF_SAMPLES = 100
+MAX_WARNED_ROWS = 10  # Rows listed in a warning
+
+# %%
+
+
+class DatetimeFormatWarning(UserWarning):
+    """Values of a datetime column do not match the format of the column"""
+    pass
+
+
+def _day_month_order(fmt: Optional[str]) -> Optional[str]:
+    """'day' or 'month' for formats with the day before or after the
+    month, like %d/%m/%Y or %m/%d/%Y. None for formats which are not
+    ambiguous (year first, times of day or spreadsheet serial dates)"""
+    if fmt is None or fmt == EXCEL_FORMAT or fmt.startswith('%Y'):
+        return None
+    day, month = fmt.find('%d'), fmt.find('%m')
+    if day < 0 or month < 0:
+        return None
+
+    return 'day' if day < month else 'month'
+
+
+def _is_excel_serial(values: np.ndarray) -> bool:
+    """True if every value is a number (a spreadsheet serial date)"""
+    numbers = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+
+    return bool(np.all(np.isfinite(numbers.to_numpy(dtype=np.float64))))
+
+
+def _parse_values(values: np.ndarray, fmt: str,
+                  errors: str = 'raise') -> np.ndarray:
+    """Parse an array of text with an explicit format. Values which do not
+    match are NaT when errors is 'coerce', otherwise ValueError is raised"""
+    if fmt == EXCEL_FORMAT:
+        days = pd.to_numeric(pd.Series(values, dtype=object), errors=errors)
+        return (EXCEL_ORIGIN + pd.to_timedelta(days.to_numpy(dtype=np.float64),
+                                               unit='D')).to_numpy()
+
+    return pd.to_datetime(values, format=fmt, exact=True,
+                          errors=errors).to_numpy()
+
+
+def sniff_datetime_format(values: Iterable[str],
+                          formats: List[str] = None,
+                          n_samples: int = SNIFF_SAMPLES) -> Optional[str]:
+    """Return the first format which parses the first n_samples non-missing
+    values. When no format parses every value (like a column with #N/A
+    values), the format which parses most values, if it parses more than
+    half of them. None when no format matches
+    inputs
+    -------
+    values: (iterable) of text datetimes
+    formats: (list) of candidate strptime formats, or EXCEL_FORMAT
+    (default: DATETIME_FORMATS)
+    n_samples: (int) number of values tested"""
+    if formats is None:
+        formats = DATETIME_FORMATS
+    samples = pd.Series(values, dtype=object).iloc[:10 * n_samples].dropna()
+    samples = samples.iloc[:n_samples].astype(str).str.strip().to_numpy()
+    if samples.shape[0] == 0:
+        return None
+    best, best_count = None, samples.shape[0] // 2
+    for fmt in formats:
+        if fmt == EXCEL_FORMAT and not _is_excel_serial(samples):
+            continue
+        try:
+            count = np.count_nonzero(
+                ~np.isnat(_parse_values(samples, fmt, errors='coerce')))
+        except (ValueError, TypeError, OverflowError):
+            continue
+        if count == samples.shape[0]:
+            return fmt
+        if count > best_count:
+            best, best_count = fmt, count
+
+    return best
+
+
+def _parse_with_fallback(values: np.ndarray, fmt: Optional[str],
+                         formats: List[str], errors: str = 'coerce'
+                         ) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                    Optional[str]]:
+    """Parse values with fmt, then values which do not match fmt with the
+    other candidate formats of the same day and month order, then the rest
+    with pandas inference. Returns the datetimes, masks of the values parsed
+    by pandas and of the values which could not be parsed (NaT), and the
+    day and month order of the values (see _day_month_order)"""
+    # Files concatenated from several exports may mix formats, but not the
+    # order of days and months
+    missing = pd.isna(values)
+    candidates = [fmt] if fmt is not None else []
+    candidates += [candidate for candidate in formats if candidate != fmt]
+    order = _day_month_order(fmt)
+    parsed = _parse_values(values, candidates[0], errors='coerce')
+    remaining = np.isnat(parsed) & ~missing
+    if order is None and not np.isnat(parsed).all():
+        order = _day_month_order(candidates[0])
+    for candidate in candidates[1:]:
+        if not remaining.any():
+            break
+        candidate_order = _day_month_order(candidate)
+        if order is not None and candidate_order not in (None, order):
+            continue
+        parsed[remaining] = _parse_values(values[remaining], candidate,
+                                          errors='coerce')
+        if candidate_order is not None and \
+                not np.isnat(parsed[remaining]).all():
+            order = candidate_order
+        remaining &= np.isnat(parsed)
+    inferred = remaining.copy()
+    if remaining.any():
+        parsed[remaining] = pd.to_datetime(values[remaining], errors=errors,
+                                           dayfirst=order == 'day').to_numpy()
+        remaining &= np.isnat(parsed)
+        inferred &= ~remaining
+
+    return parsed, inferred, remaining, order
+
+
+def _warn_rows(name: Optional[str], order: Optional[str], rows: np.ndarray,
+               inferred: np.ndarray, failed: np.ndarray) -> None:
+    """Warn of values parsed by pandas and of values which are NaT, see
+    parse_datetimes. rows are the row labels of the values"""
+    column = '' if name is None else f' of column {name!r}'
+    expected = 'candidate format' if order is None \
+        else f'{order} first format'
+    for mask, result in ((inferred, 'were parsed by pandas inference'),
+                         (failed, 'are NaT')):
+        if not mask.any():
+            continue
+        labels = rows[mask]
+        listed = ', '.join(str(label) for label in labels[:MAX_WARNED_ROWS])
+        if labels.shape[0] > MAX_WARNED_ROWS:
+            listed += ', ...'
+        warnings.warn(f"{labels.shape[0]} values{column} match no " +
+                      f"{expected}, and {result} " +
+                      f"(rows {listed})", DatetimeFormatWarning,
+                      stacklevel=3)
+
+    return None
+
+
+def parse_datetimes(values: Iterable[str], fmt: str = None,
+                    formats: List[str] = None, errors: str = 'coerce',
+                    name: str = None) -> np.ndarray:
+    """Parse text datetimes into a datetime64[ns] array. Missing values are
+    NaT
+    inputs
+    -------
+    values: (iterable) of text datetimes. The index of a pd.Series is used
+    as the rows of values in warnings
+    fmt: (str) format of values. When None, the format is sniffed (see
+    sniff_datetime_format)
+    formats: (list) of candidate formats used when sniffing, and to parse
+    values which do not match fmt
+    errors: (str) 'coerce' to return NaT for values which can not be
+    parsed, or 'raise' to raise ValueError
+    name: (str) name of the column, used in warnings
+    outputs
+    -------
+    datetimes: (np.ndarray) of dtype datetime64[ns]. Values which do not
+    match fmt are parsed with candidate formats of the same day and month
+    order. Values which match none are parsed by pandas, which infers the
+    format of each value, or are NaT. A DatetimeFormatWarning gives the rows
+    of these values"""
+    rows = values.index.to_numpy() if isinstance(values, pd.Series) \
+        else None
+    values = pd.Series(values, dtype=object).to_numpy()
+    if rows is None:
+        rows = np.arange(values.shape[0])
+    if formats is None:
+        formats = DATETIME_FORMATS
+    if fmt is None:
+        fmt = sniff_datetime_format(values, formats)
+
+    parsed, inferred, failed, order = _parse_with_fallback(values, fmt,
+                                                           formats, errors)
+    _warn_rows(name, order, rows, inferred, failed)
+
+    return parsed
+
+
+def _parse_unique(values: Iterable[str], fmt: str,
+                  formats: List[str], name: str = None) -> np.ndarray:
+    """parse_datetimes of columns with many repeated values, like dates or
+    times of day. Each unique value is parsed once"""
+    values = pd.Series(values, dtype=object)
+    codes, uniques = pd.factorize(values)
+    uniques = uniques.to_numpy(dtype=object)
+    if fmt is None:
+        fmt = sniff_datetime_format(uniques, formats)
+    parsed, inferred, failed, order = _parse_with_fallback(uniques, fmt,
+                                                           formats)
+    # Code -1 (missing value) selects the trailing NaT or False
+    parsed = np.append(parsed, np.datetime64('NaT', 'ns'))
+    inferred, failed = np.append(inferred, False), np.append(failed, False)
+    _warn_rows(name, order, values.index.to_numpy(), inferred[codes],
+               failed[codes])
+
+    return parsed[codes]
+
+
+def combine_date_time(dates: Iterable[str], times: Iterable[str],
+                      date_format: str = None,
+                      time_format: str = None) -> np.ndarray:
+    """Parse separate date and time columns (like 11/19/2021 and 0:00) into
+    one datetime64[ns] array
+    inputs
+    -------
+    dates: (iterable) of text dates, or spreadsheet serial dates
+    times: (iterable) of text times of day
+    date_format, time_format: (str) formats of dates and times. When None,
+    the formats are sniffed from DATE_FORMATS and TIME_FORMATS"""
+    dates = _parse_unique(dates, date_format, DATE_FORMATS + [EXCEL_FORMAT],
+                          DATE_TIME_HEADERS[0])
+    # Times of day are parsed on a default date, which is removed
+    times = _parse_unique(times, time_format, TIME_FORMATS,
+                          DATE_TIME_HEADERS[1])
+
+    return dates + (times - times.astype('datetime64[D]'))
+
+
+def parse_date_columns(data: pd.DataFrame, columns: Iterable[str],
+                       formats: Dict[str, Optional[str]] = None
+                       ) -> Dict[str, Optional[str]]:
+    """Parse text columns of data into datetime64[ns] columns in place
+    inputs
+    -------
+    data: (pd.DataFrame) with text (or already parsed) columns
+    columns: (iterable) of column names to parse
+    formats: (dict) of column name to format, from a previous call on data
+    from the same file. Formats of other columns are sniffed
+    outputs
+    -------
+    formats: (dict) of column name to the format used, to parse following
+    chunks of the same file. Like pandas.read_csv, a column which can not
+    be parsed is left unchanged. Values of a column with a format which can
+    not be parsed are NaT (see parse_datetimes)"""
+    formats = dict(formats or {})
+    for column in columns:
+        if pd.api.types.is_datetime64_dtype(data[column].dtype):
+            continue
+        fmt = formats.get(column)
+        if fmt is None:
+            fmt = sniff_datetime_format(data[column])
+            formats[column] = fmt
+        try:
+            # Without a format, every value is parsed by pandas inference
+            data[column] = parse_datetimes(
+                data[column], fmt, errors='raise' if fmt is None else 'coerce',
+                name=column)
+        except (ValueError, TypeError, OverflowError):
+            continue
+
+    return formats
@@ -20,10 +20,7 @@ configurable location
 """
 
 # Python imports
-from typing import List, Callable
-import inspect
-import math
-import csv
+from typing import Dict, Union
 
 # Third party imports
 import pandas as pd
@@ -32,14 +29,11 @@ import numpy as np
 # Local imports
 from trendreview.FDDExceptions import FDDException
 from trendreview.reporting import FDDReporting
-from trendreview.helpers import (
-    masked_consecutive_elements,
-    read_csv,
-    _datetimes_to_seconds_deviation_from_start,
-    _hour_segment_indices_from_seconds,
-    maximum_allowed_failures,
-    maximum_consecutive_failures,
-    failure_threshold_exceeded)
+from trendreview.equipment import register_equipment
+from trendreview.rules import EquipmentRules
+from trendreview.engine import (
+    MaskRule, HourlyDeviationRule, RulePlan, evaluate_rule,
+    both, greater, less, equal, abs_difference_greater)
 # Declarations
 DDVAV_HEADERS = [
     'DateTime', 'DischargeTemperature', 'CoolingDamperCommand',
@@ -70,56 +64,114 @@ UNUSED_DDVAV_TYPES = {
     'AirflowSetpoint': np.float32,  # Not used
 }
 
+# Rule configuration
+AIRFLOW_TOLERANCE = 10  # [cfm] Tolerance for considering airflow at zero
+DAMPER_TOLERANCE = 5  # [%] Allowed difference of damper command and position
+DAMPER_CLOSED_TOLERANCE = 2  # [%] Damper position considered closed
+FAILURE_PERCENT = 0.02
+FAILURE_CONSECUTIVE = 3
+DEVIATION_THRESHOLD = 1  # [Degree * hour] per hour measured
+
+# Rules evaluated by DDVAVRules. Rule names match the DDVAVRules method
+# which applies the rule
+DDVAV_RULES = [
+    MaskRule(
+        'rule_simultaneous_heating_cooling',
+        both(greater('HeatingAirVolume', AIRFLOW_TOLERANCE),
+             greater('CoolingAirVolume', AIRFLOW_TOLERANCE)),
+        report_columns=["DateTime", "HeatingAirVolume", "CoolingAirVolume"],
+        error_msg=("Simultaneous heating and cooling: HeatingAirVolume and " +
+                   "CoolingAirVolume are both > 0"),
+        failure_percent=FAILURE_PERCENT,
+        failure_consecutive=FAILURE_CONSECUTIVE,
+        # Messages of the report before rules were compiled
+        percent_msg=("The maximum allowed instances of simultaneous heating " +
+                     "and cooling ({} at {:.0%} of samples) was exceeded " +
+                     "({} observed)"),
+        consecutive_msg=("The maximum allowed consecutive instances of " +
+                         "heating and cooling ({}) was exceeded " +
+                         "({} observed)")),
+    MaskRule(
+        'rule_heating_opposed_mode',
+        both(greater('HeatingAirVolume', AIRFLOW_TOLERANCE),
+             equal('HeatCoolMode', 'COOL')),
+        report_columns=["DateTime", "HeatingAirVolume", "HeatCoolMode"],
+        error_msg=("Heating occurs with the incorrect state in HeatCoolMode " +
+                   "HeatingAirVolume > 0 when HeatCoolMode is in 'COOL'"),
+        failure_percent=FAILURE_PERCENT,
+        failure_consecutive=FAILURE_CONSECUTIVE),
+    MaskRule(
+        'rule_cooling_opposed_mode',
+        both(greater('CoolingAirVolume', AIRFLOW_TOLERANCE),
+             equal('HeatCoolMode', 'HEAT')),
+        report_columns=["DateTime", "CoolingAirVolume", "HeatCoolMode"],
+        error_msg=("Cooling occurs with the incorrect state in HeatCoolMode " +
+                   "CoolingAirVolume > 0 when HeatCoolMode is in 'HEAT'"),
+        failure_percent=FAILURE_PERCENT,
+        failure_consecutive=FAILURE_CONSECUTIVE),
+    MaskRule(
+        'rule_cooling_damper_stuck',
+        abs_difference_greater('CoolingDamperCommand',
+                               'CoolingDamperPosition', DAMPER_TOLERANCE),
+        report_columns=["DateTime", "CoolingDamperCommand",
+                        "CoolingDamperPosition"],
+        error_msg=("Cooling damper stuck open: damper command and position " +
+                   "are >5% different"),
+        failure_percent=FAILURE_PERCENT,
+        failure_consecutive=FAILURE_CONSECUTIVE),
+    MaskRule(
+        'rule_heating_damper_stuck',
+        abs_difference_greater('HeatingDamperCommand',
+                               'HeatingDamperPosition', DAMPER_TOLERANCE),
+        report_columns=["DateTime", "HeatingDamperCommand",
+                        "HeatingDamperPosition"],
+        error_msg=("Heating damper stuck open: damper command and position " +
+                   "are >5% different"),
+        failure_percent=FAILURE_PERCENT,
+        failure_consecutive=FAILURE_CONSECUTIVE),
+    MaskRule(
+        'rule_cooling_airflow_on_closed_damper',
+        both(greater('CoolingAirVolume', AIRFLOW_TOLERANCE),
+             less('CoolingDamperPosition', DAMPER_CLOSED_TOLERANCE)),
+        report_columns=["DateTime",
+                        "CoolingAirVolume", "CoolingDamperPosition"],
+        error_msg=("Airflow measured while damper is closed:"),
+        failure_percent=FAILURE_PERCENT,
+        failure_consecutive=FAILURE_CONSECUTIVE),
+    MaskRule(
+        'rule_heating_airflow_on_closed_damper',
+        both(greater('HeatingAirVolume', AIRFLOW_TOLERANCE),
+             less('HeatingDamperPosition', DAMPER_CLOSED_TOLERANCE)),
+        report_columns=["DateTime",
+                        "HeatingAirVolume", "HeatingDamperPosition"],
+        error_msg=("Airflow measured while damper is closed:"),
+        failure_percent=FAILURE_PERCENT,
+        failure_consecutive=FAILURE_CONSECUTIVE),
+    HourlyDeviationRule(
+        'rule_room_temperature_deviation',
+        setpoint_column='ControlSetpoint',
+        process_column='RoomTemperature',
+        report_columns=["DateTime", "ControlSetpoint", "RoomTemperature"],
+        error_msg=("Excessive deviation in process variable versus setpoint. " +
+                   "{:.2f} DegF*hour calculated deviation during hour long " +
+                   "measurement period; threshold={}"),
+        failure_threshold=DEVIATION_THRESHOLD),
+]
+
 # %%
 
 
-class DDVAVRules:
+@register_equipment('ddvav')
+class DDVAVRules(EquipmentRules):
     """Collection of rules to check on trended data for dual-duct terminal
-    units"""
-
-    def __init__(self, filepath: str):
-        """Inputs
-        ------
-        filepath: (string) name of CSV file related to a dual-duct terminal
-        unit to open, parse, and apply rule checks to"""
-
-        self.csv_filepath = filepath
-        validate_input_data_headers(filepath, DDVAV_HEADERS)
-        self.data = read_csv(self.csv_filepath, DDVAV_HEADERS, DDVAV_TYPES)
-
-        return None
-
-    def evaluate_rules(self, methods: List[Callable[[pd.DataFrame], None]],
-                       reporter: FDDReporting) -> None:
-        """This is a convenience function which calls each of the methods
-        passed to it, and catches FDDExceptions thrown by each rule, then logs
-        the exceptions
-
-        Example
-        ddvavRules = DDVAVRules(filepath)
-        methods = ddvavRules.get_rules()
-        reporter = FDDReporting(log_filepath=log_filepath)
-        ddvavRules.evaluate_rules(methods, reporter)
-        # Results of faults detected in `filepath`
-        """
-        for method in methods:
-            try:
-                method(self.data)
-            except FDDException as exception:
-                reporter.log_exception(exception, create_image=True)
-        return None
-
-    def get_rules(self):
-        """Get all class member functions that start with 'rule_'"""
-
-        methods = []
-        for name in dir(self):
-            attribute = getattr(self, name)
-            if inspect.ismethod(attribute) and str(
-                    attribute).__contains__('.rule_'):
-                methods.append(attribute)
-
-        return methods
+    units. Files are read and rules evaluated by rules.EquipmentRules"""
+    headers = DDVAV_HEADERS
+    dtypes = DDVAV_TYPES
+    equipment_name = 'dual-duct VAV'
+    # Rules are compiled into one plan when the class is defined
+    rules: Dict[str, Union[MaskRule, HourlyDeviationRule]] = {
+        rule.name: rule for rule in DDVAV_RULES}
+    plan = RulePlan(DDVAV_RULES)
 
     @classmethod
     def rule_simultaneous_heating_cooling(cls, data: pd.DataFrame):
@@ -128,44 +180,8 @@ class DDVAVRules:
         1. heating and cooling volumetric flow is overlapping, where airflow >
         0 for either heating or cooling duct while the other duct is > 0 for
         more than n% ofobservations OR n consecutive observations"""
-        # Tolerance for considering airflow at zero
-        tolerance = 10
-        failure_percent = 0.02
-        failure_consecutive = 3
-        report_columns = ["DateTime", "HeatingAirVolume", "CoolingAirVolume"]
-
-        # masking and comparisons
-        heating = np.ma.array(data["HeatingAirVolume"] > tolerance)
-        cooling = np.ma.array(data["CoolingAirVolume"] > tolerance)
-        overlap = np.bitwise_and(heating, cooling)  # masked array
-        overlap_indices: tuple = overlap.nonzero()
-
-        # Failure condition n% ofovservations
-        max_overlap = math.floor(failure_percent * len(heating))
-        if overlap.sum() > max_overlap:
-            report_indices = overlap_indices[0][:max_overlap]
-            data_view = data.loc[report_indices, [
-                "DateTime", "HeatingAirVolume", "CoolingAirVolume"]].to_dict(orient='list')
-            data_view['primary_axis_label'] = report_columns[0]
-            data_view['dependent_axis_labels'] = report_columns[1:]
-            msg = ("The maximum allowed instances of simultaneous heating and " +
-                   "cooling ({} at {:.0%} of samples) was exceeded ({} observed)")
-            msg = msg.format(max_overlap, failure_percent, overlap.sum())
-            raise FDDException(msg, data_view)
-
-        # Failure condition n consecutive observations
-        consecutive_indices = masked_consecutive_elements(
-            overlap, failure_consecutive)
-        if len(consecutive_indices) > 0:
-            report_indices = consecutive_indices
-            data_view = data.loc[report_indices, [
-                "DateTime", "HeatingAirVolume", "CoolingAirVolume"]].to_dict(orient='list')
-            data_view['primary_axis_label'] = report_columns[0]
-            data_view['dependent_axis_labels'] = report_columns[1:]
-            msg = ("The maximum allowed consecutive instances of heating and " +
-                   "cooling ({}) was exceeded ({} observed)")
-            msg = msg.format(failure_consecutive, len(consecutive_indices))
-            raise FDDException(msg, data_view)
+        evaluate_rule(
+            cls.rules['rule_simultaneous_heating_cooling'], data)
 
         return None
 
@@ -177,27 +193,7 @@ class DDVAVRules:
         HeatingAirVolume > 0 when HeatCoolMode is in 'COOL'
         CoolingAirVolume > 0 when HeatCoolMode is in 'HEAT'
         """
-        # Tolerance for considering airflow at zero
-        tolerance = 10
-        failure_percent = 0.02
-        failure_consecutive = 3
-        report_columns = ["DateTime", "HeatingAirVolume", "HeatCoolMode"]
-        error_msg = ("Heating occurs with the incorrect state in HeatCoolMode " +
-                     "HeatingAirVolume > 0 when HeatCoolMode is in 'COOL'")
-
-        # masking and comparisons
-        heating = np.ma.array(data["HeatingAirVolume"] > tolerance)
-        cooling_mode = np.ma.array(data["HeatCoolMode"] == "COOL")
-        mask = np.bitwise_and(heating, cooling_mode)  # masked array
-        # overlap_indices = overlap.nonzero()
-
-        # Failure condition n% of ovservations
-        maximum_allowed_failures(
-            mask, data, failure_percent, report_columns, error_msg)
-
-        # Failure condition n consecutive observations
-        maximum_consecutive_failures(
-            mask, data, failure_consecutive, report_columns, error_msg)
+        evaluate_rule(cls.rules['rule_heating_opposed_mode'], data)
 
         return None
 
@@ -209,26 +205,7 @@ class DDVAVRules:
         HeatingAirVolume > 0 when HeatCoolMode is in 'COOL'
         CoolingAirVolume > 0 when HeatCoolMode is in 'HEAT'
         """
-        # Tolerance for considering airflow at zero
-        tolerance = 10
-        failure_percent = 0.02
-        failure_consecutive = 3
-        report_columns = ["DateTime", "CoolingAirVolume", "HeatCoolMode"]
-        error_msg = ("Cooling occurs with the incorrect state in HeatCoolMode " +
-                     "CoolingAirVolume > 0 when HeatCoolMode is in 'HEAT'")
-        # masking and comparisons
-        cooling = np.ma.array(data["CoolingAirVolume"] > tolerance)
-        heating_mode = np.ma.array(data["HeatCoolMode"] == "HEAT")
-        mask = np.bitwise_and(cooling, heating_mode)  # masked array
-        # overlap_indices = overlap.nonzero()
-
-        # Failure condition n% of ovservations
-        maximum_allowed_failures(
-            mask, data, failure_percent, report_columns, error_msg)
-
-        # Failure condition n consecutive observations
-        maximum_consecutive_failures(
-            mask, data, failure_consecutive, report_columns, error_msg)
+        evaluate_rule(cls.rules['rule_cooling_opposed_mode'], data)
 
         return None
 
@@ -238,27 +215,7 @@ class DDVAVRules:
         Rule fails if -
         1. Damper position and command are >5% different
         """
-        # configuration
-        tolerance = 5
-        failure_percent = 0.02
-        failure_consecutive = 3
-        report_columns = ["DateTime", "CoolingDamperCommand",
-                          "CoolingDamperPosition"]
-        error_msg = ("Cooling damper stuck open: damper command and position " +
-                     "are >5% different")
-
-        # masking and comparisons
-        diff = np.abs(
-            np.array(data["CoolingDamperCommand"] - data["CoolingDamperPosition"]))
-        mask = np.ma.array(diff > tolerance)
-
-        # Failure condition n% of ovservations
-        maximum_allowed_failures(
-            mask, data, failure_percent, report_columns, error_msg)
-
-        # Failure condition n consecutive observations
-        maximum_consecutive_failures(
-            mask, data, failure_consecutive, report_columns, error_msg)
+        evaluate_rule(cls.rules['rule_cooling_damper_stuck'], data)
 
         return None
 
@@ -268,27 +225,7 @@ class DDVAVRules:
         Rule fails if -
         1. Damper position and command are >5% different
         """
-        # configuration
-        tolerance = 5
-        failure_percent = 0.02
-        failure_consecutive = 3
-        report_columns = ["DateTime", "HeatingDamperCommand",
-                          "HeatingDamperPosition"]
-        error_msg = ("Heating damper stuck open: damper command and position " +
-                     "are >5% different")
-
-        # masking and comparisons
-        diff = np.abs(
-            np.array(data["HeatingDamperCommand"] - data["HeatingDamperPosition"]))
-        mask = np.ma.array(diff > tolerance)
-
-        # Failure condition n% of ovservations
-        maximum_allowed_failures(
-            mask, data, failure_percent, report_columns, error_msg)
-
-        # Failure condition n consecutive observations
-        maximum_consecutive_failures(
-            mask, data, failure_consecutive, report_columns, error_msg)
+        evaluate_rule(cls.rules['rule_heating_damper_stuck'], data)
 
         return None
 
@@ -299,28 +236,8 @@ class DDVAVRules:
         Rule fails if -
         1. Airflow is greater than 10[cfm](default) AND damper position is
         <2[%](default)"""
-        # Tolerance for considering airflow at zero
-        tolerance = 10
-        tolerance_damper = 2  # percent
-        failure_percent = 0.02
-        failure_consecutive = 3
-        report_columns = ["DateTime",
-                          "CoolingAirVolume", "CoolingDamperPosition"]
-        error_msg = ("Airflow measured while damper is closed:")
-
-        # masking and comparisons
-        airflow = np.ma.array(data["CoolingAirVolume"] > tolerance)
-        damper_closed = np.ma.array(
-            data["CoolingDamperPosition"] < tolerance_damper)
-        mask = np.bitwise_and(airflow, damper_closed)  # masked array
-
-        # Failure condition n% of ovservations
-        maximum_allowed_failures(
-            mask, data, failure_percent, report_columns, error_msg)
-
-        # Failure condition n consecutive observations
-        maximum_consecutive_failures(
-            mask, data, failure_consecutive, report_columns, error_msg)
+        evaluate_rule(
+            cls.rules['rule_cooling_airflow_on_closed_damper'], data)
 
         return None
 
@@ -331,28 +248,8 @@ class DDVAVRules:
         Rule fails if
         1. Airflow is greater than 10[cfm](default) AND damper position is
         <2[%](default)"""
-        # Tolerance for considering airflow at zero
-        tolerance = 10
-        tolerance_damper = 2  # percent
-        failure_percent = 0.02
-        failure_consecutive = 3
-        report_columns = ["DateTime",
-                          "HeatingAirVolume", "HeatingDamperPosition"]
-        error_msg = ("Airflow measured while damper is closed:")
-
-        # masking and comparisons
-        airflow = np.ma.array(data["HeatingAirVolume"] > tolerance)
-        damper_closed = np.ma.array(
-            data["HeatingDamperPosition"] < tolerance_damper)
-        mask = np.bitwise_and(airflow, damper_closed)  # masked array
-
-        # Failure condition n% of ovservations
-        maximum_allowed_failures(mask, data, failure_percent,
-                                 report_columns, error_msg)
-
-        # Failure condition n consecutive observations
-        maximum_consecutive_failures(mask, data, failure_consecutive,
-                                     report_columns, error_msg)
+        evaluate_rule(
+            cls.rules['rule_heating_airflow_on_closed_damper'], data)
 
         return None
 
@@ -373,64 +270,6 @@ class DDVAVRules:
         1. room temperature deviates from control setpoint as measured by
         integral of measured temperature versus setpoint by > 1 Degree*hour per
         hour measured"""
-        # Tolerance for considering airflow at zero
-        failure_threshold = 1  # [Degree * hour]
-        report_columns = ["DateTime", "ControlSetpoint", "RoomTemperature"]
-        error_msg = ("Excessive deviation in process variable versus setpoint. " +
-                     "{:.2f} DegF*hour calculated deviation during hour long " +
-                     "measurement period; threshold={}")
-
-        # Break into hour segments
-        seconds = _datetimes_to_seconds_deviation_from_start(data["DateTime"])
-        segments = _hour_segment_indices_from_seconds(seconds)
-
-        # summation
-        for segment in segments:
-            # Calculate temperature deviation
-            diff = data.loc[segment, "ControlSetpoint"].to_numpy(
-            ) - data.loc[segment, "RoomTemperature"].to_numpy()
-            deviation = np.trapz(y=diff, x=seconds[segment]) / 3600
-            # Error determination
-            if abs(deviation) > failure_threshold:
-                failure_threshold_exceeded(
-                    data, report_columns,
-                    report_indices=segment,
-                    error_msg=error_msg.format(
-                        abs(deviation), failure_threshold)
-                )
+        evaluate_rule(cls.rules['rule_room_temperature_deviation'], data)
 
         return None
-
-
-def validate_input_data_headers(
-        filepath: str, required_headers: List[str]) -> None:
-    """Validate that all input data contains the headers required by these
-    rules and data formatting.
-    This function is called to give the user more informative messages than
-    errors raised by pandas if a user does not have the required headrs"""
-
-    # Open .csv file with simple csv reader to parse first row of headers
-    with open(filepath, newline='', encoding='UTF-8') as csvfile:
-        reader = csv.reader(csvfile, delimiter=',', quoting=csv.QUOTE_MINIMAL)
-        supplied_headers: List[str] = next(reader)
-
-    if set(required_headers).issubset(set(supplied_headers)):
-        # All required headers are found within passed data
-        pass
-    else:
-        missing_headers: set = set(
-            required_headers).difference(supplied_headers)
-        msg = ("The user passed file does not contain all of the required headers.\n" +
-               f"Missing headers: {missing_headers}\n" +
-               f"Requred headers: {required_headers}\n" +
-               f"Supplied headers: {supplied_headers}")
-        raise ValueError(msg)
-
-    difference: set = set(supplied_headers).difference(required_headers)
-    if len(difference) > 0:
-        msg: str = ("INFO: Extra data columns were passed through user csv " +
-                    "file that will be igored by" +
-                    f" this dual-duct VAV rule checker. Unused column headers: {difference}")
-        print(msg)
-
-    return None
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 23:20:14 2026
+
+@author: jvorsten
+
+Reduce the number of plotted samples of long trends
+An image is only so many pixels wide, so plotting more samples than pixel
+columns costs render time without adding detail. Samples are selected before
+plotting so the render time of an image is bounded by its width, not by the
+length of the trend
+
+Methods
+'minmax': split samples into one bucket per pixel column and keep the minimum
+and maximum of each bucket. Spikes and the envelope of the trend are kept
+exactly
+'lttb': largest-triangle-three-buckets. Keep the one sample of each bucket
+which forms the largest triangle with the samples kept from neighboring
+buckets, which preserves the visual shape of a line
+
+Example
+data = exception.data
+data = decimate_data(data, target_width=640, method='minmax')
+"""
+
+# Python imports
+from typing import List, MutableMapping
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from trendreview.options import DECIMATION_METHODS
+
+# Declarations
+
+# %%
+
+
+def _numeric_values(values) -> np.ndarray:
+    """Return values as a float array. Datetimes are converted to
+    nanoseconds, and other non-numeric values (text, categories) are
+    converted to category codes"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'biuf':
+        return values.astype(np.float64, copy=False)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[ns]').astype(np.int64)\
+            .astype(np.float64)
+    codes, _ = pd.factorize(values)
+
+    return codes.astype(np.float64)
+
+
+def minmax_indices(values: np.ndarray, n_buckets: int) -> np.ndarray:
+    """Return the index of the minimum and maximum of each bucket of values
+    inputs
+    -------
+    values: (np.ndarray) 1D numeric values. NaN values are ignored
+    n_buckets: (int) number of equally sized buckets
+    outputs
+    -------
+    indices: (np.ndarray) sorted, unique indices of at most 2 x n_buckets
+    samples, including the first and last sample"""
+    n_samples = values.shape[0]
+    if n_samples <= 2 * n_buckets:
+        return np.arange(n_samples)
+
+    # Pad the last bucket so every bucket is a row of the same length
+    bucket_size = -(-n_samples // n_buckets)
+    n_buckets = -(-n_samples // bucket_size)
+    padded = np.full(n_buckets * bucket_size, np.nan)
+    padded[:n_samples] = values
+    padded = padded.reshape(n_buckets, bucket_size)
+    nan_mask = np.isnan(padded)
+    offsets = np.arange(n_buckets) * bucket_size
+    minimums = np.argmin(np.where(nan_mask, np.inf, padded), axis=1)
+    maximums = np.argmax(np.where(nan_mask, -np.inf, padded), axis=1)
+    indices = np.concatenate(([0, n_samples - 1], offsets + minimums,
+                              offsets + maximums))
+
+    return np.unique(np.minimum(indices, n_samples - 1))
+
+
+def lttb_indices(x_values: np.ndarray, y_values: np.ndarray,
+                 n_out: int) -> np.ndarray:
+    """Return indices of n_out samples selected by largest-triangle-three-
+    buckets
+    inputs
+    -------
+    x_values, y_values: (np.ndarray) 1D numeric values. NaN values of
+    y_values are treated as 0 when comparing triangle areas
+    n_out: (int) number of samples to keep, at least 3
+    outputs
+    -------
+    indices: (np.ndarray) sorted indices, including the first and last
+    sample"""
+    n_samples = x_values.shape[0]
+    n_out = max(n_out, 3)
+    if n_samples <= n_out:
+        return np.arange(n_samples)
+
+    x_values = x_values - x_values[0]  # Limit precision loss of datetimes
+    y_values = np.nan_to_num(y_values)
+    # Inner samples are split into n_out - 2 buckets
+    edges = np.linspace(1, n_samples - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n_samples - 1
+    selected = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Average of the next bucket (or the last sample)
+        next_end = edges[bucket + 2] if bucket + 2 < edges.shape[0] \
+            else n_samples
+        next_x = x_values[end:next_end].mean()
+        next_y = y_values[end:next_end].mean()
+        # Twice the triangle area, the constant factor does not matter
+        areas = np.abs(
+            (x_values[selected] - next_x) *
+            (y_values[start:end] - y_values[selected]) -
+            (x_values[selected] - x_values[start:end]) *
+            (next_y - y_values[selected]))
+        selected = start + int(np.argmax(areas))
+        indices[bucket + 1] = selected
+
+    return indices
+
+
+def decimation_indices(x_values, y_columns: List, target_width: int,
+                       method: str = 'minmax') -> np.ndarray:
+    """Return indices of samples to plot so that every dependent column is
+    drawn with about target_width samples
+    inputs
+    -------
+    x_values: (iterable) independent axis values
+    y_columns: (list) of dependent axis values, one per plotted line
+    target_width: (int) width of the plot in pixels
+    method: (str) one of DECIMATION_METHODS
+    outputs
+    -------
+    indices: (np.ndarray) sorted, unique indices shared by every column.
+    Lines share the independent axis, so the samples kept for each line are
+    combined"""
+    if method not in DECIMATION_METHODS:
+        raise ValueError("Decimation method must be one of " +
+                         f"{DECIMATION_METHODS}. Got {method}")
+    x_numeric = _numeric_values(x_values)
+    selections = []
+    for y_values in y_columns:
+        y_numeric = _numeric_values(y_values)
+        if method == 'minmax':
+            selections.append(minmax_indices(y_numeric, target_width))
+        else:
+            selections.append(lttb_indices(x_numeric, y_numeric,
+                                           target_width))
+
+    return np.unique(np.concatenate(selections))
+
+
+def decimate_data(data: MutableMapping, target_width: int,
+                  method: str = 'minmax') -> MutableMapping:
+    """Return a copy of FDDException data with fewer samples when the trend
+    has more samples than target_width. See FDDException.data
+    inputs
+    -------
+    data: (dict) with keys 'primary_axis_label', 'dependent_axis_labels' and
+    a column for each label
+    target_width: (int) width of the plot in pixels. When None, data is
+    returned unchanged
+    method: (str) one of DECIMATION_METHODS
+    outputs
+    -------
+    data: (dict) data to plot"""
+    independent_label = data['primary_axis_label']
+    dependent_labels = data['dependent_axis_labels']
+    n_samples = len(data[independent_label])
+    if target_width is None or n_samples <= target_width:
+        return data
+
+    indices = decimation_indices(
+        data[independent_label], [data[label] for label in dependent_labels],
+        target_width, method)
+    decimated = dict(data)
+    for label in [independent_label] + list(dependent_labels):
+        decimated[label] = np.asarray(data[label])[indices]
+
+    return decimated
@@ -0,0 +1,714 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 11:02:18 2026
+
+@author: jvorsten
+
+Fused evaluation of mask rules
+Most rules compare one or two columns against a tolerance, combine the
+comparisons into a mask of failed samples, then check the mask for
+1. a maximum percent of failed samples
+2. a maximum number of consecutive failed samples
+
+A MaskRule describes such a rule with conditions built from the functions
+greater, less, equal, abs_difference_greater and both. Conditions are plain
+tuples, so identical sub-conditions used by several rules compare equal.
+An HourlyDeviationRule checks the hourly integral of a setpoint minus a
+process variable against a threshold.
+
+A RulePlan compiles a list of rules once, then for each trend file
+1. converts the required columns to numpy once
+2. evaluates each unique condition once (shared sub-masks)
+3. checks all rule masks for percent and consecutive failures in a batch
+
+Every failure of every rule is returned as a Fault record (see faults.py).
+For compatibility, the first fault of each rule is also available as the
+FDDException the rule would raise.
+
+Example
+plan = RulePlan([rule_a, rule_b])
+faults = plan.collect_faults(data) # [Fault('rule_a', 'percent', ...), ...]
+exceptions = plan.evaluate(data) # {'rule_a': FDDException, 'rule_b': None}
+"""
+
+# Python imports
+from typing import (Callable, Dict, Iterable, List, Mapping, Optional, Set,
+                    Tuple, Union)
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from .FDDExceptions import FDDException
+from .runlength import run_lengths_2d, run_indices
+from .faults import Fault
+from .profiling import stage
+from .helpers import (allowed_failures_message,
+                      consecutive_failures_message,
+                      failure_threshold_message,
+                      surrounding_indices,
+                      hourly_deviation,
+                      hourly_integrals,
+                      _datetimes_to_nanoseconds)
+
+# Declarations
+Condition = Tuple
+
+# %%
+
+
+def greater(column: str, value: float) -> Condition:
+    """Condition where column > value"""
+    return ('>', column, value)
+
+
+def less(column: str, value: float) -> Condition:
+    """Condition where column < value"""
+    return ('<', column, value)
+
+
+def equal(column: str, value) -> Condition:
+    """Condition where column == value"""
+    return ('==', column, value)
+
+
+def abs_difference_greater(column_a: str, column_b: str,
+                           value: float) -> Condition:
+    """Condition where |column_a - column_b| > value"""
+    return ('|-|>', column_a, column_b, value)
+
+
+def both(*conditions: Condition) -> Condition:
+    """Condition where all of conditions are True"""
+    return ('&',) + tuple(conditions)
+
+
+def condition_columns(condition: Condition) -> Set[str]:
+    """Return the set of column names a condition reads"""
+    operator = condition[0]
+    if operator == '&':
+        columns = set()
+        for sub_condition in condition[1:]:
+            columns |= condition_columns(sub_condition)
+        return columns
+    if operator == '|-|>':
+        return {condition[1], condition[2]}
+
+    return {condition[1]}
+
+
+def evaluate_condition(condition: Condition,
+                       columns: Mapping[str, np.ndarray],
+                       cache: Dict[Condition, np.ndarray] = None) -> np.ndarray:
+    """Evaluate a condition into a boolean array
+    inputs
+    -------
+    condition: (tuple) see greater, less, equal, abs_difference_greater, both
+    columns: (dict) of column name to numpy array
+    cache: (dict) of previously evaluated conditions. Evaluated conditions
+    and sub-conditions are added to the cache"""
+    if cache is None:
+        cache = {}
+    if condition in cache:
+        return cache[condition]
+
+    operator = condition[0]
+    if operator == '&':
+        result = evaluate_condition(condition[1], columns, cache)
+        for sub_condition in condition[2:]:
+            result = np.logical_and(
+                result, evaluate_condition(sub_condition, columns, cache))
+    elif operator == '>':
+        result = columns[condition[1]] > condition[2]
+    elif operator == '<':
+        result = columns[condition[1]] < condition[2]
+    elif operator == '==':
+        result = columns[condition[1]] == condition[2]
+    elif operator == '|-|>':
+        result = np.abs(columns[condition[1]] - columns[condition[2]]) > \
+            condition[3]
+    else:
+        raise ValueError(f"Unknown condition operator: {operator}")
+
+    result = np.asarray(result, dtype=bool)
+    cache[condition] = result
+
+    return result
+
+
+class MaskRule:
+    """A rule which fails when a condition is True for too many samples, or
+    for too many consecutive samples"""
+
+    def __init__(self, name: str, condition: Condition,
+                 report_columns: List[str], error_msg: str,
+                 failure_percent: float = 0.02,
+                 failure_consecutive: int = 3,
+                 percent_msg: str = None, consecutive_msg: str = None):
+        """inputs
+        -------
+        name: (str) name of the rule, like 'rule_heating_opposed_mode'
+        condition: (tuple) condition which is True for failed samples
+        report_columns: (list) of column names to report and plot, the
+        first column is the independent axis
+        error_msg: (str) message logged when the rule fails
+        failure_percent: (float) maximum allowed fraction of failed samples
+        failure_consecutive: (int) maximum allowed consecutive failures
+        percent_msg: (str) message logged in place of error_msg and the
+        message of helpers.allowed_failures_message. Formatted with the
+        maximum allowed failures, failure_percent and the failures observed
+        consecutive_msg: (str) message logged in place of error_msg and the
+        message of helpers.consecutive_failures_message. Formatted with
+        failure_consecutive and the number of consecutive episodes"""
+        self.name = name
+        self.condition = condition
+        self.report_columns = report_columns
+        self.error_msg = error_msg
+        self.failure_percent = failure_percent
+        self.failure_consecutive = failure_consecutive
+        self.percent_msg = percent_msg
+        self.consecutive_msg = consecutive_msg
+
+        return None
+
+    def __repr__(self):
+        return f"MaskRule({self.name!r})"
+
+
+class HourlyDeviationRule:
+    """A rule which fails when the integral of a setpoint minus a process
+    variable over an hour long period exceeds a threshold"""
+
+    def __init__(self, name: str, setpoint_column: str, process_column: str,
+                 report_columns: List[str], error_msg: str,
+                 failure_threshold: float = 1,
+                 datetime_column: str = 'DateTime'):
+        """inputs
+        -------
+        name: (str) name of the rule, like 'rule_room_temperature_deviation'
+        setpoint_column: (str) column of the control setpoint
+        process_column: (str) column of the process variable
+        report_columns: (list) of column names to report and plot
+        error_msg: (str) message logged when the rule fails. Formatted with
+        the absolute deviation and failure_threshold
+        failure_threshold: (float) maximum allowed deviation
+        [process variable * hour] within each hour
+        datetime_column: (str) column of sample timestamps"""
+        self.name = name
+        self.setpoint_column = setpoint_column
+        self.process_column = process_column
+        self.report_columns = report_columns
+        self.error_msg = error_msg
+        self.failure_threshold = failure_threshold
+        self.datetime_column = datetime_column
+        self.columns = {datetime_column, setpoint_column, process_column}
+
+        return None
+
+    def __repr__(self):
+        return f"HourlyDeviationRule({self.name!r})"
+
+    def faults(self, columns: Mapping[str, np.ndarray]) -> List[Fault]:
+        """Return a threshold fault containing every hour which exceeds the
+        failure threshold, or an empty list"""
+        starts, ends, deviation = hourly_deviation(
+            columns[self.datetime_column], columns[self.setpoint_column],
+            columns[self.process_column])
+
+        return self.segment_faults(starts, ends, deviation)
+
+    def segment_faults(self, starts: np.ndarray, ends: np.ndarray,
+                       deviation: np.ndarray) -> List[Fault]:
+        """Return the fault of hourly segments, see helpers.hourly_integrals
+        for the description of starts, ends and deviation"""
+        failed = np.flatnonzero(np.abs(deviation) > self.failure_threshold)
+        if failed.shape[0] == 0:
+            return []
+
+        # The message and plot describe the first failed hour
+        first = failed[0]
+        message = failure_threshold_message(self.error_msg.format(
+            abs(deviation[first]), self.failure_threshold))
+        return [Fault(self.name, 'threshold', message, self.report_columns,
+                      ranges=np.stack((starts[failed], ends[failed]), axis=1),
+                      values=deviation[failed],
+                      count=failed.shape[0],
+                      limit=self.failure_threshold,
+                      report_indices=np.arange(starts[first], ends[first]))]
+
+
+class RulePlan:
+    """Evaluate a list of rules in a single pass over trended data"""
+
+    def __init__(self, rules: Iterable[Union[MaskRule, HourlyDeviationRule]]):
+        """inputs
+        -------
+        rules: (iterable) of MaskRule or HourlyDeviationRule"""
+        self.rules = list(rules)
+        self.names: List[str] = [rule.name for rule in self.rules]
+        self.mask_rules: List[MaskRule] = [
+            rule for rule in self.rules if isinstance(rule, MaskRule)]
+        self.deviation_rules: List[HourlyDeviationRule] = [
+            rule for rule in self.rules
+            if isinstance(rule, HourlyDeviationRule)]
+
+        columns = set()
+        for rule in self.mask_rules:
+            columns |= condition_columns(rule.condition)
+        for rule in self.deviation_rules:
+            columns |= rule.columns
+        self.columns: List[str] = sorted(columns)
+        self.failure_percent = np.array(
+            [rule.failure_percent for rule in self.mask_rules],
+            dtype=np.float64)
+        self.failure_consecutive = np.array(
+            [rule.failure_consecutive for rule in self.mask_rules],
+            dtype=np.int64)
+        self._selections: Dict[frozenset, 'RulePlan'] = {}
+
+        return None
+
+    def select(self, names: Iterable[str]) -> 'RulePlan':
+        """Return a plan containing only rules with a name in names. Plans
+        are compiled once for each selection"""
+        key = frozenset(names).intersection(self.names)
+        if key not in self._selections:
+            self._selections[key] = RulePlan(
+                [rule for rule in self.rules if rule.name in key])
+
+        return self._selections[key]
+
+    def stream(self) -> 'PlanState':
+        """Return an empty state to evaluate the plan over consecutive
+        chunks of a trend, see PlanState"""
+        return PlanState(self)
+
+    def to_numpy(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Convert each column required by the plan to numpy once"""
+        return {column: data[column].to_numpy() for column in self.columns}
+
+    def masks(self, columns: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Return a 2D boolean array with one row of failed samples for each
+        mask rule. Conditions shared between rules are evaluated once"""
+        cache: Dict[Condition, np.ndarray] = {}
+        n_samples = len(next(iter(columns.values()))) if columns else 0
+        masks = np.zeros((len(self.mask_rules), n_samples), dtype=bool)
+        for row, rule in enumerate(self.mask_rules):
+            # Conditions shared with earlier rules are timed with the
+            # earlier rule
+            with stage(rule.name, n_samples):
+                masks[row] = evaluate_condition(rule.condition, columns,
+                                                cache)
+
+        return masks
+
+    def mask_faults(self, masks: np.ndarray) -> Dict[str, List[Fault]]:
+        """Check all mask rules for percent and consecutive failures in a
+        batch
+        inputs
+        -------
+        masks: (np.ndarray) see RulePlan.masks
+        outputs
+        -------
+        faults: (dict) of rule name to a list of faults. The percent fault is
+        listed before the consecutive fault"""
+        counts = np.count_nonzero(masks, axis=1)
+        rows, starts, lengths, _ = run_lengths_2d(masks)
+
+        return self.run_faults(counts, rows, starts, lengths, masks.shape[1])
+
+    def run_faults(self, counts: np.ndarray, rows: np.ndarray,
+                   starts: np.ndarray, lengths: np.ndarray,
+                   n_samples: int) -> Dict[str, List[Fault]]:
+        """Check all mask rules for percent and consecutive failures in a
+        batch, given the runs of failed samples of every mask rule
+        inputs
+        -------
+        counts: (np.ndarray) number of failed samples of each mask rule
+        rows, starts, lengths: (np.ndarray) runs of failed samples ordered
+        by row (mask rule) then start, see runlength.run_lengths_2d
+        n_samples: (int) number of samples checked
+        outputs
+        -------
+        faults: (dict) see RulePlan.mask_faults"""
+        max_failures = np.floor(self.failure_percent * n_samples).astype(int)
+        ends = starts + lengths
+        row_bounds = np.searchsorted(rows, np.arange(len(self.mask_rules) + 1))
+
+        faults: Dict[str, List[Fault]] = {}
+        for row, rule in enumerate(self.mask_rules):
+            faults[rule.name] = []
+            run = slice(row_bounds[row], row_bounds[row + 1])
+            ranges = np.stack((starts[run], ends[run]), axis=1)
+
+            if counts[row] > max_failures[row]:
+                if rule.percent_msg is not None:
+                    message = rule.percent_msg.format(
+                        max_failures[row], rule.failure_percent, counts[row])
+                else:
+                    message = allowed_failures_message(
+                        rule.error_msg, max_failures[row],
+                        rule.failure_percent, counts[row])
+                report_indices = run_indices(
+                    starts[run], lengths[run], max_failures[row])
+                faults[rule.name].append(Fault(
+                    rule.name, 'percent', message, rule.report_columns,
+                    ranges=ranges, values=lengths[run], count=counts[row],
+                    limit=max_failures[row], report_indices=report_indices))
+
+            long_runs = lengths[run] >= rule.failure_consecutive
+            if np.any(long_runs):
+                consecutive_indices = starts[run][long_runs]
+                if rule.consecutive_msg is not None:
+                    message = rule.consecutive_msg.format(
+                        rule.failure_consecutive,
+                        consecutive_indices.shape[0])
+                else:
+                    message = consecutive_failures_message(
+                        rule.error_msg, rule.failure_consecutive,
+                        consecutive_indices.tolist())
+                faults[rule.name].append(Fault(
+                    rule.name, 'consecutive', message, rule.report_columns,
+                    ranges=ranges[long_runs], values=lengths[run][long_runs],
+                    count=consecutive_indices.shape[0],
+                    limit=rule.failure_consecutive,
+                    report_indices=surrounding_indices(
+                        consecutive_indices[0], n_samples)))
+
+        return faults
+
+    def rule_faults(self, data: pd.DataFrame) -> Dict[str, List[Fault]]:
+        """Evaluate every rule against data
+        outputs
+        -------
+        faults: (dict) of rule name to a list of every fault of the rule"""
+        with stage('RulePlan.rule_faults', data.shape[0]):
+            columns = self.to_numpy(data)
+            masks = self.masks(columns)
+            with stage('RulePlan.mask_faults', data.shape[0]):
+                faults = self.mask_faults(masks)
+            for rule in self.deviation_rules:
+                with stage(rule.name, data.shape[0]):
+                    faults[rule.name] = rule.faults(columns)
+
+        return {name: faults[name] for name in self.names}
+
+    def collect_faults(self, data: pd.DataFrame) -> List[Fault]:
+        """Return every fault of every rule, in the order of rules"""
+        faults = []
+        for rule_faults in self.rule_faults(data).values():
+            faults.extend(rule_faults)
+
+        return faults
+
+    def evaluate(self, data: pd.DataFrame
+                 ) -> Dict[str, Optional[FDDException]]:
+        """Evaluate every rule against data
+        outputs
+        -------
+        exceptions: (dict) of rule name to the FDDException the rule raises,
+        or None when the rule passes. Like the individual rules, only the
+        first fault of each rule is reported"""
+        exceptions: Dict[str, Optional[FDDException]] = {}
+        for name, faults in self.rule_faults(data).items():
+            exceptions[name] = faults[0].to_exception(data) if faults else None
+
+        return exceptions
+
+
+class HourlyDeviationState:
+    """Hourly integrals of an HourlyDeviationRule evaluated over
+    consecutive chunks. Hours are measured from the first sample of the
+    trend. The samples of the last (open) hour are kept, so an hour which
+    spans two chunks is integrated exactly like a full load"""
+
+    def __init__(self, rule: HourlyDeviationRule):
+        self.rule = rule
+        self.origin: int = None  # [ns] first timestamp of the trend
+        self.tail_start = 0  # Data index of the first sample of the open hour
+        self.tail_seconds = np.zeros(0)
+        self.tail_values = np.zeros(0)
+        self.starts: List[np.ndarray] = []
+        self.ends: List[np.ndarray] = []
+        self.deviation: List[np.ndarray] = []
+
+        return None
+
+    def update(self, columns: Mapping[str, np.ndarray]) -> None:
+        """Integrate the next chunk of samples"""
+        nanoseconds = _datetimes_to_nanoseconds(
+            columns[self.rule.datetime_column])
+        if nanoseconds.shape[0] == 0:
+            return None
+        if self.origin is None:
+            self.origin = nanoseconds[0]
+        seconds = np.concatenate((self.tail_seconds,
+                                  (nanoseconds - self.origin) / 1e9))
+        values = np.concatenate((self.tail_values, (
+            np.asarray(columns[self.rule.setpoint_column], dtype=np.float64) -
+            np.asarray(columns[self.rule.process_column], dtype=np.float64))))
+        starts, ends, deviation = hourly_integrals(seconds, values, 0.0)
+
+        # Every hour except the last is complete
+        self.starts.append(starts[:-1] + self.tail_start)
+        self.ends.append(ends[:-1] + self.tail_start)
+        self.deviation.append(deviation[:-1])
+        self.tail_start += starts[-1]
+        self.tail_seconds = seconds[starts[-1]:]
+        self.tail_values = values[starts[-1]:]
+
+        return None
+
+    def segments(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return starts, ends and deviation of every hour so far, including
+        the open hour"""
+        starts, ends, deviation = hourly_integrals(
+            self.tail_seconds, self.tail_values, 0.0)
+
+        return (np.concatenate(self.starts + [starts + self.tail_start]),
+                np.concatenate(self.ends + [ends + self.tail_start]),
+                np.concatenate(self.deviation + [deviation]))
+
+    def faults(self) -> List[Fault]:
+        """Return the faults of every hour so far"""
+        return self.rule.segment_faults(*self.segments())
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Return the state as arrays, see from_arrays"""
+        return {
+            # Empty before the first sample
+            'origin': np.array([] if self.origin is None else [self.origin],
+                               dtype=np.int64),
+            'tail_start': np.array([self.tail_start], dtype=np.int64),
+            'tail_seconds': self.tail_seconds,
+            'tail_values': self.tail_values,
+            'starts': np.concatenate(self.starts + [np.zeros(0, np.int64)]),
+            'ends': np.concatenate(self.ends + [np.zeros(0, np.int64)]),
+            'deviation': np.concatenate(self.deviation + [np.zeros(0)])}
+
+    @classmethod
+    def from_arrays(cls, rule: HourlyDeviationRule,
+                    arrays: Mapping[str, np.ndarray]
+                    ) -> 'HourlyDeviationState':
+        """Restore a state saved by to_arrays"""
+        state = cls(rule)
+        origin = np.asarray(arrays['origin'])
+        state.origin = origin[0] if origin.shape[0] else None
+        state.tail_start = int(arrays['tail_start'][0])
+        state.tail_seconds = np.asarray(arrays['tail_seconds'])
+        state.tail_values = np.asarray(arrays['tail_values'])
+        state.starts = [np.asarray(arrays['starts'])]
+        state.ends = [np.asarray(arrays['ends'])]
+        state.deviation = [np.asarray(arrays['deviation'])]
+
+        return state
+
+
+class PlanState:
+    """State of a RulePlan evaluated over consecutive chunks of a trend, so
+    a trend can be streamed without loading it into memory. The state holds
+    counts of failed samples, runs of failed samples (a run which reaches
+    the end of a chunk is kept open and joined with the next chunk), and
+    the open hour of each deviation rule. Faults match evaluating the
+    whole trend at once
+
+    Example
+    state = plan.stream()
+    for chunk in pd.read_csv(filepath, chunksize=100000):
+        state.update(plan.to_numpy(chunk))
+    faults = state.rule_faults()
+    """
+
+    def __init__(self, plan: RulePlan):
+        self.plan = plan
+        n_rules = len(plan.mask_rules)
+        self.n_samples = 0
+        self.counts = np.zeros(n_rules, dtype=np.int64)
+        # Start of a run which reaches the end of the last chunk, or -1
+        self.open_starts = np.full(n_rules, -1, dtype=np.int64)
+        # Closed runs (rows, starts, lengths) of each chunk
+        self.runs: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self.deviation_states: Dict[str, HourlyDeviationState] = {
+            rule.name: HourlyDeviationState(rule)
+            for rule in plan.deviation_rules}
+
+        return None
+
+    def update(self, columns: Mapping[str, np.ndarray]) -> None:
+        """Evaluate the next chunk of samples
+        inputs
+        -------
+        columns: (dict) of column name to numpy array, see RulePlan.to_numpy"""
+        with stage('PlanState.update') as record:
+            n_samples = self.n_samples
+            self._update(columns)
+            record.rows = self.n_samples - n_samples
+
+        return None
+
+    def _update(self, columns: Mapping[str, np.ndarray]) -> None:
+        """See update"""
+        masks = self.plan.masks(columns)
+        n_chunk = masks.shape[1]
+        if n_chunk == 0:
+            return None
+        self.counts += np.count_nonzero(masks, axis=1)
+        rows, starts, lengths, ends = run_lengths_2d(masks)
+
+        # Runs at the start of the chunk continue open runs
+        continues = np.zeros(len(self.plan.mask_rules), dtype=bool)
+        continues[rows[starts == 0]] = True
+        joined = (starts == 0) & (self.open_starts[rows] >= 0)
+        is_open = ends == n_chunk
+        starts = starts + self.n_samples
+        lengths[joined] += starts[joined] - self.open_starts[rows[joined]]
+        starts[joined] = self.open_starts[rows[joined]]
+
+        # Open runs which do not continue into this chunk are closed
+        closed = np.flatnonzero((self.open_starts >= 0) & ~continues)
+        self.runs.append((closed, self.open_starts[closed],
+                          self.n_samples - self.open_starts[closed]))
+        self.runs.append((rows[~is_open], starts[~is_open],
+                          lengths[~is_open]))
+        self.open_starts[:] = -1
+        self.open_starts[rows[is_open]] = starts[is_open]
+
+        for rule in self.plan.deviation_rules:
+            with stage(rule.name, n_chunk):
+                self.deviation_states[rule.name].update(columns)
+        self.n_samples += n_chunk
+
+        return None
+
+    def rule_faults(self) -> Dict[str, List[Fault]]:
+        """Return the faults of every rule for all samples so far. Open runs
+        are treated as ending at the last sample. The state is not changed,
+        so more chunks may be evaluated afterwards
+        outputs
+        -------
+        faults: (dict) see RulePlan.rule_faults"""
+        open_rows = np.flatnonzero(self.open_starts >= 0)
+        runs = self.runs + [(open_rows, self.open_starts[open_rows],
+                             self.n_samples - self.open_starts[open_rows])]
+        rows = np.concatenate([run[0] for run in runs]).astype(np.int64)
+        starts = np.concatenate([run[1] for run in runs]).astype(np.int64)
+        lengths = np.concatenate([run[2] for run in runs]).astype(np.int64)
+        order = np.lexsort((starts, rows))
+
+        faults = self.plan.run_faults(self.counts, rows[order], starts[order],
+                                      lengths[order], self.n_samples)
+        for name, state in self.deviation_states.items():
+            faults[name] = state.faults()
+
+        return {name: faults[name] for name in self.plan.names}
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Return the state as a flat dict of arrays, which can be saved with
+        np.savez and restored with from_arrays. Closed runs are joined into
+        one array of each of rows, starts and lengths"""
+        runs = self.runs + [(np.zeros(0, np.int64),) * 3]
+        arrays = {
+            'n_samples': np.array([self.n_samples], dtype=np.int64),
+            'counts': self.counts,
+            'open_starts': self.open_starts,
+            'run_rows': np.concatenate([run[0] for run in runs]).astype(
+                np.int64),
+            'run_starts': np.concatenate([run[1] for run in runs]).astype(
+                np.int64),
+            'run_lengths': np.concatenate([run[2] for run in runs]).astype(
+                np.int64)}
+        for idx, rule in enumerate(self.plan.deviation_rules):
+            for key, array in \
+                    self.deviation_states[rule.name].to_arrays().items():
+                arrays[f'deviation{idx}_{key}'] = array
+
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, plan: RulePlan,
+                    arrays: Mapping[str, np.ndarray]) -> 'PlanState':
+        """Restore a state of plan saved by to_arrays. More chunks may be
+        evaluated by the restored state"""
+        state = cls(plan)
+        state.n_samples = int(arrays['n_samples'][0])
+        state.counts = np.array(arrays['counts'], dtype=np.int64)
+        state.open_starts = np.array(arrays['open_starts'], dtype=np.int64)
+        state.runs = [(np.asarray(arrays['run_rows']),
+                       np.asarray(arrays['run_starts']),
+                       np.asarray(arrays['run_lengths']))]
+        for idx, rule in enumerate(plan.deviation_rules):
+            prefix = f'deviation{idx}_'
+            state.deviation_states[rule.name] = \
+                HourlyDeviationState.from_arrays(rule, {
+                    key[len(prefix):]: array for key, array in arrays.items()
+                    if key.startswith(prefix)})
+
+        return state
+
+
+def evaluate_rule(rule: Union[MaskRule, HourlyDeviationRule],
+                  data: pd.DataFrame) -> None:
+    """Raise a FDDException if a single rule fails on data"""
+    with stage('evaluate_rule', data.shape[0]):
+        exception = RulePlan([rule]).evaluate(data)[rule.name]
+    if exception is not None:
+        raise exception
+
+    return None
+
+
+def method_faults(plan: RulePlan, methods: List[Callable],
+                  data: pd.DataFrame = None,
+                  chunks: Iterable[pd.DataFrame] = None
+                  ) -> Dict[str, List[Fault]]:
+    """Return the faults of each rule method, in the order of methods.
+    Methods named in plan are evaluated together in a single pass. Other
+    methods are called with the data, and FDDExceptions they raise are
+    wrapped with Fault.from_exception
+    inputs
+    -------
+    plan: (RulePlan) compiled rules of the equipment
+    methods: (list) of rule methods, like DDVAVRules.get_rules()
+    data: (pd.DataFrame) the whole trend
+    chunks: (iterable) of pd.DataFrame chunks of the trend, used instead of
+    data. Plan rules carry their state across chunks (see PlanState). Other
+    methods are called on each chunk until they raise
+    outputs
+    -------
+    faults: (dict) of method name to a list of faults"""
+    names = [method.__name__ for method in methods]
+    selection = plan.select(names)
+    others = [method for method in methods
+              if method.__name__ not in selection.names]
+    faults: Dict[str, List[Fault]] = {name: [] for name in names}
+
+    if chunks is None:
+        faults.update(selection.rule_faults(data))
+        _call_rule_methods(others, data, faults)
+        return faults
+
+    state = selection.stream()
+    for chunk in chunks:
+        state.update(selection.to_numpy(chunk))
+        _call_rule_methods(others, chunk, faults)
+    faults.update(state.rule_faults())
+
+    return faults
+
+
+def _call_rule_methods(methods: List[Callable], data: pd.DataFrame,
+                       faults: Dict[str, List[Fault]]) -> None:
+    """Call rule methods which have not failed yet, and record the
+    exception a method raises as a fault"""
+    for method in methods:
+        if faults[method.__name__]:
+            continue
+        try:
+            with stage(method.__name__, data.shape[0]):
+                method(data)
+        except FDDException as exception:
+            faults[method.__name__].append(
+                Fault.from_exception(method.__name__, exception))
+
+    return None
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 19:02:41 2026
+
+@author: jvorsten
+
+Registry of equipment rule classes reviewed by trendreview
+An equipment type (like 'ddvav') names a class of rules, like DDVAVRules.
+Classes are imported the first time their type is reviewed, so equipment
+types which are not used cost no startup time
+
+Equipment types are registered in three ways
+1. Built-in types are listed in BUILTIN_EQUIPMENT as 'module:ClassName'
+2. Installed packages declare entry points in the group ENTRY_POINT_GROUP,
+like (setup.cfg)
+    [options.entry_points]
+    trendreview.equipment =
+        ahu = mypackage.ahu:AHURules
+3. A class is registered when it is defined with the register_equipment
+decorator
+
+Rule classes follow the interface of DDVAVRules:
+__init__(filepath, chunksize=None, cache=None, clean=None), get_rules(),
+evaluate_rules(methods, reporter), collect_faults(methods) and
+report_data(faults). Classes which support incremental review also accept
+checkpoints=None (see incremental). Subclasses of rules.EquipmentRules
+implement the interface from their headers, types and rule plan.
+register_equipment finds the rule_* methods of a class once, when the
+class is defined (see rule_names)
+
+Example
+@register_equipment('ahu')
+class AHURules(EquipmentRules):
+    ...
+rules = equipment_class('ahu')(filepath)
+faults = rules.collect_faults(rules.get_rules())
+"""
+
+# Python imports
+from typing import Callable, Dict, List, Tuple, Union
+import importlib
+
+# Third party imports
+
+# Local imports
+
+# Declarations
+RULE_PREFIX = 'rule_'
+ENTRY_POINT_GROUP = 'trendreview.equipment'
+BUILTIN_EQUIPMENT = {
+    'ddvav': 'trendreview.ddvav:DDVAVRules',
+    'sdvav': 'trendreview.sdvav:SDVAVRules',
+}
+# Equipment type to a class, or to the 'module:ClassName' of a class which
+# is not imported yet
+_registry: Dict[str, Union[type, str]] = dict(BUILTIN_EQUIPMENT)
+_entry_points_loaded = False
+
+# %%
+
+
+def rule_names(cls: type) -> Tuple[str, ...]:
+    """Names of the rule methods of a class (methods starting with 'rule_'),
+    in alphabetical order. Names are found once and kept on the class"""
+    names = cls.__dict__.get('_rule_names')
+    if names is None:
+        names = tuple(name for name in sorted(dir(cls))
+                      if name.startswith(RULE_PREFIX) and
+                      callable(getattr(cls, name)))
+        cls._rule_names = names
+
+    return names
+
+
+def register_equipment(name: str) -> Callable[[type], type]:
+    """Class decorator which registers a rule class as equipment type name,
+    and finds its rule methods (see rule_names)"""
+    def decorator(cls: type) -> type:
+        rule_names(cls)
+        _registry[name] = cls
+        return cls
+
+    return decorator
+
+
+def _load_entry_points() -> None:
+    """Add the equipment types of installed entry points to the registry.
+    Entry points are only listed here, the classes are imported when used.
+    Reading entry points takes longer than importing this module, so it is
+    done only when a type is not registered, or every type is listed"""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return None
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+    found = entry_points()
+    if hasattr(found, 'select'):
+        found = found.select(group=ENTRY_POINT_GROUP)
+    else:  # Python < 3.10
+        found = found.get(ENTRY_POINT_GROUP, [])
+    for entry_point in found:
+        _registry.setdefault(entry_point.name, entry_point.value)
+
+    return None
+
+
+def equipment_types() -> List[str]:
+    """Names of every registered equipment type"""
+    _load_entry_points()
+
+    return list(_registry)
+
+
+def is_registered(name: str) -> bool:
+    """True if name is a registered equipment type"""
+    if name not in _registry:
+        _load_entry_points()
+
+    return name in _registry
+
+
+def equipment_class(name: str) -> type:
+    """Return the rule class of equipment type name, importing it the first
+    time it is used
+    inputs
+    -------
+    name: (str) one of equipment_types()
+    outputs
+    -------
+    cls: (type) rule class, like DDVAVRules"""
+    if not is_registered(name):
+        raise ValueError("Equipment type must be one of " +
+                         f"{equipment_types()}. Got {name}")
+    cls = _registry[name]
+    if isinstance(cls, str):
+        module_name, _, class_name = cls.partition(':')
+        # Importing the module may register the class with the decorator
+        cls = getattr(importlib.import_module(module_name), class_name)
+        rule_names(cls)
+        _registry[name] = cls
+
+    return cls
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 13:05:44 2026
+
+@author: jvorsten
+
+Fault records returned by rules
+A Fault describes one failed check of a rule on a trend file: every
+episode (index range) where the check failed, how many failures were
+observed, the allowed limit and a severity. Unlike FDDException, which is
+raised for the first failure found, all faults are collected in one pass.
+
+Kinds of faults
+'percent': the number of failed samples exceeded a percent of all samples.
+count is the number of failed samples, limit the maximum allowed
+'consecutive': failed samples occurred consecutively. count is the number of
+episodes, limit the maximum allowed consecutive samples
+'threshold': a calculated value exceeded a threshold. count is the number of
+episodes, limit the threshold
+'exception': a FDDException raised by a rule method that is not part of a
+rule plan. No index ranges are known
+"""
+
+# Python imports
+from typing import Dict, Iterable, List, Optional
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from .FDDExceptions import FDDException
+from .helpers import report_data_view
+
+# Declarations
+FAULT_KINDS = ['percent', 'consecutive', 'threshold', 'exception']
+
+# %%
+
+
+class Fault:
+    """Record of a failed rule check"""
+
+    def __init__(self, rule: str, kind: str, message: str,
+                 report_columns: List[str],
+                 ranges: np.ndarray,
+                 values: Iterable[float],
+                 count: int,
+                 limit: float,
+                 report_indices: Iterable[int],
+                 exception: Optional[FDDException] = None):
+        """inputs
+        -------
+        rule: (str) name of the rule which failed
+        kind: (str) one of FAULT_KINDS
+        message: (str) message describing the failure, equal to the message
+        of the equivalent FDDException
+        report_columns: (list) of column names to report and plot
+        ranges: (np.ndarray) of shape (n_episodes, 2). Each row is the
+        [start, end) index range of an episode
+        values: (iterable) magnitude of each episode (run length, deviation)
+        count: (int) observed failures, see module documentation
+        limit: (float) allowed failures or threshold
+        report_indices: (iterable) of data indices plotted for this fault
+        exception: (FDDException) original exception for kind 'exception'"""
+        if kind not in FAULT_KINDS:
+            raise ValueError(f"Fault kind must be one of {FAULT_KINDS}. " +
+                             f"Got {kind}")
+        self.rule = rule
+        self.kind = kind
+        self.message = message
+        self.report_columns = report_columns
+        self.ranges = np.asarray(ranges, dtype=np.int64).reshape(-1, 2)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.count = int(count)
+        self.limit = limit.item() if isinstance(limit, np.generic) else limit
+        self.report_indices = np.asarray(report_indices, dtype=np.int64)
+        self.exception = exception
+        self.severity = self._severity()
+
+        return None
+
+    def __repr__(self):
+        return (f"Fault({self.rule!r}, {self.kind!r}, " +
+                f"episodes={self.ranges.shape[0]}, " +
+                f"severity={self.severity:.2f})")
+
+    def _severity(self) -> float:
+        """Ratio of the observed failure to the allowed limit. Values greater
+        than 1 exceed the limit"""
+        if self.kind == 'percent':
+            return self.count / max(self.limit, 1)
+        if self.kind in ('consecutive', 'threshold') and self.values.shape[0]:
+            return float(np.max(np.abs(self.values))) / max(self.limit, 1e-12)
+
+        return 1.0
+
+    @classmethod
+    def from_exception(cls, rule: str, exception: FDDException) -> 'Fault':
+        """Wrap a FDDException raised by a rule method"""
+        return cls(rule, 'exception', exception.message,
+                   report_columns=[exception.data['primary_axis_label']] +
+                   list(exception.data['dependent_axis_labels']),
+                   ranges=np.zeros((0, 2)), values=[], count=1, limit=1,
+                   report_indices=[], exception=exception)
+
+    def to_exception(self, data: pd.DataFrame) -> FDDException:
+        """Create the FDDException equivalent to this fault, which holds the
+        data used for reporting and plotting"""
+        if self.exception is not None:
+            return self.exception
+
+        return FDDException(self.message, report_data_view(
+            data, self.report_indices, self.report_columns))
+
+    def to_dict(self) -> Dict:
+        """JSON serializable representation of the fault"""
+        return {
+            'rule': self.rule,
+            'kind': self.kind,
+            'message': self.message,
+            'severity': self.severity,
+            'count': self.count,
+            'limit': self.limit,
+            'ranges': self.ranges.tolist(),
+            'values': self.values.tolist(),
+        }
@@ -6,9 +6,9 @@ Created on Mon Dec 27 15:39:47 2021
 """
 
 # Python imports
-from typing import List, Iterable
+from typing import List, Iterable, Iterator, Tuple, Union
 from datetime import datetime
-from copy import deepcopy
+import csv
 import math
 
 # Thrid party imports
@@ -17,20 +17,201 @@ import pandas as pd
 
 # Local imports
 from .FDDExceptions import FDDException
+from .runlength import rising_edges
+from .cache import TrendCache
+from .trendstore import is_trend_store, read_trend_store, TrendStore
+from .dateparse import parse_date_columns, combine_date_time
+from .data_cleaning_utilities import clean_frame
+from .profiling import stage
 
 # %%
 
 
-def read_csv(filepath, headers, dtypes):
+def read_csv(filepath, headers, dtypes, cache: 'TrendCache' = None,
+             clean: Iterable[str] = None):
     """Wrapper for pandas read_csv method. Read a CSV file into a dataframe
     object with the specified types for dual-duct VAV units.
     This method enforces datatypes and headers for the input CSV file
-    format"""
-    df = pd.read_csv(filepath, sep=',', usecols=headers,
-                     parse_dates=['DateTime'], dtype=dtypes)
+    format
+    When a cache (see cache.TrendCache) is given, the parsed file is cached
+    and loaded from the cache while the file is unchanged
+    When cleaning steps are given, lines are cleaned before types are
+    enforced (see read_clean_csv)"""
+    def read():
+        if clean:
+            df = read_clean_csv(filepath, clean, headers, dtypes)
+        else:
+            df = pd.read_csv(filepath, sep=',', usecols=headers, dtype=dtypes)
+        parse_date_columns(df, ['DateTime'])
+        return df
+
+    if cache is not None:
+        return cache.load(filepath, {'usecols': sorted(headers),
+                                     'dtype': dtypes,
+                                     'parse_dates': ['DateTime'],
+                                     'clean': sorted(clean or [])}, read)
+    df = read()
     return df
 
 
+def read_clean_csv(filepath, steps: Iterable[str], headers=None,
+                   dtypes=None) -> pd.DataFrame:
+    """Read a CSV file as text, clean its lines (see
+    data_cleaning_utilities.clean_frame) and convert columns to dtypes
+    inputs
+    -------
+    steps: (iterable) of data_cleaning_utilities.CLEANING_STEPS
+    headers: (list) of columns to keep after cleaning, or None for all
+    columns. Filters are applied to every column of the file
+    dtypes: (dict) of column name to dtype, see typed_columns
+    Raises ValueError if cleaning removes every row of a file with rows, so
+    a cleaned file is not reported as a unit without faults"""
+    text = pd.read_csv(filepath, sep=',', dtype=str, keep_default_na=False)
+    n_rows = text.shape[0]
+    text = clean_frame(text, steps)
+    if n_rows > 0 and text.shape[0] == 0:
+        raise ValueError(f"Cleaning steps {list(steps)} removed all {n_rows} " +
+                         f"rows of {filepath}. Review the file with other " +
+                         "cleaning steps")
+    if headers is not None:
+        text = text[[column for column in text.columns if column in headers]]
+
+    return typed_columns(text, dtypes)
+
+
+def typed_columns(text: pd.DataFrame, dtypes=None) -> pd.DataFrame:
+    """Convert columns of text to dtypes like pandas.read_csv. Empty fields
+    are missing values. Columns without a numeric dtype in dtypes are
+    converted to numbers or booleans when every value can be converted, and
+    are otherwise left as text"""
+    dtypes = dtypes or {}
+    data = text.replace('', np.nan)
+    for column in data.columns:
+        dtype = dtypes.get(column)
+        if dtype is not None and np.dtype(dtype).kind in 'biuf':
+            data[column] = data[column].astype(dtype)
+        elif dtype is None:
+            try:
+                data[column] = pd.to_numeric(data[column])
+            except (ValueError, TypeError):
+                lowered = data[column].str.lower()
+                if data[column].notna().all() and \
+                        lowered.isin(['true', 'false']).all():
+                    data[column] = lowered == 'true'
+
+    return data
+
+
+def read_trend(filepath, headers, dtypes, cache: TrendCache = None,
+               clean: Iterable[str] = None) -> pd.DataFrame:
+    """Read a trend file in CSV format (see read_csv) or a trend store (see
+    trendstore.import_csv). Columns of a trend store are memory-mapped, so
+    it is not cached, and were cleaned (if needed) before import"""
+    with stage('read_trend') as record:
+        if is_trend_store(filepath):
+            data = read_trend_store(filepath, headers)
+        else:
+            data = read_csv(filepath, headers, dtypes, cache=cache,
+                            clean=clean)
+        record.rows = data.shape[0]
+
+    return data
+
+
+def validate_input_data_headers(
+        filepath: str, required_headers: List[str],
+        equipment_name: str = 'dual-duct VAV') -> None:
+    """Validate that all input data contains the headers required by these
+    rules and data formatting.
+    This function is called to give the user more informative messages than
+    errors raised by pandas if a user does not have the required headrs
+    inputs
+    -------
+    filepath: (str) CSV file or trend store
+    required_headers: (list) of headers read by the rule checker
+    equipment_name: (str) equipment of the rule checker, used in messages"""
+
+    if is_trend_store(filepath):
+        supplied_headers: List[str] = TrendStore(filepath).columns
+    else:
+        # Open .csv file with simple csv reader to parse first row of headers
+        with open(filepath, newline='', encoding='UTF-8') as csvfile:
+            reader = csv.reader(csvfile, delimiter=',',
+                                quoting=csv.QUOTE_MINIMAL)
+            supplied_headers: List[str] = next(reader)
+
+    if set(required_headers).issubset(set(supplied_headers)):
+        # All required headers are found within passed data
+        pass
+    else:
+        missing_headers: set = set(
+            required_headers).difference(supplied_headers)
+        msg = ("The user passed file does not contain all of the required headers.\n" +
+               f"Missing headers: {missing_headers}\n" +
+               f"Requred headers: {required_headers}\n" +
+               f"Supplied headers: {supplied_headers}")
+        raise ValueError(msg)
+
+    difference: set = set(supplied_headers).difference(required_headers)
+    if len(difference) > 0:
+        msg: str = ("INFO: Extra data columns were passed through user csv " +
+                    "file that will be igored by" +
+                    f" this {equipment_name} rule checker. Unused column headers: {difference}")
+        print(msg)
+
+    return None
+
+
+def read_csv_chunks(filepath, headers, dtypes, chunksize: int
+                    ) -> Iterator[pd.DataFrame]:
+    """Read a CSV file in chunks of chunksize rows, with the same headers
+    and datatypes as read_csv. Each chunk is indexed by its row number
+    within the file, so indices of a chunk match indices of a full load.
+    The datetime format is sniffed from the first chunk only"""
+    formats = None
+    with pd.read_csv(filepath, sep=',', usecols=headers, dtype=dtypes,
+                     chunksize=chunksize) as reader:
+        while True:
+            with stage('read_csv_chunks') as record:
+                chunk = next(reader, None)
+                if chunk is not None:
+                    formats = parse_date_columns(chunk, ['DateTime'], formats)
+                    record.rows = chunk.shape[0]
+            if chunk is None:
+                break
+            yield chunk
+
+
+def read_csv_rows(filepath, headers, dtypes, rows: Iterable[int],
+                  chunksize: int) -> pd.DataFrame:
+    """Read only rows of a CSV file, streaming the file in chunks. Used to
+    collect the data reported for faults found while streaming
+    inputs
+    -------
+    headers: (list) of columns to read, including 'DateTime'
+    rows: (iterable) of row numbers (data indices) to keep
+    outputs
+    -------
+    data: (pd.DataFrame) indexed by row number"""
+    rows = np.unique(np.asarray(list(rows), dtype=np.int64))
+    dtypes = {header: dtypes[header] for header in headers if header in dtypes}
+    kept = []
+    chunks = read_csv_chunks(filepath, headers, dtypes, chunksize)
+    for chunk in chunks:
+        if rows.shape[0] == 0:
+            break
+        in_chunk = rows[(rows >= chunk.index[0]) & (rows <= chunk.index[-1])]
+        if in_chunk.shape[0]:
+            kept.append(chunk.loc[in_chunk])
+        if chunk.index[-1] >= rows[-1]:
+            break  # Remaining rows are not reported
+    chunks.close()
+    if not kept:
+        return pd.DataFrame(columns=headers)
+
+    return pd.concat(kept)
+
+
 def _parse_date_time_str_YmdHM(dates: Iterable[str], times: Iterable[str]) -> List[datetime]:
     """Parse incomplete ISO times in the format H:MM:SS to HH:MM:SS as a 
     python time datetime.time object
@@ -38,12 +219,10 @@ def _parse_date_time_str_YmdHM(dates: Iterable[str], times: Iterable[str]) -> Li
     -------
     dates: (list) of strings representing date in format %Y-%m-%d
     times: (list) of strings representing time in format %H:%M"""
-    iso_times = []
-    for date_str, time_str in zip(dates, times):
-        iso_times.append(datetime.strptime(
-            date_str + time_str, "%Y-%m-%d%H:%M"))
+    datetimes = combine_date_time(dates, times, date_format='%Y-%m-%d',
+                                  time_format='%H:%M')
 
-    return iso_times
+    return list(pd.DatetimeIndex(datetimes).to_pydatetime())
 
 
 def _correct_time_str_HM(times: Iterable[str]) -> List[str]:
@@ -74,34 +253,98 @@ def masked_consecutive_elements(data: np.ma.MaskedArray, n_consecutive_elements:
     res = masked_consecutive_elements(data, 3) # [4, 10]
     >>> res
     out: [4, 10]
+    See runlength.consecutive_runs for the lengths and ends of every run
     """
-    rising_edge = []
-    pushed = False
-    consecutive_count = 0
-
-    for i in range(0, data.shape[0]):
-        if data[i]:
-            consecutive_count += 1
-            if consecutive_count == n_consecutive_elements and not pushed:
-                rising_edge.append(i - n_consecutive_elements + 1)
-                pushed = True
-        else:
-            consecutive_count = 0
-            pushed = False
-
-    return rising_edge
+    return rising_edges(data, n_consecutive_elements).tolist()
 
 
 def masked_rolling_sum(data: np.ma.MaskedArray, n_consecutive_elements: int):
     """Return the indices of a masked array that contain 'n' consecutive 
-    True elements"""
-    window_sum = np.zeros((data.shape[0] - n_consecutive_elements))
-    for i in range(0, data.shape[0] - n_consecutive_elements):
-        window_sum[i] = np.sum(data[i:n_consecutive_elements])
+    True elements. Each returned index is the start of a window
+    data[i:i + n_consecutive_elements] where every element is True"""
+    window_sum = rolling_count(data, n_consecutive_elements)
 
     return np.where(window_sum == n_consecutive_elements)
 
 
+def rolling_count(data: np.ma.MaskedArray, window: int) -> np.ndarray:
+    """Count True elements within a sliding window of a fixed number of
+    samples
+    inputs
+    -------
+    data: (np.ma.MaskedArray) array of 0,1 representing a test condition
+    window: (int) number of samples in each window
+    outputs
+    -------
+    counts: (np.ndarray) counts[i] is the number of True elements in
+    data[i:i + window]. There are len(data) - window + 1 windows
+    Example
+    rolling_count(np.array([1,1,0,1,1,1]), 3) # array([2, 2, 2, 3])
+    """
+    if window < 1:
+        raise ValueError(f"Window must contain at least one sample. Got {window}")
+    cumulative = _cumulative_count(data)
+    if cumulative.shape[0] <= window:
+        return np.zeros(0, dtype=np.int64)
+
+    return cumulative[window:] - cumulative[:-window]
+
+
+def rolling_count_time(data: np.ma.MaskedArray,
+                       datetimes: Iterable[datetime],
+                       window: Union[str, pd.Timedelta, np.timedelta64]
+                       ) -> np.ndarray:
+    """Count True elements within a sliding window of fixed duration
+    inputs
+    -------
+    data: (np.ma.MaskedArray) array of 0,1 representing a test condition
+    datetimes: (iterable) of ascending datetime / pd.Timestamp, one per
+    element of data
+    window: (str, pd.Timedelta) duration of each window, like '15min'
+    outputs
+    -------
+    counts: (np.ndarray) counts[i] is the number of True elements with a
+    timestamp in [datetimes[i], datetimes[i] + window). There is one
+    window for each element of data
+    """
+    nanoseconds = _datetimes_to_nanoseconds(datetimes)
+    window_ns = pd.Timedelta(window).value
+    if window_ns <= 0:
+        raise ValueError(f"Window must have a positive duration. Got {window}")
+    cumulative = _cumulative_count(data)
+    # Index one past the last sample inside each window
+    window_end = np.searchsorted(nanoseconds, nanoseconds + window_ns,
+                                 side='left')
+
+    return cumulative[window_end] - cumulative[:-1]
+
+
+def _cumulative_count(data: np.ma.MaskedArray) -> np.ndarray:
+    """Cumulative count of True elements, with a leading zero so that
+    cumulative[j] - cumulative[i] is the count of True in data[i:j].
+    Masked elements are counted as False"""
+    if isinstance(data, np.ma.MaskedArray):
+        data = data.filled(False)
+    mask = np.asarray(data, dtype=bool)
+    cumulative = np.zeros(mask.shape[0] + 1, dtype=np.int64)
+    np.cumsum(mask, out=cumulative[1:])
+
+    return cumulative
+
+
+def _datetimes_to_nanoseconds(datetimes: Iterable[datetime]) -> np.ndarray:
+    """Convert an iterable of datetime / pd.Timestamp / np.datetime64 into
+    an int64 array of nanoseconds since the unix epoch"""
+    if isinstance(datetimes, np.ndarray) and \
+            np.issubdtype(datetimes.dtype, np.datetime64):
+        values = datetimes.astype('datetime64[ns]', copy=False)
+    else:
+        values = pd.to_datetime(pd.Series(datetimes)).to_numpy(
+            dtype='datetime64[ns]')
+
+    return values.view(np.int64)
+
+
 def _datetimes_to_seconds_deviation_from_start(datetimes: Iterable[datetime]) -> np.array:
     """Given an iterable of datetime objects, return an equally sized numpy
     array where each element in the array is the number of seconds deviation 
@@ -110,12 +353,30 @@ def _datetimes_to_seconds_deviation_from_start(datetimes: Iterable[datetime]) ->
     inputs
     -------
     datetime: (iterable) of datetime / pd.DateTime"""
+    nanoseconds = _datetimes_to_nanoseconds(datetimes)
+    if nanoseconds.shape[0] == 0:
+        return np.empty(0)
+
+    return (nanoseconds - nanoseconds[0]) / 1e9
 
-    time_delta = np.empty((len(datetimes)))
-    for i in range(0, len(time_delta)):
-        time_delta[i] = (datetimes[i] - datetimes[0]).seconds
 
-    return time_delta
+def _hour_segment_starts(seconds: Iterable[float],
+                         origin: float = None) -> np.ndarray:
+    """Given an iterable of ascending seconds, return the index of the first
+    element of each hour long segment. Segments are consecutive hour windows
+    measured from origin (default: the first element)
+    Example
+    seconds = [0,900,2700,4500,8100] # [0,15,45,75,135] minutes
+    >>> _hour_segment_starts(seconds) # array([0, 3, 4])
+    """
+    seconds = np.asarray(seconds, dtype=np.float64)
+    if seconds.shape[0] == 0:
+        return np.zeros(0, dtype=np.int64)
+    if origin is None:
+        origin = seconds[0]
+    hours = np.floor((seconds - origin) / 3600).astype(np.int64)
+
+    return np.concatenate(([0], np.flatnonzero(np.diff(hours)) + 1))
 
 
 def _hour_segment_indices_from_seconds(seconds: Iterable[int]) -> List[List[int]]:
@@ -129,38 +390,61 @@ def _hour_segment_indices_from_seconds(seconds: Iterable[int]) -> List[List[int]
     res = _hour_segment_indices_from_seconds(seconds)
     >>> res # [[0,1,2],[3],[4]]
     """
-    previous_hour = 0
-    indices = []
-    segment = []
-
-    for i in range(0, len(seconds)):
-        if seconds[i] - seconds[previous_hour] >= 3600:
-            indices.append(deepcopy(segment))
-            segment.clear()
-            segment.append(i)
-            previous_hour = i
-        else:
-            segment.append(i)
-
-    if len(indices) == 0:
-        # nothing got appended to indices
-        indices.append(segment)
-
-    # Handle the last element
-    try:
-        last_element = indices[-1][-1]
-    except IndexError:
-        indices[-1].append(i)
-        return indices
-
-    if last_element == len(seconds):
-        # The last time segment was exactly an hour
-        return indices
-    else:
-        # The last time segment was not a full hour
-        indices[-1].append(i)
+    starts = _hour_segment_starts(seconds)
+    indices = np.arange(len(seconds))
 
-    return indices
+    return [segment.tolist() for segment in np.split(indices, starts[1:])]
+
+
+def hourly_integrals(seconds: Iterable[float], values: Iterable[float],
+                     origin: float = None
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Trapezoidal integral of values over each hour long segment, in units
+    of value * hour. Every segment is integrated in a single np.add.reduceat
+    pass
+    inputs
+    -------
+    seconds: (iterable) of ascending seconds, see
+    _datetimes_to_seconds_deviation_from_start
+    values: (iterable) of values to integrate, one per element of seconds
+    origin: (float) start of the first hour window (default: seconds[0]).
+    Used when seconds are part of a longer trend
+    outputs
+    -------
+    starts: (np.ndarray) index of the first element of each segment
+    ends: (np.ndarray) index one past the last element of each segment
+    integrals: (np.ndarray) integral of values over each segment"""
+    seconds = np.asarray(seconds, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    starts = _hour_segment_starts(seconds, origin)
+    ends = np.append(starts[1:], seconds.shape[0])
+    if starts.shape[0] == 0:
+        return starts, ends, np.zeros(0)
+
+    # Area of the trapezoid between element i and i+1
+    areas = np.zeros(seconds.shape[0])
+    areas[:-1] = (values[1:] + values[:-1]) * np.diff(seconds) / 2
+    # Trapezoids that cross into the next segment are not part of either
+    areas[ends[:-1] - 1] = 0
+    integrals = np.add.reduceat(areas, starts) / 3600
+
+    return starts, ends, integrals
+
+
+def hourly_deviation(datetimes: Iterable[datetime],
+                     setpoint: Iterable[float],
+                     process: Iterable[float]
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Integral of setpoint minus process variable over each hour long
+    segment of datetimes, in units of [process variable * hour]
+    outputs
+    -------
+    starts, ends, deviation: (np.ndarray) see hourly_integrals"""
+    seconds = _datetimes_to_seconds_deviation_from_start(datetimes)
+    diff = (np.asarray(setpoint, dtype=np.float64) -
+            np.asarray(process, dtype=np.float64))
+
+    return hourly_integrals(seconds, diff)
 
 
 def maximum_allowed_failures(mask: np.ma.MaskedArray,
@@ -173,20 +457,43 @@ def maximum_allowed_failures(mask: np.ma.MaskedArray,
 
     max_failures = math.floor(failure_percent * len(mask))
     if mask.sum() > max_failures:
-        report_indices = mask.nonzero()[0][:max_failures]
-        data_view = data.loc[report_indices,
-                             report_columns].to_dict(orient='list')
-        gmsg = ("The maximum allowed instances ({} at {:.0%} of samples) was " +
-                "exceeded ({} observed)")
-        msg = error_msg + "\n" + gmsg
-        msg = msg.format(max_failures, failure_percent, mask.sum())
-        data_view['primary_axis_label'] = report_columns[0]
-        data_view['dependent_axis_labels'] = report_columns[1:]
-        raise FDDException(msg, data_view)
+        raise allowed_failures_exception(
+            data, mask.nonzero()[0], failure_percent, report_columns,
+            error_msg)
 
     return None
 
 
+def allowed_failures_exception(data: pd.DataFrame,
+                               failure_indices: np.ndarray,
+                               failure_percent: float,
+                               report_columns: List[str],
+                               error_msg: str) -> FDDException:
+    """Create the FDDException reported when the maximum number of failures
+    is exceeded
+    inputs
+    -------
+    failure_indices: (np.ndarray) index of every failed sample in data"""
+
+    max_failures = math.floor(failure_percent * data.shape[0])
+    report_indices = failure_indices[:max_failures]
+    msg = allowed_failures_message(error_msg, max_failures, failure_percent,
+                                   len(failure_indices))
+
+    return FDDException(msg, report_data_view(data, report_indices,
+                                              report_columns))
+
+
+def allowed_failures_message(error_msg: str, max_failures: int,
+                             failure_percent: float, n_failures: int) -> str:
+    """Message reported when the maximum number of failures is exceeded"""
+    gmsg = ("The maximum allowed instances ({} at {:.0%} of samples) was " +
+            "exceeded ({} observed)")
+    msg = error_msg + "\n" + gmsg
+
+    return msg.format(max_failures, failure_percent, n_failures)
+
+
 def failure_threshold_exceeded(data: pd.DataFrame,
                                report_columns: List[str],
                                report_indices: List[int],
@@ -195,37 +502,155 @@ def failure_threshold_exceeded(data: pd.DataFrame,
     exceeded
     Useful for calculated thresholds (total sum, integration, etc.)"""
 
-    data_view = data.loc[report_indices, report_columns].to_dict(orient='list')
-    gmsg = ("Failure threshold exceeded")
-    msg = error_msg + "\n" + gmsg
-    data_view['primary_axis_label'] = report_columns[0]
-    data_view['dependent_axis_labels'] = report_columns[1:]
-    raise FDDException(msg, data_view)
+    msg = failure_threshold_message(error_msg)
+    raise FDDException(msg, report_data_view(data, report_indices,
+                                             report_columns))
 
     return None
 
 
+def failure_threshold_message(error_msg: str) -> str:
+    """Message reported when a calculated threshold is exceeded"""
+    gmsg = ("Failure threshold exceeded")
+
+    return error_msg + "\n" + gmsg
+
+
 def maximum_consecutive_failures(mask: np.ma.MaskedArray,
                                  data: pd.DataFrame,
                                  failure_consecutive: float,
                                  report_columns: List[str],
                                  error_msg: str) -> None:
+    """Raise a FDDException if a mask contains failure_consecutive or more
+    consecutive failures"""
 
     consecutive_indices = masked_consecutive_elements(
         mask, failure_consecutive)
     if len(consecutive_indices) > 0:
-        report_indices = np.arange(max(0, consecutive_indices[0] - 10),
-                                   min(consecutive_indices[0] +
-                                       10, data.shape[0]),
-                                   step=1, dtype=int)
-        data_view = data.loc[report_indices,
-                             report_columns].to_dict(orient='list')
-        gmsg = ("The maximum allowed consecutive instances ({}) was exceeded " +
-                "starting at data indices {}")
+        raise consecutive_failures_exception(
+            data, consecutive_indices, failure_consecutive, report_columns,
+            error_msg)
+
+    return None
+
+
+def consecutive_failures_exception(data: pd.DataFrame,
+                                   consecutive_indices: List[int],
+                                   failure_consecutive: float,
+                                   report_columns: List[str],
+                                   error_msg: str) -> FDDException:
+    """Create the FDDException reported when the maximum number of
+    consecutive failures is exceeded
+    inputs
+    -------
+    consecutive_indices: (list) start index of every run of consecutive
+    failures"""
+
+    report_indices = surrounding_indices(consecutive_indices[0],
+                                         data.shape[0])
+    msg = consecutive_failures_message(error_msg, failure_consecutive,
+                                       consecutive_indices)
+
+    return FDDException(msg, report_data_view(data, report_indices,
+                                              report_columns))
+
+
+def consecutive_failures_message(error_msg: str, failure_consecutive: float,
+                                 consecutive_indices: List[int]) -> str:
+    """Message reported when the maximum number of consecutive failures is
+    exceeded"""
+    gmsg = ("The maximum allowed consecutive instances ({}) was exceeded " +
+            "starting at data indices {}")
+    msg = error_msg + "\n" + gmsg
+
+    return msg.format(failure_consecutive, consecutive_indices)
+
+
+def surrounding_indices(index: int, n_samples: int,
+                        n_surrounding: int = 10) -> np.ndarray:
+    """Return the indices within n_surrounding samples of index, clipped to
+    the bounds of the data. Used to plot the data around a failure"""
+    return np.arange(max(0, index - n_surrounding),
+                     min(index + n_surrounding, n_samples),
+                     step=1, dtype=int)
+
+
+def row_positions(index: pd.Index,
+                  labels: Iterable[int]) -> Union[slice, np.ndarray]:
+    """Return the positions of index labels. Consecutive positions are
+    returned as a slice, so indexing an array returns a view
+    inputs
+    -------
+    index: (pd.Index) index of a dataframe
+    labels: (iterable) of index labels
+    outputs
+    -------
+    positions: (slice, np.ndarray) positions of labels within index"""
+    labels = np.asarray(labels)
+    if (isinstance(index, pd.RangeIndex) and index.start == 0 and
+            index.step == 1 and labels.dtype.kind in 'iu'):
+        positions = labels
+        if labels.size and (labels.min() < 0 or labels.max() >= len(index)):
+            raise KeyError(f"Labels not found in index: {labels}")
+    else:
+        positions = index.get_indexer(labels)
+        if (positions < 0).any():
+            raise KeyError("Labels not found in index: " +
+                           f"{labels[positions < 0]}")
+
+    if positions.size == 0:
+        return slice(0, 0)
+    if (positions[-1] - positions[0] + 1 == positions.size and
+            np.all(np.diff(positions) == 1)):
+        return slice(int(positions[0]), int(positions[-1]) + 1)
+
+    return positions
+
+
+def report_data_view(data: pd.DataFrame,
+                     report_indices: Iterable[int],
+                     report_columns: List[str]) -> dict:
+    """Create the data passed to a FDDException for plotting
+    Each column is a np.ndarray. When report indices are consecutive the
+    arrays are views of data (not copies), and datetime columns remain
+    datetime64 so they are plotted without conversion
+    inputs
+    -------
+    report_indices: (iterable) of rows (index labels) to report
+    report_columns: (list) of columns to report. The first column is the
+    primary (independent) axis, and other columns are dependent axes"""
+
+    positions = row_positions(data.index, report_indices)
+    data_view = {column: data[column].to_numpy()[positions]
+                 for column in report_columns}
+    data_view['primary_axis_label'] = report_columns[0]
+    data_view['dependent_axis_labels'] = report_columns[1:]
+
+    return data_view
+
+
+def maximum_windowed_failures(mask: np.ma.MaskedArray,
+                              data: pd.DataFrame,
+                              failure_count: int,
+                              window: Union[int, str, pd.Timedelta],
+                              report_columns: List[str],
+                              error_msg: str) -> None:
+    """Raise a FDDException if failure_count or more failures occur within
+    a window. The window is a number of samples (int) or a duration keyed on
+    the first report column, like '15min'"""
+
+    if isinstance(window, (int, np.integer)):
+        counts = rolling_count(mask, int(window))
+    else:
+        counts = rolling_count_time(mask, data[report_columns[0]], window)
+    exceeded = np.flatnonzero(counts >= failure_count)
+    if exceeded.shape[0] > 0:
+        report_indices = surrounding_indices(exceeded[0], data.shape[0])
+        gmsg = ("The maximum allowed instances ({}) within a window of {} " +
+                "was exceeded starting at data indices {}")
         msg = error_msg + "\n" + gmsg
-        msg = msg.format(failure_consecutive, consecutive_indices)
-        data_view['primary_axis_label'] = report_columns[0]
-        data_view['dependent_axis_labels'] = report_columns[1:]
-        raise FDDException(msg, data_view)
+        msg = msg.format(failure_count, window, exceeded[:10].tolist())
+        raise FDDException(msg, report_data_view(data, report_indices,
+                                                 report_columns))
 
     return None
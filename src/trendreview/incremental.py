@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:32:09 2026
+
+@author: jvorsten
+
+Incremental review of growing trend files
+Exports of the same unit grow every day, and only the appended rows are
+new. After a file is reviewed, the state of its rule plan (see
+engine.PlanState) is saved as a checkpoint: counts of failed samples of the
+percent rules, runs of failed samples (including a run which reaches the
+last row and is still open), the partial integral of the open hour of the
+deviation rules, and the byte offset and timestamp of the last row
+reviewed. The next review of the file parses and evaluates only the rows
+after the offset, and returns the same faults as reviewing the whole file
+
+Validity
+A checkpoint is used only when the file starts with the bytes it had when
+the checkpoint was saved (the first and last DIGEST_BYTES bytes before the
+offset are compared), and the rules and headers of the review are
+unchanged. Otherwise the whole file is reviewed and the checkpoint is
+replaced. A last line without a line break may still be being written, so
+it is not included in the checkpoint. It is reviewed when it has as many
+fields as the header line. Rows must not contain quoted commas or line
+breaks
+
+Rule methods which are not part of the rule plan of the equipment are
+called on the appended rows only. Rows reported for faults are read from
+the file when faults are reported (see helpers.read_csv_rows)
+
+Example
+checkpoints = CheckpointStore('c:/path/to/checkpoints')
+rules = DDVAVRules('c:/path/to/trend.csv', checkpoints=checkpoints)
+faults = rules.collect_faults()  # Later reviews parse only appended rows
+"""
+
+# Python imports
+from typing import Callable, Dict, Iterator, List, Mapping, Optional
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from trendreview.engine import (MaskRule, RulePlan, PlanState,
+                                _call_rule_methods)
+from trendreview.faults import Fault
+from trendreview.dateparse import parse_date_columns
+from trendreview.profiling import stage
+
+# Declarations
+CHECKPOINT_FORMAT_VERSION = 1
+DIGEST_BYTES = 2**16
+DEFAULT_CHUNKSIZE = 100000
+READ_BLOCK_SIZE = 2**16
+
+# %%
+
+
+def plan_signature(plan: RulePlan, headers: List[str]) -> str:
+    """Hash of the rules of a plan and the headers read for it. A
+    checkpoint is only valid for the same signature"""
+    rules = []
+    for rule in plan.rules:
+        if isinstance(rule, MaskRule):
+            rules.append([rule.name, rule.condition, rule.failure_percent,
+                          rule.failure_consecutive])
+        else:
+            rules.append([rule.name, rule.datetime_column,
+                          rule.setpoint_column, rule.process_column,
+                          rule.failure_threshold])
+    text = json.dumps([rules, list(headers)], default=str)
+
+    return hashlib.sha256(text.encode('UTF-8')).hexdigest()
+
+
+def last_line_end(filepath: str) -> int:
+    """Return the byte offset after the last line break of a file, or 0"""
+    with open(filepath, 'rb') as file:
+        position = file.seek(0, os.SEEK_END)
+        while position > 0:
+            start = max(position - READ_BLOCK_SIZE, 0)
+            file.seek(start)
+            block = file.read(position - start)
+            index = block.rfind(b'\n')
+            if index >= 0:
+                return start + index + 1
+            position = start
+
+    return 0
+
+
+def _complete_tail(filepath: str, start: int) -> bool:
+    """True if the bytes after start (the last line, without a line break)
+    have as many fields as the header line of the file"""
+    with open(filepath, 'rb') as file:
+        header = file.readline()
+        file.seek(start)
+        tail = file.read()
+
+    return bool(tail.strip()) and tail.count(b',') == header.count(b',')
+
+
+def _digest(filepath: str, start: int, stop: int) -> str:
+    """sha256 hex digest of the bytes [start, stop) of a file"""
+    with open(filepath, 'rb') as file:
+        file.seek(start)
+        return hashlib.sha256(file.read(stop - start)).hexdigest()
+
+
+class _BoundedReader(io.RawIOBase):
+    """Binary reader of the bytes [start, stop) of a file"""
+
+    def __init__(self, file, start: int, stop: int):
+        super().__init__()
+        self.file = file
+        self.file.seek(start)
+        self.remaining = stop - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        data = self.file.read(size)
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+def read_csv_range(filepath: str, headers: List[str], dtypes: Mapping,
+                   start: int, stop: int, first_row: int, chunksize: int,
+                   formats: Dict[str, Optional[str]]
+                   ) -> Iterator[pd.DataFrame]:
+    """Read the rows within the bytes [start, stop) of a CSV file in chunks
+    of chunksize rows, like helpers.read_csv_chunks
+    inputs
+    -------
+    start, stop: (int) byte offsets at the start of a line. When start is 0
+    the range begins with the header line
+    first_row: (int) row number (data index) of the first row in the range
+    formats: (dict) datetime formats of the file (see
+    dateparse.parse_date_columns). Formats sniffed from the range are added
+    to it, so later ranges are parsed like the first"""
+    if stop <= start:
+        return
+    options = {'usecols': headers, 'dtype': dtypes, 'chunksize': chunksize}
+    if start > 0:
+        names = pd.read_csv(filepath, nrows=0).columns
+        options.update(header=None, names=list(names))
+    with open(filepath, 'rb') as file, pd.read_csv(io.BufferedReader(
+            _BoundedReader(file, start, stop)), sep=',', **options) as reader:
+        while True:
+            with stage('read_csv_range') as record:
+                chunk = next(reader, None)
+                if chunk is not None:
+                    chunk.index = pd.RangeIndex(first_row,
+                                                first_row + chunk.shape[0])
+                    formats.update(parse_date_columns(chunk, ['DateTime'],
+                                                      formats))
+                    first_row += chunk.shape[0]
+                    record.rows = chunk.shape[0]
+            if chunk is None:
+                break
+            yield chunk
+
+
+class Checkpoint:
+    """State of a rule plan after reviewing the start of a file"""
+
+    def __init__(self, state: PlanState, offset: int,
+                 formats: Dict[str, Optional[str]],
+                 last_timestamp: str = None):
+        """inputs
+        -------
+        state: (PlanState) of the rows before offset
+        offset: (int) byte offset after the last row reviewed
+        formats: (dict) datetime formats of the file
+        last_timestamp: (str) DateTime of the last row reviewed"""
+        self.state = state
+        self.offset = offset
+        self.formats = formats
+        self.last_timestamp = last_timestamp
+
+        return None
+
+    def __repr__(self):
+        return (f"Checkpoint(rows={self.state.n_samples}, " +
+                f"offset={self.offset}, " +
+                f"last_timestamp={self.last_timestamp!r})")
+
+
+class CheckpointStore:
+    """Directory of checkpoints, one for each reviewed file
+
+    Each checkpoint is an .npz file of the arrays of a PlanState (see
+    PlanState.to_arrays) and a JSON description, named by a hash of the
+    absolute path of the file"""
+
+    def __init__(self, directory: str):
+        """inputs
+        -------
+        directory: (str) directory of checkpoints, created when needed"""
+        self.directory = os.path.abspath(directory)
+
+        return None
+
+    def __repr__(self):
+        return f"CheckpointStore({self.directory!r})"
+
+    def checkpoint_filepath(self, filepath: str) -> str:
+        """Path of the checkpoint of a file"""
+        key = hashlib.sha256(
+            os.path.abspath(filepath).encode('UTF-8')).hexdigest()
+
+        return os.path.join(self.directory, key + '.npz')
+
+    def load(self, filepath: str, plan: RulePlan, headers: List[str]
+             ) -> Optional[Checkpoint]:
+        """Return the checkpoint of a file, or None when there is no valid
+        checkpoint (see module documentation)"""
+        checkpoint_filepath = self.checkpoint_filepath(filepath)
+        if not os.path.isfile(checkpoint_filepath):
+            return None
+        try:
+            with np.load(checkpoint_filepath, allow_pickle=False) as saved:
+                arrays = {key: saved[key] for key in saved.files}
+            meta = json.loads(str(arrays.pop('meta')))
+        except (OSError, ValueError, KeyError):
+            return None  # Damaged, written by an interrupted review
+
+        offset = meta.get('offset', -1)
+        if (meta.get('version') != CHECKPOINT_FORMAT_VERSION or
+                meta.get('signature') != plan_signature(plan, headers) or
+                not 0 <= offset <= os.path.getsize(filepath)):
+            return None
+        head = min(offset, DIGEST_BYTES)
+        tail = max(offset - DIGEST_BYTES, 0)
+        if (_digest(filepath, 0, head) != meta['head_digest'] or
+                _digest(filepath, tail, offset) != meta['tail_digest']):
+            return None  # Changed, not only appended to
+
+        return Checkpoint(PlanState.from_arrays(plan, arrays), offset,
+                          meta['formats'], meta['last_timestamp'])
+
+    def save(self, filepath: str, plan: RulePlan, headers: List[str],
+             checkpoint: Checkpoint) -> None:
+        """Save the checkpoint of a file, replacing an older checkpoint"""
+        offset = checkpoint.offset
+        meta = {
+            'version': CHECKPOINT_FORMAT_VERSION,
+            'filepath': os.path.abspath(filepath),
+            'signature': plan_signature(plan, headers),
+            'offset': offset,
+            'rows': checkpoint.state.n_samples,
+            'head_digest': _digest(filepath, 0, min(offset, DIGEST_BYTES)),
+            'tail_digest': _digest(filepath, max(offset - DIGEST_BYTES, 0),
+                                   offset),
+            'formats': checkpoint.formats,
+            'last_timestamp': checkpoint.last_timestamp}
+        os.makedirs(self.directory, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(prefix='.tmp-', suffix='.npz',
+                                             dir=self.directory)
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                np.savez(file, meta=np.array(json.dumps(meta)),
+                         **checkpoint.state.to_arrays())
+            os.replace(temporary, self.checkpoint_filepath(filepath))
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+        return None
+
+
+def incremental_method_faults(plan: RulePlan, methods: List[Callable],
+                              filepath: str, headers: List[str],
+                              dtypes: Mapping, checkpoints: CheckpointStore,
+                              chunksize: int = DEFAULT_CHUNKSIZE
+                              ) -> Dict[str, List[Fault]]:
+    """Return the faults of each rule method like engine.method_faults,
+    evaluating only the rows appended to filepath since its checkpoint. The
+    checkpoint is then moved to the end of the file
+    inputs
+    -------
+    plan: (RulePlan) compiled rules of the equipment
+    methods: (list) of rule methods, like DDVAVRules.get_rules()
+    headers, dtypes: columns read from the file, see helpers.read_csv
+    checkpoints: (CheckpointStore)
+    chunksize: (int) number of rows parsed at once
+    outputs
+    -------
+    faults: (dict) of method name to a list of faults"""
+    names = [method.__name__ for method in methods]
+    selection = plan.select(names)
+    others = [method for method in methods
+              if method.__name__ not in selection.names]
+    faults: Dict[str, List[Fault]] = {name: [] for name in names}
+
+    checkpoint = checkpoints.load(filepath, selection, headers)
+    if checkpoint is None:
+        checkpoint = Checkpoint(selection.stream(), 0, {})
+    state = checkpoint.state
+
+    def evaluate(start: int, stop: int) -> None:
+        for chunk in read_csv_range(filepath, headers, dtypes, start, stop,
+                                    state.n_samples, chunksize,
+                                    checkpoint.formats):
+            state.update(selection.to_numpy(chunk))
+            _call_rule_methods(others, chunk, faults)
+            checkpoint.last_timestamp = str(chunk['DateTime'].iloc[-1])
+
+    stop = last_line_end(filepath)
+    evaluate(checkpoint.offset, stop)
+    checkpoint.offset = stop
+    checkpoints.save(filepath, selection, headers, checkpoint)
+    # A last line without a line break is not checkpointed, see module
+    if _complete_tail(filepath, stop):
+        evaluate(stop, os.path.getsize(filepath))
+    faults.update(state.rule_faults())
+
+    return faults
@@ -0,0 +1,519 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:02:55 2026
+
+@author: jvorsten
+
+Live review of point feeds
+Rules of equipment (see engine.MaskRule) are checked on each new sample of
+many units as it arrives, instead of on a finished trend file. Samples are
+records of the points of one unit, like a row of a trend file, read from
+a BACnet poller, an MQTT subscription or replayed trends (see
+replay_trends). Points missing from a sample keep their last value, so feeds
+which only publish changed values are supported. Each sample counts as one
+sample of the rules, so point feeds should be grouped into one sample per
+unit and polling interval
+
+State of each unit
+1. the last value of each point
+2. the number of consecutive failed samples of each rule
+3. a ring buffer of whether each of the last `window` samples failed each
+rule, and the number of failed samples within it
+
+Fault events
+'consecutive': emitted with status 'failed' on the sample where a run of
+failed samples reaches failure_consecutive, and 'cleared' on the first
+passing sample after it. The failed sample numbers equal the starts of the
+consecutive faults of reviewing the trend as a file, plus
+failure_consecutive - 1
+'percent': emitted with status 'failed' when more than failure_percent of
+the last `window` samples failed, and 'cleared' when they no longer do.
+Unlike reviewing a file, the percent is of a sliding window and not of the
+whole trend
+HourlyDeviationRules are not checked live
+
+Samples of every unit are evaluated together in batches, so the cost of a
+sample does not grow with the number of units. A batch is evaluated when it
+holds max_batch samples, or max_latency seconds after its first sample
+arrived, which bounds the time from a sample to its fault events. When
+sources send samples faster than they are evaluated, at most max_batch
+samples are queued, and a sample also waits for the batch before it
+
+Example
+async for event in live_faults(DDVAVRules.plan, sources, max_latency=0.1):
+    print(event.to_dict())
+python -m trendreview.live --type ddvav ./data/DD03.csv ./data/DD04.csv
+"""
+
+# Python imports
+from typing import (Any, AsyncIterator, Deque, Dict, Iterable, Iterator,
+                    List, Mapping, Sequence, Tuple, Union)
+from collections import deque
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from trendreview.engine import RulePlan, condition_columns
+from trendreview.equipment import equipment_class, equipment_types
+from trendreview.dateparse import parse_date_columns
+
+# Declarations
+DEFAULT_WINDOW = 288  # Samples, one day of 5 minute samples
+DEFAULT_MAX_BATCH = 4096
+DEFAULT_MAX_LATENCY = 0.1  # [s]
+EVENT_STATUSES = ['failed', 'cleared']
+INITIAL_UNITS = 64
+REPLAY_CHUNK_ROWS = 32
+
+# %%
+
+
+class Sample:
+    """Values of the points of one unit at one time"""
+    __slots__ = ('unit', 'timestamp', 'values', 'received')
+
+    def __init__(self, unit: str, timestamp: Any, values: Mapping[str, Any]):
+        """inputs
+        -------
+        unit: (str) name of the unit, like 'DD03'
+        timestamp: time of the sample, reported with its fault events
+        values: (dict) of point (column) name to value. Points which are
+        missing, None or NaN keep their last value"""
+        self.unit = unit
+        self.timestamp = timestamp
+        self.values = values
+        self.received = time.perf_counter()
+
+        return None
+
+    def __repr__(self):
+        return f"Sample({self.unit!r}, {self.timestamp!r})"
+
+
+class FaultEvent:
+    """A rule of a unit started or stopped failing"""
+
+    def __init__(self, unit: str, rule: str, kind: str, status: str,
+                 timestamp: Any, sample: int, value: int, limit: int,
+                 message: str, latency: float):
+        """inputs
+        -------
+        unit: (str) name of the unit
+        rule: (str) name of the rule
+        kind: (str) 'consecutive' or 'percent', see module documentation
+        status: (str) one of EVENT_STATUSES
+        timestamp: timestamp of the sample which changed the status
+        sample: (int) number of the sample of the unit, from 0
+        value: (int) consecutive failed samples, or failed samples within
+        the window
+        limit: (int) failure_consecutive, or the maximum failed samples
+        within the window
+        message: (str) error message of the rule
+        latency: (float) seconds from receiving the sample to the event"""
+        self.unit = unit
+        self.rule = rule
+        self.kind = kind
+        self.status = status
+        self.timestamp = timestamp
+        self.sample = sample
+        self.value = value
+        self.limit = limit
+        self.message = message
+        self.latency = latency
+
+        return None
+
+    def __repr__(self):
+        return (f"FaultEvent({self.unit!r}, {self.rule!r}, {self.kind!r}, " +
+                f"{self.status!r}, sample={self.sample})")
+
+    def to_dict(self) -> Dict:
+        """JSON serializable description of the event"""
+        return {'unit': self.unit, 'rule': self.rule, 'kind': self.kind,
+                'status': self.status, 'timestamp': str(self.timestamp),
+                'sample': self.sample, 'value': self.value,
+                'limit': self.limit, 'message': self.message,
+                'latency': self.latency}
+
+
+def _grow(array: np.ndarray, size: int, fill) -> np.ndarray:
+    """Return array with its first axis grown to size, filled with fill"""
+    grown = np.full((size,) + array.shape[1:], fill, dtype=array.dtype)
+    grown[:array.shape[0]] = array
+
+    return grown
+
+
+class LiveState:
+    """State of the mask rules of a plan for every unit, updated with
+    batches of samples. See module documentation
+
+    Example
+    state = LiveState(DDVAVRules.plan, dtypes=DDVAV_TYPES)
+    events = state.update([Sample('DD03', timestamp, values), ...])
+    """
+
+    def __init__(self, plan: RulePlan, dtypes: Mapping[str, Any] = None,
+                 window: int = DEFAULT_WINDOW):
+        """inputs
+        -------
+        plan: (RulePlan) rules of the equipment, like DDVAVRules.plan. Only
+        MaskRules are checked
+        dtypes: (dict) of column name to datatype, like DDVAV_TYPES.
+        Numeric columns are kept as float64, other columns as objects
+        window: (int) number of samples of the percent rules"""
+        self.plan = RulePlan(plan.mask_rules)
+        self.window = window
+        self.units: Dict[str, int] = {}
+        self.unit_names: List[str] = []
+        columns = set()
+        for rule in self.plan.mask_rules:
+            columns |= condition_columns(rule.condition)
+        dtypes = dtypes or {}
+        self.values: Dict[str, np.ndarray] = {}
+        for column in sorted(columns):
+            numeric = column in dtypes and \
+                np.issubdtype(np.dtype(dtypes[column]), np.number)
+            self.values[column] = np.full(
+                INITIAL_UNITS, np.nan,
+                dtype=np.float64 if numeric else object)
+
+        n_rules = len(self.plan.mask_rules)
+        self.consecutive_limits = self.plan.failure_consecutive
+        self.percent_limits = np.floor(
+            self.plan.failure_percent * window).astype(np.int64)
+        self.n_samples = np.zeros(INITIAL_UNITS, dtype=np.int64)
+        self.runs = np.zeros((INITIAL_UNITS, n_rules), dtype=np.int64)
+        self.ring = np.zeros((INITIAL_UNITS, n_rules, window), dtype=bool)
+        self.window_counts = np.zeros((INITIAL_UNITS, n_rules),
+                                      dtype=np.int64)
+        self.percent_failed = np.zeros((INITIAL_UNITS, n_rules), dtype=bool)
+
+        return None
+
+    def unit_index(self, unit: str) -> int:
+        """Index of a unit in the state arrays, adding new units"""
+        index = self.units.get(unit)
+        if index is not None:
+            return index
+        index = self.units[unit] = len(self.unit_names)
+        self.unit_names.append(unit)
+        if index == self.n_samples.shape[0]:
+            size = 2 * index
+            self.values = {column: _grow(array, size, np.nan)
+                           for column, array in self.values.items()}
+            self.n_samples = _grow(self.n_samples, size, 0)
+            self.runs = _grow(self.runs, size, 0)
+            self.ring = _grow(self.ring, size, False)
+            self.window_counts = _grow(self.window_counts, size, 0)
+            self.percent_failed = _grow(self.percent_failed, size, False)
+
+        return index
+
+    def update(self, samples: Sequence[Sample]) -> List[FaultEvent]:
+        """Evaluate a batch of samples, in order of each unit
+        outputs
+        -------
+        events: (list) of FaultEvent, ordered by sample"""
+        # A unit may have several samples in the batch. Samples are
+        # evaluated in rounds which hold at most one sample of each unit
+        rounds: List[List[Sample]] = []
+        seen: Dict[str, int] = {}
+        for sample in samples:
+            occurrence = seen.get(sample.unit, 0)
+            seen[sample.unit] = occurrence + 1
+            if occurrence == len(rounds):
+                rounds.append([])
+            rounds[occurrence].append(sample)
+
+        events: List[FaultEvent] = []
+        for batch in rounds:
+            events.extend(self._update(batch))
+
+        return events
+
+    def _update(self, samples: Sequence[Sample]) -> List[FaultEvent]:
+        """Evaluate samples of distinct units, see update"""
+        indices = np.array([self.unit_index(sample.unit)
+                            for sample in samples], dtype=np.int64)
+        for column, array in self.values.items():
+            values = [sample.values.get(column) for sample in samples]
+            if array.dtype == object:
+                present = np.array([value is not None for value in values],
+                                   dtype=bool)
+                values = np.array(values, dtype=object)
+            else:
+                values = np.array(values, dtype=np.float64)  # None is NaN
+                present = ~np.isnan(values)
+            array[indices[present]] = values[present]
+
+        columns = {column: array[indices]
+                   for column, array in self.values.items()}
+        failed = self.plan.masks(columns).T  # (samples, rules)
+        numbers = self.n_samples[indices]
+        self.n_samples[indices] += 1
+
+        # Consecutive failed samples
+        previous_runs = self.runs[indices]
+        runs = np.where(failed, previous_runs + 1, 0)
+        self.runs[indices] = runs
+        consecutive_failed = runs == self.consecutive_limits
+        consecutive_cleared = ~failed & \
+            (previous_runs >= self.consecutive_limits)
+
+        # Failed samples within the window
+        window_counts = self.window_counts[indices]
+        if self.window > 0:
+            positions = (numbers % self.window)[:, None]
+            rules = np.arange(failed.shape[1])[None, :]
+            window_counts += failed
+            window_counts -= self.ring[indices[:, None], rules, positions]
+            self.ring[indices[:, None], rules, positions] = failed
+            self.window_counts[indices] = window_counts
+        percent_failed = window_counts > self.percent_limits
+        percent_changed = percent_failed != self.percent_failed[indices]
+        self.percent_failed[indices] = percent_failed
+
+        now = time.perf_counter()
+        events = []
+        for kind, changed, status, values, limits in [
+                ('consecutive', consecutive_failed | consecutive_cleared,
+                 consecutive_failed, np.maximum(runs, previous_runs),
+                 self.consecutive_limits),
+                ('percent', percent_changed, percent_failed, window_counts,
+                 self.percent_limits)]:
+            for row, column in zip(*np.nonzero(changed)):
+                sample = samples[row]
+                rule = self.plan.mask_rules[column]
+                events.append(FaultEvent(
+                    sample.unit, rule.name, kind,
+                    'failed' if status[row, column] else 'cleared',
+                    sample.timestamp, int(numbers[row]),
+                    int(values[row, column]), int(limits[column]),
+                    rule.error_msg, now - sample.received))
+        events.sort(key=lambda event: event.sample)
+
+        return events
+
+
+async def live_faults(plan: RulePlan,
+                      sources: Iterable[AsyncIterator[Union[Sample,
+                                                           List[Sample]]]],
+                      dtypes: Mapping[str, Any] = None,
+                      window: int = DEFAULT_WINDOW,
+                      max_batch: int = DEFAULT_MAX_BATCH,
+                      max_latency: float = DEFAULT_MAX_LATENCY,
+                      state: LiveState = None
+                      ) -> AsyncIterator[FaultEvent]:
+    """Check the rules of plan on the samples of sources as they arrive,
+    and yield fault events until every source is exhausted
+    inputs
+    -------
+    plan: (RulePlan) see LiveState
+    sources: (iterable) of async iterators of a Sample, or of a list of
+    samples read together (like a poll of every unit), see replay_trends.
+    Sources are read concurrently
+    dtypes, window: see LiveState
+    max_batch: (int) number of samples evaluated together, after which a
+    batch is evaluated without waiting
+    max_latency: (float) seconds a sample waits for its batch to fill
+    state: (LiveState) continue from a previous state, or None to start
+    from no samples
+    outputs
+    -------
+    events: (async iterator) of FaultEvent"""
+    if state is None:
+        state = LiveState(plan, dtypes, window)
+    loop = asyncio.get_running_loop()
+    pending: Deque[List[Sample]] = deque()
+    # Sources wait while max_batch samples are queued, so a sample does not
+    # wait behind more than a batch
+    queued = 0
+    arrived, dequeued = asyncio.Event(), asyncio.Event()
+    finished = False
+
+    async def read(source: AsyncIterator[Union[Sample, List[Sample]]]
+                   ) -> None:
+        nonlocal queued
+        async for samples in source:
+            if isinstance(samples, Sample):
+                samples = [samples]
+            while queued >= max_batch:
+                dequeued.clear()
+                await dequeued.wait()
+            pending.append(samples)
+            queued += len(samples)
+            arrived.set()
+
+    async def read_all() -> None:
+        nonlocal finished
+        try:
+            await asyncio.gather(*(read(source) for source in sources))
+        finally:
+            finished = True
+            arrived.set()
+
+    async def wait(timeout: float = None) -> bool:
+        """Wait until samples are queued or every source is finished.
+        Returns False after timeout seconds"""
+        while not pending and not finished:
+            if timeout is not None and timeout <= 0:
+                return False
+            arrived.clear()
+            try:
+                await asyncio.wait_for(arrived.wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+
+        return True
+
+    reader = asyncio.ensure_future(read_all())
+    try:
+        while await wait() and pending:
+            deadline = loop.time() + max_latency
+            batch: List[Sample] = []
+            while len(batch) < max_batch:
+                if pending:
+                    samples = pending.popleft()
+                    queued -= len(samples)
+                    dequeued.set()
+                    batch.extend(samples)
+                elif finished or not await wait(deadline - loop.time()):
+                    break
+            for event in state.update(batch):
+                yield event
+        await reader  # Raise errors of sources
+    finally:
+        reader.cancel()
+
+    return
+
+
+async def replay_trends(trends: Mapping[str, pd.DataFrame],
+                        columns: List[str] = None, speed: float = 0,
+                        datetime_column: str = 'DateTime'
+                        ) -> AsyncIterator[List[Sample]]:
+    """Stand-in for a poller of live feeds. Trends of units are replayed
+    row by row, and the samples of every unit at a row are yielded together
+    inputs
+    -------
+    trends: (dict) of unit name to its trend, like DDVAVRules(filepath).data
+    columns: (list) of columns sent with each sample, default every column
+    speed: (float) replay speed. Rows are spaced by the difference of the
+    timestamps of the first unit divided by speed, so 60 replays an hour
+    each minute. When 0 (default) rows are sent as fast as they are read
+    datetime_column: (str) column of sample timestamps
+    outputs
+    -------
+    samples: (async iterator) of a list of samples of each row"""
+    feeds = [(unit, _replay_rows(data, columns, datetime_column))
+             for unit, data in trends.items()]
+    n_rows = max((data.shape[0] for data in trends.values()), default=0)
+    seconds = np.zeros(n_rows)
+    if speed > 0:
+        times = pd.to_datetime(next(iter(trends.values()))[datetime_column])
+        seconds[:len(times)] = (times - times.iloc[0]).dt.total_seconds()
+
+    start = time.perf_counter()
+    for row in range(n_rows):
+        # Other sources and the review run between rows
+        await asyncio.sleep(max(
+            start + seconds[row] / speed - time.perf_counter(), 0) if speed > 0
+            else 0)
+        samples = []
+        for unit, rows in feeds:
+            timestamp, values = next(rows, (None, None))
+            if values is not None:
+                samples.append(Sample(unit, timestamp, values))
+        yield samples
+
+    return
+
+
+def _replay_rows(data: pd.DataFrame, columns: List[str],
+                 datetime_column: str) -> Iterator[Tuple[Any, Dict]]:
+    """Yield the timestamp and values of each row of a trend. Rows are
+    converted to python objects REPLAY_CHUNK_ROWS at a time, so replaying
+    many units does not keep every row of every unit in memory"""
+    names = list(data.columns if columns is None else columns)
+    arrays = [data[column].to_numpy() for column in names]
+    timestamps = data[datetime_column].to_numpy()
+    for start in range(0, data.shape[0], REPLAY_CHUNK_ROWS):
+        stop = start + REPLAY_CHUNK_ROWS
+        yield from zip(timestamps[start:stop], (
+            dict(zip(names, row)) for row in
+            zip(*(array[start:stop].tolist() for array in arrays))))
+
+    return
+
+
+parser = argparse.ArgumentParser(
+    description=('Check rules on trend files replayed as live feeds, and ' +
+                 'write fault events as JSON lines'))
+parser.add_argument('filepaths', type=os.path.abspath, nargs='+',
+                    help='Trend files in CSV format, one unit each')
+parser.add_argument('--type', '-t', type=str, required=True,
+                    dest='type',
+                    help=('Equipment type of the trend files, like ddvav. ' +
+                          'One of the registered equipment types'))
+parser.add_argument('--speed', type=float, required=False, default=0,
+                    dest='speed',
+                    help=('Replay speed, like 60 to replay an hour each ' +
+                          'minute (default: 0, as fast as possible)'))
+parser.add_argument('--window', type=int, required=False,
+                    default=DEFAULT_WINDOW, dest='window',
+                    help=('Number of samples of percent rules ' +
+                          f'(default: {DEFAULT_WINDOW})'))
+parser.add_argument('--max-latency', type=float, required=False,
+                    default=DEFAULT_MAX_LATENCY, dest='max_latency',
+                    help=('Seconds a sample may wait to be evaluated with ' +
+                          f'others (default: {DEFAULT_MAX_LATENCY})'))
+
+
+async def replay_files(filepaths: List[str], equipment_type: str,
+                       speed: float = 0, window: int = DEFAULT_WINDOW,
+                       max_latency: float = DEFAULT_MAX_LATENCY,
+                       write=None) -> int:
+    """Replay trend files as live feeds of units named by the files, and
+    write each fault event as a JSON line. Returns the number of events"""
+    plan = equipment_class(equipment_type).plan
+    write = write or sys.stdout.write
+    trends, dtypes = {}, {}
+    for filepath in filepaths:
+        data = pd.read_csv(filepath)
+        parse_date_columns(data, ['DateTime'])
+        dtypes.update(data.dtypes.to_dict())
+        trends[os.path.splitext(os.path.basename(filepath))[0]] = data
+
+    n_events = 0
+    async for event in live_faults(plan, [replay_trends(trends, speed=speed)],
+                                   dtypes=dtypes,
+                                   window=window, max_latency=max_latency):
+        write(json.dumps(event.to_dict()) + '\n')
+        n_events += 1
+
+    return n_events
+
+
+def main(parser: argparse.ArgumentParser):
+    """Entrypoint"""
+    namespace = parser.parse_args()
+    if namespace.type not in equipment_types():
+        parser.error(f"argument --type: must be one of {equipment_types()}")
+    asyncio.run(replay_files(namespace.filepaths, namespace.type,
+                             namespace.speed, namespace.window,
+                             namespace.max_latency))
+
+    return None
+
+
+if __name__ == '__main__':
+    sys.exit(main(parser))
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 20:14:05 2026
+
+@author: jvorsten
+
+Choices of command line options
+This module has no third party imports, so the command line is parsed (and
+--help is printed) without importing numpy, pandas or matplotlib. Modules
+which use a choice import it from here
+"""
+
+# Python imports
+
+# Third party imports
+
+# Local imports
+
+# Declarations
+# Report files written by reporting.ReportWriter
+REPORT_FORMATS = ['text', 'jsonl', 'csv']
+# Methods of decimate.decimate_data
+DECIMATION_METHODS = ['minmax', 'lttb']
+# Cleaning steps of data_cleaning_utilities.clean_frame: the filters of
+# data_cleaning_utilities.FILTERS, then forward-fill of empty fields
+CLEANING_STEPS = ['empty', 'any-empty', 'alphabetic', 'columns', 'fill']
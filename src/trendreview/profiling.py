@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 15:31:52 2026
+
+@author: jvorsten
+
+Per-stage timing and memory instrumentation of a review
+Stages of a review (reading a trend, evaluating rules, logging an issue)
+are wrapped in stage() contexts or the profiled decorator. While a Profiler
+is active, each stage records its wall time, the number of rows it
+processed and the peak resident set size (RSS) of the process during the
+stage. When no Profiler is active a stage does nothing
+
+Peak RSS
+On Linux the peak RSS of the process is reset at the start of each stage
+(see /proc/self/clear_refs), so the peak of a stage is the highest RSS
+while the stage ran. On other systems the peak is the highest RSS of the
+process since it started, or None when it is not available
+
+Stages may be nested, the time and peak RSS of a stage include its nested
+stages. The summary table adds up stages of the same name. The trace is a
+JSON file in the Chrome trace event format, which can be opened in
+chrome://tracing or https://ui.perfetto.dev
+
+Example
+with Profiler() as profiler:
+    review_file(filepath, 'ddvav', reporter)
+print(profiler.summary())
+profiler.save_trace('c:/path/to/profile.json')
+"""
+
+# Python imports
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+import functools
+import json
+import os
+import sys
+import time
+
+# Third party imports
+
+# Local imports
+
+# Declarations
+PROC_STATUS = '/proc/self/status'
+PROC_CLEAR_REFS = '/proc/self/clear_refs'
+_profiler: Optional['Profiler'] = None  # Active profiler
+_can_reset_peak: Optional[bool] = None  # Unknown until first reset
+
+# %%
+
+
+def _peak_rss() -> Optional[int]:
+    """Peak RSS of this process in bytes, since it started or since the
+    last _reset_peak_rss"""
+    try:
+        with open(PROC_STATUS, 'rt', encoding='ascii') as file:
+            for line in file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _reset_peak_rss() -> None:
+    """Reset the peak RSS of this process to its current RSS, when the
+    system supports it (Linux)"""
+    global _can_reset_peak
+    if _can_reset_peak is False:
+        return None
+    try:
+        with open(PROC_CLEAR_REFS, 'wt', encoding='ascii') as file:
+            file.write('5')
+        _can_reset_peak = True
+    except OSError:
+        _can_reset_peak = False
+
+    return None
+
+
+class Stage:
+    """A stage of a review. Set rows within the stage when the number of
+    rows processed is only known after the stage starts"""
+
+    def __init__(self, name: str, rows: int = None):
+        self.name = name
+        self.rows = rows
+        self.peak_rss: Optional[int] = None
+
+        return None
+
+    def add_peak(self, peak_rss: Optional[int]) -> None:
+        """Raise the peak RSS of the stage to peak_rss"""
+        if peak_rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, peak_rss)
+
+        return None
+
+
+class Profiler:
+    """Record the stages of a review while active
+
+    Example
+    with Profiler() as profiler:
+        with stage('read', rows=100):
+            ...
+    profiler.records # [{'name': 'read', 'seconds': 0.1, 'rows': 100, ...}]
+    """
+
+    def __init__(self):
+        self.records: List[Dict] = []
+        self._stack: List[Stage] = []
+        self._previous: Optional[Profiler] = None
+
+        return None
+
+    def __enter__(self) -> 'Profiler':
+        global _profiler
+        self._previous = _profiler
+        _profiler = self
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        global _profiler
+        _profiler = self._previous
+        self._previous = None
+
+        return None
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None) -> Iterator[Stage]:
+        """Record the wall time, rows and peak RSS of the code within the
+        context as a stage named name"""
+        record = Stage(name, rows)
+        if self._stack:
+            # The peak of the enclosing stage is kept before it is reset
+            self._stack[-1].add_peak(_peak_rss())
+        _reset_peak_rss()
+        self._stack.append(record)
+        start_time = time.time()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start
+            self._stack.pop()
+            record.add_peak(_peak_rss())
+            if self._stack:
+                self._stack[-1].add_peak(record.peak_rss)
+            self.records.append({
+                'name': name, 'start': start_time, 'seconds': seconds,
+                'rows': record.rows, 'peak_rss': record.peak_rss,
+                'depth': len(self._stack), 'pid': os.getpid()})
+
+    def merge(self, records: List[Dict]) -> None:
+        """Add records of a profiler of another process, like a batch
+        worker"""
+        self.records.extend(records)
+
+        return None
+
+    def totals(self) -> List[Dict]:
+        """Return the calls, total seconds, total rows and highest peak RSS
+        of each stage name, slowest first"""
+        totals: Dict[str, Dict] = {}
+        for record in self.records:
+            total = totals.setdefault(record['name'], {
+                'name': record['name'], 'calls': 0, 'seconds': 0.0,
+                'rows': None, 'peak_rss': None})
+            total['calls'] += 1
+            total['seconds'] += record['seconds']
+            if record['rows'] is not None:
+                total['rows'] = (total['rows'] or 0) + int(record['rows'])
+            if record['peak_rss'] is not None:
+                total['peak_rss'] = max(total['peak_rss'] or 0,
+                                        record['peak_rss'])
+
+        return sorted(totals.values(), key=lambda total: -total['seconds'])
+
+    def summary(self) -> str:
+        """Return a text table of the totals of each stage"""
+        lines = [f"{'Stage':<44} {'Calls':>7} {'Seconds':>10} " +
+                 f"{'Rows':>12} {'Peak RSS [MB]':>14}"]
+        for total in self.totals():
+            rows = '' if total['rows'] is None else str(total['rows'])
+            peak = '' if total['peak_rss'] is None else \
+                f"{total['peak_rss'] / 2**20:.1f}"
+            lines.append(f"{total['name']:<44} {total['calls']:>7} " +
+                         f"{total['seconds']:>10.3f} {rows:>12} {peak:>14}")
+
+        return '\n'.join(lines)
+
+    def trace(self) -> Dict:
+        """Return the records in the Chrome trace event format, with the
+        totals of each stage under the key 'summary'"""
+        origin = min((record['start'] for record in self.records),
+                     default=0.0)
+        events = [{
+            'name': record['name'], 'cat': 'trendreview', 'ph': 'X',
+            'ts': (record['start'] - origin) * 1e6,
+            'dur': record['seconds'] * 1e6,
+            'pid': record['pid'], 'tid': 0,
+            'args': {'rows': record['rows'], 'peak_rss': record['peak_rss'],
+                     'depth': record['depth']}}
+            for record in self.records]
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms',
+                'summary': self.totals()}
+
+    def save_trace(self, filepath: str) -> None:
+        """Write the trace (see trace) to a JSON file"""
+        with open(filepath, 'wt', encoding='UTF-8') as file:
+            json.dump(self.trace(), file)
+
+        return None
+
+
+def active() -> Optional[Profiler]:
+    """Return the active profiler, or None"""
+    return _profiler
+
+
+@contextmanager
+def stage(name: str, rows: int = None) -> Iterator[Stage]:
+    """Record the code within the context as a stage of the active
+    profiler. Does nothing when no profiler is active
+
+    Example
+    with stage('read_trend') as record:
+        data = read(...)
+        record.rows = data.shape[0]
+    """
+    if _profiler is None:
+        yield Stage(name, rows)
+        return
+    with _profiler.stage(name, rows) as record:
+        yield record
+
+
+def profiled(name: str) -> Callable[[Callable], Callable]:
+    """Decorator which records each call of a function as a stage named
+    name of the active profiler"""
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return function(*args, **kwargs)
+            with _profiler.stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+
+    return decorator
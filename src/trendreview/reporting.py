@@ -10,30 +10,95 @@ containing the exceptions data
 """
 
 # Python imports
-from typing import MutableMapping
+from concurrent.futures import (ProcessPoolExecutor, Future, wait,
+                                FIRST_COMPLETED)
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterable, Mapping, MutableMapping
 import os
+import sys
+import csv
 import glob
+import json
 import re
-from typing import List
+import weakref
+from typing import List, Set, TextIO
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
 
 # Third party imports
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-from matplotlib.dates import AutoDateLocator
+import numpy as np
+import pandas as pd
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
 # Local imports
 from trendreview.FDDExceptions import FDDException
+from trendreview.faults import Fault
+from trendreview.decimate import decimate_data, DECIMATION_METHODS
+from trendreview.profiling import profiled
+from trendreview.options import REPORT_FORMATS
 
 # Declarations
+# Files written next to the text report, named after the report
+REPORT_SUFFIXES = {'text': None, 'jsonl': '_issues.jsonl', 'csv': '_issues.csv'}
+ISSUE_CSV_COLUMNS = ['issue', 'file', 'rule', 'kind', 'severity', 'count',
+                     'limit', 'episodes', 'image', 'message']
+DEFAULT_FLUSH_EVERY = 100  # Issues written between flushes
+WRITE_BUFFER_SIZE = 2**20
 
 
 # %%
 
+
+def _pyplot():
+    """Import matplotlib.pyplot when the first image is rendered. Images
+    are only written to files, so the non-interactive Agg backend is
+    selected, unless pyplot is already imported or a backend is set by the
+    environment variable MPLBACKEND"""
+    if 'matplotlib.pyplot' not in sys.modules and \
+            not os.environ.get('MPLBACKEND'):
+        import matplotlib
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+@contextmanager
+def _file_lock(file):
+    """Hold an exclusive lock of an open file until the context exits.
+    Other processes locking the same file wait for the lock"""
+    if os.name == 'nt':
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield file
+        finally:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield file
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
 class FDDImageGeneration:
     """Generate images of faults based on underlaying data which generated a fault
+
+    Images are numbered by a counter file in the save directory, which holds
+    the next free image number. Each image number is reserved by locking
+    and advancing the counter, so numbering does not depend on the number
+    of images in the directory, and processes saving images into the same
+    directory never reserve the same number. The first time a directory is
+    used, the counter starts after the highest numbered existing image
     """
     base_imgname = "figure"
     img_format = "png"
+    counter_filename = ".figure_counter"
 
     def __init__(self, save_directory: str):
 
@@ -41,8 +106,10 @@ class FDDImageGeneration:
             msg = "Passed path is not a directory: {}".format(save_directory)
             raise ValueError(msg)
         self.save_directory = save_directory
-        # Add one in case of existing images
-        self.image_number = self.get_highest_img_number(self.save_directory) + 1
+        self.counter_filepath = os.path.join(save_directory,
+                                             self.counter_filename)
+        # One more than the image last reserved by this generator
+        self.image_number = self.next_image_number(reserve=False)
 
         return None
 
@@ -54,24 +121,28 @@ class FDDImageGeneration:
         -------
         chart_properties: (dict) of mappings for matplotlib style configuration
         options. See https://matplotlib.org/stable/api/_as_gen/matplotlib.lines.Line2D.html"""
+        return cls.generate_figure(exception.data, chart_properties)
+
+    @classmethod
+    def generate_figure(cls, data: MutableMapping,
+                        chart_properties: MutableMapping[str, str]):
+        """Create a figure from a figure specification
+        inputs
+        -------
+        data: (dict) data of a FDDException, see FDDException.data
+        chart_properties: (dict) of mappings for matplotlib style configuration
+        options"""
         # Annotate data
-        data = exception.data
         independent_label = data['primary_axis_label']
         dependent_labels = data['dependent_axis_labels']
         x_data = data[independent_label]
 
         # Create the image
-        fig, axes = plt.subplots(1, 1)
+        fig, axes = _pyplot().subplots(1, 1)
 
         # Set axes x and y label
         axes.set_xlabel(independent_label)
-        ylabel = str()
-        for idx, label in enumerate(dependent_labels):
-            if idx % 2 == 0:
-                ylabel += ", " + label
-            if idx % 2 == 1:
-                ylabel += "\n" + label
-        axes.set_ylabel(ylabel)
+        axes.set_ylabel(dependent_axis_label(dependent_labels))
 
         # Set data
         for dependent_label in dependent_labels:
@@ -82,30 +153,81 @@ class FDDImageGeneration:
         axes.legend()
 
         # Format dates on X axis
+        from matplotlib.dates import AutoDateLocator
         locator = AutoDateLocator()
         axes.xaxis.set_major_locator(locator)
         fig.autofmt_xdate()
 
         return fig
 
-    def save_image(self, fig: Figure):
+    def save_image(self, fig: 'Figure', close: bool = True):
         """Save a file to a given directory based on class properties
         inputs
         ------
-        Figure: Matplotlib.figure object which supports .savefig method"""
-        filename = (self.save_directory + os.sep + self.base_imgname +
-                    str(self.image_number) + "." + self.img_format)
+        Figure: Matplotlib.figure object which supports .savefig method
+        close: (bool) close the figure after saving. Figures owned by a
+        FigureTemplate are kept open to be reused
+        outputs
+        -------
+        filename: (str) path of the saved image"""
+        filename = self.reserve_image_filename()
         fig.savefig(filename, dpi='figure', format=self.img_format,
                     bbox_inches='tight')
-        self.image_number += 1
-        plt.close(fig) # Free memory
+        if close:
+            _pyplot().close(fig) # Free memory
 
-        return None
+        return filename
+
+    def reserve_image_filename(self) -> str:
+        """Return the file name of the next image and advance the image
+        number. Used when an image is saved later, or by another process"""
+        number = self.next_image_number(reserve=True)
+        filename = (self.save_directory + os.sep + self.base_imgname +
+                    str(number) + "." + self.img_format)
+        self.image_number = number + 1
+
+        return filename
+
+    def next_image_number(self, reserve: bool = True) -> int:
+        """Return the next free image number of the save directory
+        inputs
+        -------
+        reserve: (bool) advance the counter, so the number is not returned
+        again to this or another process"""
+        with open(self.counter_filepath, 'a+', encoding='ascii') as file, \
+                _file_lock(file):
+            file.seek(0)
+            try:
+                number = int(file.read().strip())
+                started = True
+            except ValueError:
+                # New (or damaged) counter, start after existing images
+                number = self.get_highest_img_number(self.save_directory) + 1
+                started = False
+            if reserve or not started:
+                file.seek(0)
+                file.truncate()
+                file.write(str(number + 1 if reserve else number))
+                file.flush()
+
+        return number
+
+    def move_image(self, image_filepath: str) -> int:
+        """Move an already rendered image into the save directory with the
+        next image number
+        outputs
+        -------
+        image_number: (int) number of the moved image"""
+        os.replace(image_filepath, self.reserve_image_filename())
+
+        return self.image_number - 1
 
     @classmethod
     def get_highest_img_number(cls, save_directory: str) -> int:
         """WIthin a directory, return the highest integer of a file
-        matching the name pattern Figure[0-9].png"""
+        matching the name pattern Figure[0-9].png
+        Every file name of the directory is scanned, so this is only used to
+        start the image counter of a directory"""
         fig_number:int = 0
         names = glob.glob(
             (os.path.normpath(save_directory) + os.path.sep + cls.base_imgname +
@@ -131,23 +253,467 @@ class FDDImageGeneration:
         return max(fig_numbers)
 
 
+def dependent_axis_label(dependent_labels: List[str]) -> str:
+    """Y axis label listing every dependent axis label, two per line"""
+    ylabel = str()
+    for idx, label in enumerate(dependent_labels):
+        if idx % 2 == 0:
+            ylabel += ", " + label
+        if idx % 2 == 1:
+            ylabel += "\n" + label
+
+    return ylabel
+
+
+class FigureTemplate:
+    """Render many images with one figure and axes. Creating a figure, axes,
+    and date formatting dominates the time to render an image, so the lines
+    of a single figure are updated with new data and labels instead
+
+    Example
+    template = FigureTemplate()
+    for exception in exceptions:
+        fig = template.render(exception.data, chart_properties)
+        fig.savefig(...)
+    template.close()
+    """
+
+    def __init__(self):
+        self.fig: 'Figure' = None
+        self.axes = None
+        self.lines = []
+        self._kinds: str = None
+        self._chart_properties: dict = None
+
+        return None
+
+    def close(self) -> None:
+        """Close the figure of the template"""
+        if self.fig is not None:
+            _pyplot().close(self.fig)
+        self.fig, self.axes, self.lines = None, None, []
+        self._kinds, self._chart_properties = None, None
+
+        return None
+
+    @staticmethod
+    def _independent_values(values) -> np.ndarray:
+        """Independent axis values as an array. Timestamps, and strings of
+        timestamps, are plotted as dates"""
+        x_values = np.asarray(values)
+        if x_values.dtype.kind in 'OUS':
+            try:
+                x_values = pd.to_datetime(x_values).to_numpy()
+            except (ValueError, TypeError):
+                pass  # Plotted as categories
+
+        return x_values
+
+    def render(self, data: MutableMapping,
+               chart_properties: MutableMapping[str, str]) -> 'Figure':
+        """Draw a figure specification on the template figure
+        inputs
+        -------
+        data: (dict) data of a FDDException, see FDDException.data
+        chart_properties: (dict) of mappings for matplotlib style configuration
+        options
+        outputs
+        -------
+        fig: (matplotlib.figure.Figure) the template figure. Do not close it,
+        call FigureTemplate.close when all images are rendered"""
+        independent_label = data['primary_axis_label']
+        dependent_labels = data['dependent_axis_labels']
+        x_values = self._independent_values(data[independent_label])
+        y_values = [np.asarray(data[label]) for label in dependent_labels]
+        kinds = x_values.dtype.kind + ''.join(
+            values.dtype.kind for values in y_values)
+
+        # Axis units are fixed by the first plotted data. Categories would
+        # accumulate across images, so categorical data use a new figure
+        if (self.fig is None or kinds != self._kinds or
+                any(kind in 'OUS' for kind in kinds)):
+            self.close()
+            self.fig, self.axes = _pyplot().subplots(1, 1)
+            self._kinds = kinds
+        if chart_properties != self._chart_properties:
+            self._remove_lines()
+            self._chart_properties = dict(chart_properties)
+
+        self.axes.set_xlabel(independent_label)
+        self.axes.set_ylabel(dependent_axis_label(dependent_labels))
+
+        # Update existing lines, add or remove lines to match the labels
+        while len(self.lines) > len(dependent_labels):
+            self.lines.pop().remove()
+        for idx, dependent_label in enumerate(dependent_labels):
+            if idx < len(self.lines):
+                self.lines[idx].set_data(x_values, y_values[idx])
+                self.lines[idx].set_label(dependent_label)
+            else:
+                self.lines.extend(self.axes.plot(
+                    x_values, y_values[idx], label=dependent_label,
+                    **chart_properties))
+        self.axes.relim()
+        self.axes.autoscale_view()
+        self.axes.legend()
+
+        # Format dates on X axis
+        from matplotlib.dates import AutoDateLocator
+        self.axes.xaxis.set_major_locator(AutoDateLocator())
+        self.fig.autofmt_xdate()
+
+        return self.fig
+
+    def _remove_lines(self) -> None:
+        """Remove every line and restart the color cycle, so lines are
+        styled like lines of a new figure"""
+        for line in self.lines:
+            line.remove()
+        self.lines = []
+        if self.axes is not None:
+            self.axes.set_prop_cycle(None)
+
+        return None
+
+
+# Figure template of a render worker process
+_worker_template: FigureTemplate = None
+
+
+def _initialize_render_worker():
+    """Render worker processes only write images to files"""
+    global _worker_template
+    _pyplot().switch_backend('Agg')
+    _worker_template = FigureTemplate()
+
+    return None
+
+
+def _render_image(data: MutableMapping,
+                  chart_properties: MutableMapping[str, str],
+                  filename: str, img_format: str) -> str:
+    """Render and save a figure specification within a worker process"""
+    fig = _worker_template.render(data, chart_properties)
+    fig.savefig(filename, dpi='figure', format=img_format,
+                bbox_inches='tight')
+
+    return filename
+
+
+class FDDRenderQueue:
+    """Render images in a pool of worker processes, so rule evaluation and
+    logging continue while images are written. Images are rendered with the
+    Agg backend
+
+    Example
+    queue = FDDRenderQueue(workers=4)
+    queue.submit(exception.data, chart_properties, 'c:/path/figure1.png', 'png')
+    queue.close() # Wait for all images to be written
+    """
+
+    def __init__(self, workers: int, max_pending: int = None):
+        """inputs
+        -------
+        workers: (int) number of worker processes
+        max_pending: (int) maximum number of queued figures. Submitting more
+        figures waits for queued figures to be rendered, which bounds the
+        memory held by queued data (default: 4 x workers)"""
+        self.max_pending = max_pending or 4 * workers
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_initialize_render_worker)
+        self.pending: Set[Future] = set()
+
+        return None
+
+    def submit(self, data: MutableMapping,
+               chart_properties: MutableMapping[str, str],
+               filename: str, img_format: str) -> None:
+        """Queue a figure specification to be rendered and saved to
+        filename"""
+        if len(self.pending) >= self.max_pending:
+            done, self.pending = wait(self.pending,
+                                      return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()  # Raise rendering errors
+        self.pending.add(self.executor.submit(
+            _render_image, data, dict(chart_properties), filename,
+            img_format))
+
+        return None
+
+    def join(self) -> None:
+        """Wait for every queued figure to be rendered"""
+        done, _ = wait(self.pending)
+        self.pending = set()
+        for future in done:
+            future.result()  # Raise rendering errors
+
+        return None
+
+    def close(self) -> None:
+        """Wait for every queued figure, then stop the worker processes"""
+        try:
+            self.join()
+        finally:
+            self.executor.shutdown()
+
+        return None
+
+
+def report_filepaths(log_filepath: str,
+                     formats: Iterable[str] = REPORT_FORMATS
+                     ) -> Dict[str, str]:
+    """Return the file path of each report format. Structured formats are
+    saved next to the text report, like report_issues.jsonl for
+    report.txt"""
+    base = os.path.splitext(log_filepath)[0]
+    return {fmt: log_filepath if REPORT_SUFFIXES[fmt] is None
+            else base + REPORT_SUFFIXES[fmt] for fmt in formats}
+
+
+def _json_default(value):
+    """Convert numpy scalars and arrays within issue details to JSON"""
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _close_files(files: Dict[str, TextIO]) -> None:
+    """Close every file of a mapping of report files, then empty it. Used
+    by ReportWriter.close and the finalizer of a ReportWriter"""
+    try:
+        for file in files.values():
+            file.close()
+    finally:
+        files.clear()
+
+    return None
+
+
+class ReportWriter:
+    """Write issues to the text report, and to JSON Lines and CSV files
+    next to it (see report_filepaths)
+
+    Each file is opened once with a large buffer and kept open between
+    issues. Buffers are written to disk every flush_every issues, and when
+    the writer is flushed or closed. Like the text report, structured files
+    are appended to, and a CSV file is given a header when it is created.
+    Files are opened at the first issue, and opened again if an issue is
+    written after close(). A writer which is not closed writes its buffered
+    issues and closes its files when it is garbage collected, or when the
+    interpreter exits
+
+    JSON Lines records have the keys issue, message and image, and the
+    details of the issue: for a fault the rule, kind, severity, count,
+    limit, ranges and values (see faults.Fault.to_dict), and the reviewed
+    file in a batch. The CSV summary has the columns ISSUE_CSV_COLUMNS, with
+    the number of episodes in place of ranges and values
+    """
+
+    def __init__(self, log_filepath: str, formats: Iterable[str] = ('text',),
+                 flush_every: int = DEFAULT_FLUSH_EVERY):
+        """inputs
+        -------
+        log_filepath: (str) path of the text report
+        formats: (iterable) of REPORT_FORMATS written
+        flush_every: (int) number of issues buffered between flushes"""
+        formats = list(formats)
+        unknown = set(formats).difference(REPORT_FORMATS)
+        if unknown:
+            raise ValueError(f"Report formats must be in {REPORT_FORMATS}. " +
+                             f"Got {sorted(unknown)}")
+        self.filepaths = report_filepaths(log_filepath, formats)
+        self.flush_every = max(flush_every, 1)
+        # Shared with the finalizer, so it is emptied and never replaced
+        self._files = {}
+        self._csv_writer = None
+        self._pending = 0
+        self._finalizer = weakref.finalize(self, _close_files, self._files)
+
+        return None
+
+    def _open(self) -> None:
+        """Open every report file for appending"""
+        for fmt, filepath in self.filepaths.items():
+            new = not os.path.isfile(filepath) or \
+                os.path.getsize(filepath) == 0
+            self._files[fmt] = open(filepath, 'at', encoding='UTF-8',
+                                    buffering=WRITE_BUFFER_SIZE,
+                                    newline='' if fmt == 'csv' else None)
+            if fmt == 'csv':
+                self._csv_writer = csv.DictWriter(
+                    self._files[fmt], ISSUE_CSV_COLUMNS,
+                    extrasaction='ignore')
+                if new:
+                    self._csv_writer.writeheader()
+
+        return None
+
+    def write(self, index: int, message: str, image_name: str = None,
+              details: Mapping = None) -> None:
+        """Write an issue to every report file
+        inputs
+        -------
+        index: (int) issue number
+        message: (str) issue message
+        image_name: (str) file name of the issue image, or None
+        details: (dict) structured details of the issue, see ReportWriter"""
+        if not self._files:
+            self._open()
+        details = dict(details or {})
+        if 'text' in self._files:
+            text = "Issue #" + str(index) + '\n' + message + '\n'
+            if image_name is not None:
+                text += "See " + image_name + '\n'
+            self._files['text'].write(text + '\n\n')
+        if 'jsonl' in self._files:
+            record = {'issue': index, 'message': message,
+                      'image': image_name}
+            record.update(details)
+            self._files['jsonl'].write(
+                json.dumps(record, default=_json_default) + '\n')
+        if 'csv' in self._files:
+            row = {'issue': index, 'message': message, 'image': image_name}
+            row.update(details)
+            if 'ranges' in details:
+                row['episodes'] = len(details['ranges'])
+            self._csv_writer.writerow(row)
+
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+        return None
+
+    def flush(self) -> None:
+        """Write buffered issues to disk"""
+        for file in self._files.values():
+            file.flush()
+        self._pending = 0
+
+        return None
+
+    def close(self) -> None:
+        """Write buffered issues and close the report files"""
+        try:
+            _close_files(self._files)
+        finally:
+            self._csv_writer = None
+            self._pending = 0
+
+        return None
+
+
 class FDDReporting:
     """Log exceptions generated by fault detection rules for reporting
-    into a text file."""
+    into a text file.
 
-    def __init__(self, log_filepath: str):
-        """"""
+    Use the reporter as a context manager, or call close() when all issues
+    are logged. A reporter which is not closed still writes its buffered
+    issues when it is garbage collected or the interpreter exits
+
+    Example
+    with FDDReporting(log_filepath=log_filepath) as reporter:
+        rules.evaluate_rules(rules.get_rules(), reporter)
+    """
+
+    def __init__(self, log_filepath: str, render_workers: int = 0,
+                 target_width: int = None, decimation: str = 'minmax',
+                 report_formats: Iterable[str] = ('text',),
+                 flush_every: int = DEFAULT_FLUSH_EVERY,
+                 figure_template: FigureTemplate = None):
+        """inputs
+        -------
+        log_filepath: (str) path of the text report. Images are saved in the
+        same directory
+        render_workers: (int) number of worker processes used to render
+        images. When 0 (default) images are rendered before log_exception
+        returns. Otherwise call close() (or flush()) when all issues are
+        logged to wait for images to be written
+        target_width: (int) plot width in pixels. Trends with more samples
+        are decimated before plotting. When None (default) all samples are
+        plotted
+        decimation: (str) decimation method, see decimate.DECIMATION_METHODS
+        report_formats: (iterable) of REPORT_FORMATS written, see
+        ReportWriter
+        flush_every: (int) number of issues buffered before they are
+        written to the report files. Call close() (or flush()) when all
+        issues are logged
+        figure_template: (FigureTemplate) figure reused by every image of
+        this reporter, see reuse_figure. It is not closed with the reporter,
+        so a long-running process can keep it open between reports"""
+        if decimation not in DECIMATION_METHODS:
+            raise ValueError("Decimation method must be one of " +
+                             f"{DECIMATION_METHODS}. Got {decimation}")
         self.log_filepath = log_filepath
+        self.writer = ReportWriter(log_filepath, report_formats, flush_every)
+        self.target_width = target_width
+        self.decimation = decimation
         self.log_index = 1
         # Image generation
         save_directory = os.path.split(log_filepath)[0]
         self.imageGenerator = FDDImageGeneration(save_directory)
+        self.render_queue = None
+        if render_workers > 0:
+            self.render_queue = FDDRenderQueue(render_workers)
+        # Figure reused by images logged within reuse_figure()
+        self.figure_template: FigureTemplate = figure_template
 
         return None
 
+    @contextmanager
+    def reuse_figure(self):
+        """Render every image logged within this context on one reused
+        figure, which is faster when many similar images are logged
+
+        Example
+        with reporter.reuse_figure():
+            for exception in exceptions:
+                reporter.log_exception(exception)
+        """
+        if self.figure_template is not None:
+            yield self  # Already reusing a figure
+            return
+        self.figure_template = FigureTemplate()
+        try:
+            yield self
+        finally:
+            self.figure_template.close()
+            self.figure_template = None
+
+    def flush(self) -> None:
+        """Wait for queued images to be written, and write buffered issues
+        to the report files"""
+        if self.render_queue is not None:
+            self.render_queue.join()
+        self.writer.flush()
+
+        return None
+
+    def close(self) -> None:
+        """Wait for queued images to be written, stop render workers and
+        close the report files"""
+        try:
+            if self.render_queue is not None:
+                self.render_queue.close()
+                self.render_queue = None
+        finally:
+            self.writer.close()
+
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    @profiled('FDDReporting.log_exception')
     def log_exception(self, exception: FDDException,
                       create_image: bool = True,
-                      chart_properties: MutableMapping[str, str] = {}):
+                      chart_properties: MutableMapping[str, str] = {},
+                      details: Mapping = None):
         """Given a specific failure, log the rule broken and give metadata
         on the broken rule
         inputs
@@ -156,22 +722,88 @@ class FDDReporting:
         create_image: (bool) When creating a log, choose to create an image
         showing data associated with log (default True)
         chart_properties: (dict) of mappings for matplotlib style configuration
-        options. See https://matplotlib.org/stable/api/_as_gen/matplotlib.lines.Line2D.html"""
+        options. See https://matplotlib.org/stable/api/_as_gen/matplotlib.lines.Line2D.html
+        details: (dict) structured details written to JSON Lines and CSV
+        reports, see ReportWriter"""
+
+        image_number = None
+        if create_image and self.render_queue is not None:
+            filename = self.imageGenerator.reserve_image_filename()
+            self.render_queue.submit(self.plot_data(exception),
+                                     chart_properties, filename,
+                                     self.imageGenerator.img_format)
+            image_number = self.imageGenerator.image_number - 1
+        elif create_image:
+            self.save_figure(exception, chart_properties)
+            image_number = self.imageGenerator.image_number - 1
+
+        self._write_issue(exception.message, image_number, details)
+
+        return None
+
+    def plot_data(self, exception: FDDException) -> MutableMapping:
+        """Data of an exception to plot, decimated to the target width"""
+        return decimate_data(exception.data, self.target_width,
+                             self.decimation)
+
+    def save_figure(self, exception: FDDException,
+                    chart_properties: MutableMapping[str, str] = {}) -> str:
+        """Render the image of an exception within this process and save it
+        with the next image number. The reused figure is used within
+        reuse_figure(). Returns the path of the saved image"""
+        data = self.plot_data(exception)
+        if self.figure_template is not None:
+            img = self.figure_template.render(data, chart_properties)
+            return self.imageGenerator.save_image(img, close=False)
+
+        img = self.imageGenerator.generate_figure(data, chart_properties)
+        return self.imageGenerator.save_image(img)
+
+    def log_rendered(self, message: str, image_filepath: str = None,
+                     details: Mapping = None):
+        """Log an issue whose image was already rendered, for example by a
+        worker process. The image is moved into the report directory and
+        numbered like images created by log_exception
+        inputs
+        -------
+        message: (str) issue message
+        image_filepath: (str) path to a rendered image, or None
+        details: (dict) structured details of the issue, see ReportWriter"""
+        image_number = None
+        if image_filepath is not None:
+            image_number = self.imageGenerator.move_image(image_filepath)
 
-        if create_image:
-            img = self.imageGenerator.generate_image(
-                exception, chart_properties)
-            self.imageGenerator.save_image(img)
+        self._write_issue(message, image_number, details)
+
+        return None
 
-        with open(self.log_filepath, 'at+', encoding='UTF-8') as file:
-            file.write("Issue #" + str(self.log_index) + '\n')
-            file.write(exception.message + '\n')
-            if create_image:
-                file.write("See figure" +
-                        str(self.imageGenerator.image_number - 1)
-                        + '.png\n')
-            file.write('\n\n')
+    def _write_issue(self, message: str, image_number: int = None,
+                     details: Mapping = None):
+        """Write an issue to the report files"""
+        image_name = None
+        if image_number is not None:
+            image_name = (self.imageGenerator.base_imgname +
+                          str(image_number) + '.' +
+                          self.imageGenerator.img_format)
+        self.writer.write(self.log_index, message, image_name, details)
 
         self.log_index += 1
 
         return None
+
+    def log_fault(self, fault: Fault, data: pd.DataFrame,
+                  create_image: bool = True,
+                  chart_properties: MutableMapping[str, str] = {}):
+        """Log a fault record returned by a rule plan, see log_exception
+        inputs
+        -------
+        fault: (Fault)
+        data: (pd.DataFrame) trended data the fault was detected in. Used
+        to plot the data associated with the fault
+        The rule, kind, severity and episodes of the fault are written to
+        JSON Lines and CSV reports"""
+        details = fault.to_dict()
+        details.pop('message')
+
+        return self.log_exception(fault.to_exception(data), create_image,
+                                  chart_properties, details)
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:05:44 2026
+
+@author: jvorsten
+
+Base class of equipment rule classes
+Reading a trend file, evaluating rule methods and reporting their faults is
+the same for every equipment. Only the headers and types read from the
+file, and the compiled rules (see engine.RulePlan), change. A rule class
+sets them as class attributes and defines its rule_* methods
+
+Example
+@register_equipment('ahu')
+class AHURules(EquipmentRules):
+    headers = AHU_HEADERS
+    dtypes = AHU_TYPES
+    equipment_name = 'air handling unit'
+    rules = {rule.name: rule for rule in AHU_RULES}
+    plan = RulePlan(AHU_RULES)
+
+    @classmethod
+    def rule_supply_temperature(cls, data: pd.DataFrame):
+        evaluate_rule(cls.rules['rule_supply_temperature'], data)
+"""
+
+# Python imports
+from typing import Dict, List, Callable, Mapping, Union
+
+# Third party imports
+import pandas as pd
+import numpy as np
+
+# Local imports
+from trendreview.reporting import FDDReporting
+from trendreview.faults import Fault
+from trendreview.helpers import (read_trend, read_csv_chunks, read_csv_rows,
+                                 validate_input_data_headers)
+from trendreview.trendstore import is_trend_store
+from trendreview.cache import TrendCache
+from trendreview.incremental import (CheckpointStore, DEFAULT_CHUNKSIZE,
+                                     incremental_method_faults)
+from trendreview.profiling import stage
+from trendreview.equipment import rule_names
+from trendreview.engine import (MaskRule, HourlyDeviationRule, RulePlan,
+                                method_faults)
+
+# Declarations
+
+# %%
+
+
+class EquipmentRules:
+    """Read a trend file of one equipment and evaluate its rules. Subclasses
+    set the class attributes below and define rule_* methods"""
+    # Headers and types read from trend files, see helpers.read_csv
+    headers: List[str] = []
+    dtypes: Mapping = {}
+    # Name of the equipment used in messages
+    equipment_name: str = 'equipment'
+    # Rules of the rule_* methods, compiled into one plan
+    rules: Dict[str, Union[MaskRule, HourlyDeviationRule]] = {}
+    plan: RulePlan = RulePlan([])
+
+    def __init__(self, filepath: str, chunksize: int = None,
+                 cache: TrendCache = None, clean: List[str] = None,
+                 checkpoints: CheckpointStore = None):
+        """Inputs
+        ------
+        filepath: (string) name of CSV file or trend store related to a unit
+        of the equipment to open, parse, and apply rule checks to
+        chunksize: (int) number of rows read at once. When given, the file is
+        streamed in chunks each time rules are evaluated and self.data is
+        None, so memory does not grow with the length of the trend
+        cache: (TrendCache) cache of parsed trend files. Not used when the
+        file is streamed
+        clean: (list) of cleaning steps applied to the file before rules
+        are evaluated, see data_cleaning_utilities.CLEANING_STEPS. A cleaned
+        file is loaded, not streamed
+        checkpoints: (CheckpointStore) review only the rows appended to the
+        file since it was last reviewed, see incremental. The file is
+        streamed, in chunks of DEFAULT_CHUNKSIZE rows unless chunksize is
+        given. Not used for cleaned files
+        A trend store (see trendstore) is memory-mapped instead of streamed
+        or cached, so chunksize, cache and checkpoints do not apply to it"""
+
+        self.csv_filepath = filepath
+        self.checkpoints = None if is_trend_store(filepath) or clean \
+            else checkpoints
+        self.chunksize = None if is_trend_store(filepath) or clean \
+            else chunksize
+        if self.checkpoints is not None and self.chunksize is None:
+            self.chunksize = DEFAULT_CHUNKSIZE
+        validate_input_data_headers(filepath, self.headers,
+                                    self.equipment_name)
+        self.data = None
+        if self.chunksize is None:
+            self.data = read_trend(self.csv_filepath, self.headers,
+                                   self.dtypes, cache=cache, clean=clean)
+
+        return None
+
+    def evaluate_rules(self, methods: List[Callable[[pd.DataFrame], None]],
+                       reporter: FDDReporting) -> None:
+        """This is a convenience function which calls each of the methods
+        passed to it, and catches FDDExceptions thrown by each rule, then logs
+        the exceptions
+
+        Example
+        ddvavRules = DDVAVRules(filepath)
+        methods = ddvavRules.get_rules()
+        with FDDReporting(log_filepath=log_filepath) as reporter:
+            ddvavRules.evaluate_rules(methods, reporter)
+        # Results of faults detected in `filepath`
+
+        Rules within methods are evaluated together in a single pass (see
+        engine.RulePlan). Other rules are called individually. Faults are
+        logged in the order of methods. Profiled as
+        <ClassName>.evaluate_rules
+        """
+        with stage(type(self).__name__ + '.evaluate_rules'):
+            first_faults = [faults[0] for faults in
+                            self.faults_by_method(methods).values() if faults]
+            data = self.report_data(first_faults)
+
+            for fault in first_faults:
+                reporter.log_fault(fault, data, create_image=True)
+
+        return None
+
+    def collect_faults(self, methods: List[Callable[[pd.DataFrame], None]] = None
+                       ) -> List[Fault]:
+        """Return every fault detected by methods in a single pass, without
+        stopping at the first failure of each rule. Profiled as
+        <ClassName>.collect_faults
+
+        Example
+        ddvavRules = DDVAVRules(filepath)
+        faults = ddvavRules.collect_faults(ddvavRules.get_rules())
+        for fault in faults:
+            print(fault.rule, fault.ranges, fault.severity)
+        """
+        if methods is None:
+            methods = self.get_rules()
+
+        faults: List[Fault] = []
+        with stage(type(self).__name__ + '.collect_faults'):
+            for rule_faults in self.faults_by_method(methods).values():
+                faults.extend(rule_faults)
+
+        return faults
+
+    def faults_by_method(self, methods: List[Callable[[pd.DataFrame], None]]
+                         ) -> Dict[str, List[Fault]]:
+        """Return the faults of each method, in the order of methods. The
+        file is streamed when a chunksize is given, see engine.method_faults,
+        and only appended rows are evaluated when checkpoints are given"""
+        if self.data is not None:
+            return method_faults(self.plan, methods, data=self.data)
+        if self.checkpoints is not None:
+            return incremental_method_faults(
+                self.plan, methods, self.csv_filepath, self.headers,
+                self.dtypes, self.checkpoints, self.chunksize)
+
+        return method_faults(self.plan, methods, chunks=read_csv_chunks(
+            self.csv_filepath, self.headers, self.dtypes, self.chunksize))
+
+    def report_data(self, faults: List[Fault]) -> pd.DataFrame:
+        """Return the data used to report faults, see Fault.to_exception.
+        When streaming, only the reported rows and columns are read"""
+        if self.data is not None:
+            return self.data
+
+        rows = [fault.report_indices for fault in faults]
+        columns = {'DateTime'}.union(
+            *(fault.report_columns for fault in faults))
+        return read_csv_rows(self.csv_filepath,
+                             [header for header in self.headers
+                              if header in columns],
+                             self.dtypes,
+                             np.concatenate(rows + [np.zeros(0, int)]),
+                             self.chunksize)
+
+    def get_rules(self):
+        """Get all class member functions that start with 'rule_'. Names of
+        the rules are found once when the class is defined, see
+        equipment.rule_names"""
+
+        return [getattr(self, name) for name in rule_names(type(self))]
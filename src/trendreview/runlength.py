@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 09:12:40 2026
+
+@author: jvorsten
+
+Run-length encoding of boolean test conditions
+A rule check produces an array of True/False values, one per trended sample.
+A "run" is a group of consecutive True values. Runs are found with array
+operations (np.diff and np.flatnonzero) instead of iterating each sample in
+python, so the cost of a rule check does not grow with python loop overhead.
+
+Example
+mask = np.array([0,0,0,0,1,1,1,0,0,0,1,1,1], dtype=bool)
+starts, lengths, ends = run_lengths(mask)
+>>> starts, lengths, ends
+(array([ 4, 10]), array([3, 3]), array([ 7, 13]))
+"""
+
+# Python imports
+from typing import Tuple
+
+# Third party imports
+import numpy as np
+
+# Local imports
+
+# Declarations
+
+# %%
+
+
+def _as_boolean_array(data) -> np.ndarray:
+    """Convert a mask (list, np.ndarray, np.ma.MaskedArray) into a flat
+    boolean array. Masked elements of a np.ma.MaskedArray are treated as
+    False (not failing)"""
+    if isinstance(data, np.ma.MaskedArray):
+        data = data.filled(False)
+    return np.asarray(data, dtype=bool).ravel()
+
+
+def run_lengths(data) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the start index, length and end index of every run of True
+    elements in data
+    inputs
+    -------
+    data: (iterable) of 0,1 / bool representing a test condition
+    outputs
+    -------
+    starts: (np.ndarray) index of the first element of each run
+    lengths: (np.ndarray) number of elements in each run
+    ends: (np.ndarray) index one past the last element of each run, so
+    data[starts[i]:ends[i]] is the i-th run"""
+    mask = _as_boolean_array(data)
+    # Pad with False on both sides so every run has a rising and falling edge
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(np.diff(padded.view(np.int8)))
+    starts = edges[0::2]
+    ends = edges[1::2]
+
+    return starts, ends - starts, ends
+
+
+def consecutive_runs(data, n_consecutive_elements: int
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return every run of True elements that is at least
+    n_consecutive_elements long
+    inputs
+    -------
+    data: (iterable) of 0,1 / bool representing a test condition
+    n_consecutive_elements: (int) minimum length of a reported run
+    outputs
+    -------
+    starts, lengths, ends: (np.ndarray) see run_lengths"""
+    starts, lengths, ends = run_lengths(data)
+    keep = lengths >= n_consecutive_elements
+
+    return starts[keep], lengths[keep], ends[keep]
+
+
+def rising_edges(data, n_consecutive_elements: int) -> np.ndarray:
+    """Return indices where data is True for n_consecutive_elements, rising
+    edge only. Only the first index of each qualifying run is reported
+    inputs
+    -------
+    data: (iterable) of 0,1 / bool representing a test condition
+    n_consecutive_elements: (int) minimum length of a reported run
+    outputs
+    -------
+    starts: (np.ndarray) first index of each run of at least
+    n_consecutive_elements True values"""
+    starts, _, _ = consecutive_runs(data, n_consecutive_elements)
+
+    return starts
+
+
+def run_lengths_2d(data) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return every run of True elements along each row of a 2D array. All
+    rows are encoded in one pass, which is how several rule masks over the
+    same samples are checked at once
+    inputs
+    -------
+    data: (np.ndarray) 2D array of 0,1 / bool, one test condition per row
+    outputs
+    -------
+    rows: (np.ndarray) row of each run
+    starts, lengths, ends: (np.ndarray) see run_lengths. Indices are column
+    indices within the run's row"""
+    mask = np.asarray(data, dtype=bool)
+    n_rows, n_columns = mask.shape
+    # A trailing False column separates runs on adjacent rows
+    padded = np.zeros((n_rows, n_columns + 1), dtype=bool)
+    padded[:, :n_columns] = mask
+    starts, lengths, _ = run_lengths(padded.ravel())
+    rows = starts // (n_columns + 1)
+    starts = starts - rows * (n_columns + 1)
+
+    return rows, starts, lengths, starts + lengths
+
+
+def run_indices(starts: np.ndarray, lengths: np.ndarray,
+                limit: int = None) -> np.ndarray:
+    """Return the indices covered by runs, in order. The inverse of
+    run_lengths
+    inputs
+    -------
+    starts, lengths: (np.ndarray) see run_lengths
+    limit: (int) return only the first limit indices (default: all)
+    outputs
+    -------
+    indices: (np.ndarray) index of every True element of the runs"""
+    starts = np.asarray(starts, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if limit is not None:
+        # Keep the runs needed to reach limit, and shorten the last one
+        limit = max(limit, 0)
+        covered = np.cumsum(lengths)
+        n_runs = min(int(np.searchsorted(covered, limit)) + 1,
+                     lengths.shape[0])
+        starts, lengths = starts[:n_runs], lengths[:n_runs].copy()
+        if n_runs and covered[n_runs - 1] > limit:
+            lengths[-1] -= covered[n_runs - 1] - limit
+    offsets = np.cumsum(lengths) - lengths
+
+    return (np.arange(int(lengths.sum()), dtype=np.int64) +
+            np.repeat(starts - offsets, lengths))
@@ -28,9 +28,7 @@ Damper position versus airflow measurement
 """
 
 # Python imports
-from typing import List, Callable
-import inspect
-import math
+from typing import Dict, Union
 
 # Third party imports
 import pandas as pd
@@ -39,13 +37,11 @@ import numpy as np
 # Local imports
 from .FDDExceptions import FDDException
 from .reporting import FDDReporting
-from .helpers import (masked_consecutive_elements,
-                      read_csv,
-                      _datetimes_to_seconds_deviation_from_start,
-                      _hour_segment_indices_from_seconds,
-                      maximum_allowed_failures,
-                      maximum_consecutive_failures,
-                      failure_threshold_exceeded)
+from .equipment import register_equipment
+from .rules import EquipmentRules
+from .engine import (MaskRule, HourlyDeviationRule, RulePlan,
+                     evaluate_rule, both, greater, less, equal,
+                     abs_difference_greater)
 # Declarations
 SDVAV_HEADERS = ['DateTime',
                  'DamperCommand',
@@ -82,54 +78,69 @@ UNUSED_SDVAV_TYPES = {
     'AirflowSetpoint': np.float32,
 }
 
-# %%
-
-
-class SDVAVRules:
-    """Collection of rules to check on trended data for dual-duct terminal
-    units"""
-
-    def __init__(self, filepath: str):
-        """Inputs
-        ------
-        filepath: (string) name of CSV file related to a dual-duct terminal
-        unit to open, parse, and apply rule checks to"""
-
-        self.csv_filepath = filepath
-        self.data = read_csv(self.csv_filepath, SDVAV_HEADERS, SDVAV_TYPES)
-
-        return None
-
-    def evaluate_rules(self, methods: List[Callable[[pd.DataFrame], None]],
-                       reporter: FDDReporting) -> None:
-        """This is a convenience function which calls each of the methods
-        passed to it, and catches FDDExceptions thrown by each rule, then logs
-        the exceptions
-
-        Example
-        sdvavRules = SDVAVRules(filepath)
-        methods = sdvavRules.get_rules()
-        reporter = FDDReporting(log_filepath=log_filepath)
-        sdvavRules.evaluate_rules(methods, reporter)
-        # Results of faults detected in `filepath`
-        """
-        for method in methods:
-            try:
-                method(self.data)
-            except FDDException as e:
-                reporter.log_exception(e, create_image=True)
-        return None
+# Rule configuration
+AIRFLOW_TOLERANCE = 10  # [cfm] Tolerance for considering airflow at zero
+VALVE_TOLERANCE = 10  # [%] Heating valve position considered open
+DAMPER_TOLERANCE = 5  # [%] Allowed difference of damper command and position
+DAMPER_CLOSED_TOLERANCE = 2  # [%] Damper position considered closed
+FAILURE_PERCENT = 0.02
+FAILURE_CONSECUTIVE = 3
+DEVIATION_THRESHOLD = 1  # [Degree * hour] per hour measured
+
+# Rules evaluated by SDVAVRules. Rule names match the SDVAVRules method
+# which applies the rule
+SDVAV_RULES = [
+    MaskRule(
+        'rule_heating_opposed_mode',
+        both(greater('HeatingValvePosition', VALVE_TOLERANCE),
+             equal('HeatCoolMode', 'COOL')),
+        report_columns=["DateTime", "HeatingValvePosition", "HeatCoolMode"],
+        error_msg=("Heating occurs with the incorrect state in HeatCoolMode " +
+                   "HeatingValvePosition > 0 when HeatCoolMode is in 'COOL'"),
+        failure_percent=FAILURE_PERCENT,
+        failure_consecutive=FAILURE_CONSECUTIVE),
+    MaskRule(
+        'rule_damper_stuck',
+        abs_difference_greater('DamperCommand', 'DamperPosition',
+                               DAMPER_TOLERANCE),
+        report_columns=["DateTime", "DamperCommand", "DamperPosition"],
+        error_msg=("Damper stuck open: damper command and position " +
+                   "are >5% different"),
+        failure_percent=FAILURE_PERCENT,
+        failure_consecutive=FAILURE_CONSECUTIVE),
+    MaskRule(
+        'rule_airflow_on_closed_damper',
+        both(greater('AirVolume', AIRFLOW_TOLERANCE),
+             less('DamperPosition', DAMPER_CLOSED_TOLERANCE)),
+        report_columns=["DateTime", "AirVolume", "DamperPosition"],
+        error_msg=("Airflow measured while damper is closed:"),
+        failure_percent=FAILURE_PERCENT,
+        failure_consecutive=FAILURE_CONSECUTIVE),
+    HourlyDeviationRule(
+        'rule_room_temperature_deviation',
+        setpoint_column='ControlSetpoint',
+        process_column='RoomTemperature',
+        report_columns=["DateTime", "ControlSetpoint", "RoomTemperature"],
+        error_msg=("Excessive deviation in process variable versus setpoint. " +
+                   "{:.2f} DegF*hour calculated deviation during hour long " +
+                   "measurement period; threshold={}"),
+        failure_threshold=DEVIATION_THRESHOLD),
+]
 
-    def get_rules(self):
-        """Get all class member functions that start with 'rule_'"""
+# %%
 
-        methods = []
-        for name in dir(self):
-            attribute = getattr(self, name)
-            if inspect.ismethod(attribute) and str(attribute).__contains__('.rule_'):
-                methods.append(attribute)
 
-        return methods
+@register_equipment('sdvav')
+class SDVAVRules(EquipmentRules):
+    """Collection of rules to check on trended data for single-duct terminal
+    units. Files are read and rules evaluated by rules.EquipmentRules"""
+    headers = SDVAV_HEADERS
+    dtypes = SDVAV_TYPES
+    equipment_name = 'single-duct VAV'
+    # Rules are compiled into one plan when the class is defined
+    rules: Dict[str, Union[MaskRule, HourlyDeviationRule]] = {
+        rule.name: rule for rule in SDVAV_RULES}
+    plan = RulePlan(SDVAV_RULES)
 
     @classmethod
     def rule_heating_opposed_mode(cls, data: pd.DataFrame):
@@ -138,27 +149,7 @@ class SDVAVRules:
         1. heating occurs with the incorrect state in HeatCoolMode
         HeatingValvePosition > 0 when HeatCoolMode is in 'COOL'
         """
-        # Tolerance for considering airflow at zero
-        tolerance = 10
-        failure_percent = 0.02
-        failure_consecutive = 3
-        report_columns = ["DateTime", "HeatingValvePosition", "HeatCoolMode"]
-        error_msg = ("Heating occurs with the incorrect state in HeatCoolMode " +
-                     "HeatingValvePosition > 0 when HeatCoolMode is in 'COOL'")
-
-        # masking and comparisons
-        heating = np.ma.array(data["HeatingValvePosition"] > tolerance)
-        cooling_mode = np.ma.array(data["HeatCoolMode"] == "COOL")
-        mask = np.bitwise_and(heating, cooling_mode)  # masked array
-        # overlap_indices = overlap.nonzero()
-
-        # Failure condition n% of ovservations
-        maximum_allowed_failures(mask, data, failure_percent, report_columns,
-                                 error_msg)
-
-        # Failure condition n consecutive observations
-        maximum_consecutive_failures(mask, data, failure_consecutive,
-                                     report_columns, error_msg)
+        evaluate_rule(cls.rules['rule_heating_opposed_mode'], data)
 
         return None
 
@@ -168,26 +159,7 @@ class SDVAVRules:
         Rule fails if - 
         1. Damper position and command are >5% different
         """
-        # configuration
-        tolerance = 5
-        failure_percent = 0.02
-        failure_consecutive = 3
-        report_columns = ["DateTime", "DamperCommand",
-                          "DamperPosition"]
-        error_msg = ("Damper stuck open: damper command and position " +
-                     "are >5% different")
-
-        # masking and comparisons
-        diff = np.abs(np.array(data["DamperCommand"] - data["DamperPosition"]))
-        mask = np.ma.array(diff > tolerance)
-
-        # Failure condition n% of ovservations
-        maximum_allowed_failures(mask, data, failure_percent, report_columns,
-                                 error_msg)
-
-        # Failure condition n consecutive observations
-        maximum_consecutive_failures(mask, data, failure_consecutive,
-                                     report_columns, error_msg)
+        evaluate_rule(cls.rules['rule_damper_stuck'], data)
 
         return None
 
@@ -198,26 +170,8 @@ class SDVAVRules:
         Rule fails if - 
         1. Airflow is greater than 10[cfm](default) AND damper position is 
         <2[%](default)"""
-        # Tolerance for considering airflow at zero
-        tolerance = 10
-        tolerance_damper = 2  # percent
-        failure_percent = 0.02
-        failure_consecutive = 3
-        report_columns = ["DateTime", "AirVolume", "DamperPosition"]
-        error_msg = ("Airflow measured while damper is closed:")
-
-        # masking and comparisons
-        airflow = np.ma.array(data["AirVolume"] > tolerance)
-        damper_closed = np.ma.array(data["DamperPosition"] < tolerance_damper)
-        mask = np.bitwise_and(airflow, damper_closed)  # masked array
-
-        # Failure condition n% of ovservations
-        maximum_allowed_failures(mask, data, failure_percent, report_columns,
-                                 error_msg)
-
-        # Failure condition n consecutive observations
-        maximum_consecutive_failures(mask, data, failure_consecutive,
-                                     report_columns, error_msg)
+        evaluate_rule(
+            cls.rules['rule_airflow_on_closed_damper'], data)
 
         return None
 
@@ -238,30 +192,6 @@ class SDVAVRules:
         1. room temperature deviates from control setpoint as measured by 
         integral of measured temperature versus setpoint by > 1 Degree*hour per 
         hour measured"""
-        # Tolerance for considering airflow at zero
-        failure_threshold = 1  # [Degree * hour]
-        report_columns = ["DateTime", "ControlSetpoint", "RoomTemperature"]
-        error_msg = ("Excessive deviation in process variable versus setpoint. " +
-                     "{:.2f} DegF*hour calculated deviation during hour long " +
-                     "measurement period; threshold={}")
-
-        # Break into hour segments
-        seconds = _datetimes_to_seconds_deviation_from_start(data["DateTime"])
-        segments = _hour_segment_indices_from_seconds(seconds)
-
-        # summation
-        for segment in segments:
-            # Calculate temperature deviation
-            diff = data.loc[segment, "ControlSetpoint"].to_numpy(
-            ) - data.loc[segment, "RoomTemperature"].to_numpy()
-            deviation = np.trapz(y=diff, x=seconds[segment]) / 3600
-            # Error determination
-            if abs(deviation) > failure_threshold:
-                failure_threshold_exceeded(
-                    data, report_columns,
-                    report_indices=segment,
-                    error_msg=error_msg.format(
-                        abs(deviation), failure_threshold)
-                )
+        evaluate_rule(cls.rules['rule_room_temperature_deviation'], data)
 
         return None
@@ -6,6 +6,7 @@ Created on Wed Dec 29 14:58:18 2021
 """
 
 # Python imports
+from typing import TYPE_CHECKING, List
 import argparse
 import os
 import sys
@@ -13,13 +14,22 @@ import sys
 # Third party imports
 
 # Local imports
-from trendreview.ddvav import DDVAVRules
-from trendreview.GraphAll import GraphAll
-from trendreview.reporting import FDDImageGeneration, FDDReporting
-from trendreview.FDDExceptions import FDDException
+# Modules which import numpy, pandas or matplotlib are imported when a file
+# is reviewed, so parsing arguments (and --help) starts quickly
+from trendreview.options import (REPORT_FORMATS, DECIMATION_METHODS,
+                                 CLEANING_STEPS)
+from trendreview.profiling import Profiler, stage, profiled
+from trendreview.equipment import (BUILTIN_EQUIPMENT, equipment_class,
+                                   equipment_types, is_registered)
+if TYPE_CHECKING:
+    from trendreview.reporting import FDDReporting
+    from trendreview.cache import TrendCache
+    from trendreview.incremental import CheckpointStore
 
 # Declarations
-SUPPORTED_EQUIPMENT = ['ddvav', 'GraphAll']
+# Equipment rule classes are imported when they are used, see equipment.
+# Equipment types of installed packages are also supported
+SUPPORTED_EQUIPMENT = list(BUILTIN_EQUIPMENT) + ['GraphAll']
 description = """
 Fault Diagnostics and Detection for trend review of mechanical equipment
 """
@@ -30,21 +40,44 @@ a space between each name. To graph all columns omit this argument.
 """
 DESCRIPTION_SUPPORTED_EQUIPMENT = f"""
 Type of mechanical equipment being trended. Must
-be one of {SUPPORTED_EQUIPMENT}. Use GraphAll to create a graph of every
+be one of {SUPPORTED_EQUIPMENT}, or an equipment type of an installed
+package (see trendreview.equipment). Use GraphAll to create a graph of every
 data column versus the primary axis (default: DateTime).
 """
+
+
+def equipment_type(name: str) -> str:
+    """Check the --type argument. Entry points of installed packages are
+    only read for types which are not built-in"""
+    if name == 'GraphAll' or is_registered(name):
+        return name
+    raise argparse.ArgumentTypeError(
+        f"invalid choice: {name!r} (choose from " +
+        f"{', '.join(repr(known) for known in equipment_types())}, 'GraphAll')")
+
+
 parser = argparse.ArgumentParser(description=description)
 parser.add_argument('--filepath', '-f', type=os.path.abspath,
                     required=True, dest='filepath',
-                    help='file path to trended data in CSV format')
-parser.add_argument('--type', '-t', type=str,
-                    choices=SUPPORTED_EQUIPMENT, required=True,
+                    help=('file path to trended data in CSV format. If a ' +
+                          'directory is given, then every .csv file within ' +
+                          'the directory is reviewed into one report'))
+parser.add_argument('--type', '-t', type=equipment_type,
+                    metavar='{' + ','.join(SUPPORTED_EQUIPMENT) + '}',
+                    required=True,
                     dest='type',
                     help=DESCRIPTION_SUPPORTED_EQUIPMENT)
 parser.add_argument('--report-path', type=argparse.FileType('w', encoding='utf-8'),
                     required=False, default='./report.txt',
                     dest='log_filepath',
                     help='Filename to save report, like c:/path/to/report.txt')
+parser.add_argument('--report-format', type=str, nargs='+',
+                    choices=REPORT_FORMATS, dest='report_formats',
+                    default=['text'], required=False,
+                    help=('Formats of the report. jsonl and csv write one ' +
+                          'record of each issue next to the text report, ' +
+                          'like report_issues.jsonl and report_issues.csv ' +
+                          '(default: text)'))
 parser.add_argument('--datetime-header', type=str,
                     required=False, dest='independent_axis_name',
                     help=('Header label of independent axis used to graph data ' +
@@ -53,6 +86,72 @@ parser.add_argument('--datetime-header', type=str,
 parser.add_argument('--graph-columns', type=str, action='extend', nargs='+',
                     dest='graph_columns', default=None,
                     required=False, help=DESCRIPTION_GRAPH_COLUMNS)
+parser.add_argument('--all-faults', action='store_true', required=False,
+                    dest='all_faults', default=False,
+                    help=('Report every fault episode of every rule, instead ' +
+                          'of only the first failure of each rule'))
+parser.add_argument('--workers', type=int, required=False,
+                    dest='workers', default=None,
+                    help=('Number of worker processes used to review a ' +
+                          'directory of files (default: number of CPUs)'))
+parser.add_argument('--max-pending', type=int, required=False,
+                    dest='max_pending', default=None,
+                    help=('Maximum number of files queued to worker ' +
+                          'processes at once (default: 2 x workers)'))
+parser.add_argument('--render-workers', type=int, required=False,
+                    dest='render_workers', default=0,
+                    help=('Number of worker processes used to render images ' +
+                          'while rules are evaluated (default: 0, render ' +
+                          'images in the main process)'))
+parser.add_argument('--chunksize', type=int, required=False,
+                    dest='chunksize', default=None,
+                    help=('Stream trend files in chunks of this many rows ' +
+                          'instead of loading each file into memory. ' +
+                          'Results match loading the whole file ' +
+                          '(default: load the whole file)'))
+parser.add_argument('--target-width', type=int, required=False,
+                    dest='target_width', default=None,
+                    help=('Plot width in pixels. Trends with more samples ' +
+                          'are decimated before plotting, which bounds the ' +
+                          'time to render long trends (default: plot all ' +
+                          'samples)'))
+parser.add_argument('--decimation', type=str, required=False,
+                    choices=DECIMATION_METHODS, dest='decimation',
+                    default='minmax',
+                    help=('Decimation method used with --target-width. ' +
+                          'minmax keeps the minimum and maximum of each ' +
+                          'pixel column, lttb keeps the shape of lines ' +
+                          '(default: minmax)'))
+parser.add_argument('--clean', type=str, action='extend', nargs='+',
+                    choices=CLEANING_STEPS, dest='clean', default=None,
+                    required=False,
+                    help=('Clean trend files before review. Lines are removed ' +
+                          'by the filters given (empty, any-empty, ' +
+                          'alphabetic, columns), then empty fields are ' +
+                          'filled with the previous line if fill is given ' +
+                          '(default: no cleaning)'))
+parser.add_argument('--cache-dir', type=os.path.abspath, required=False,
+                    dest='cache_directory', default=None,
+                    help=('Cache parsed trend files in this directory. ' +
+                          'Unchanged files are loaded from the cache instead ' +
+                          'of being parsed again (default: no cache)'))
+parser.add_argument('--cache-size', type=int, required=False,
+                    dest='cache_size', default=1024,
+                    help=('Maximum size of the cache in MB. Least recently ' +
+                          'used files are removed first (default: 1024)'))
+parser.add_argument('--checkpoint-dir', type=os.path.abspath, required=False,
+                    dest='checkpoint_directory', default=None,
+                    help=('Save the state of the rules after reviewing each ' +
+                          'file in this directory. Later reviews of a file ' +
+                          'which was only appended to evaluate the new rows ' +
+                          'only (default: review the whole file)'))
+parser.add_argument('--profile', type=str, nargs='?', const='',
+                    required=False, dest='profile_filepath', default=None,
+                    help=('Record the wall time, rows and peak memory of ' +
+                          'each stage of the review. A summary table is ' +
+                          'printed and a JSON trace is saved to this path ' +
+                          '(default: the report path ending in ' +
+                          '_profile.json)'))
 
 # %%
 
@@ -62,25 +161,109 @@ def main(parser: argparse.ArgumentParser):
     Parse user arguments and being based on arguments"""
     # Parse arguments
     namespace = parser.parse_args()
+    if namespace.profile_filepath is None:
+        return run(namespace)
+
+    profile_filepath = os.path.abspath(
+        namespace.profile_filepath or
+        os.path.splitext(namespace.log_filepath.name)[0] + '_profile.json')
+    with Profiler() as profiler:
+        try:
+            with stage('trendreview.main'):
+                run(namespace)
+        finally:
+            print(profiler.summary())
+            profiler.save_trace(profile_filepath)
+            print(f"Saved profile trace {profile_filepath}")
+
+    return None
+
+
+def run(namespace: argparse.Namespace):
+    """Review the files given by parsed command line arguments"""
+    from trendreview.reporting import FDDReporting, report_filepaths
+    from trendreview.cache import TrendCache
+    from trendreview.incremental import CheckpointStore
     filepath = os.path.abspath(namespace.filepath)
     equipment_type = namespace.type
     log_filepath = os.path.abspath(namespace.log_filepath.name)
     namespace.log_filepath.close()
+    # The text report was emptied when it was opened by the parser, other
+    # report formats are emptied too
+    for report_filepath in report_filepaths(
+            log_filepath, namespace.report_formats).values():
+        open(report_filepath, 'wb').close()
     independent_axis_name = namespace.independent_axis_name
     graph_columns = namespace.graph_columns  # List
+    all_faults = namespace.all_faults
+    cache = None
+    if namespace.cache_directory is not None:
+        cache = TrendCache(namespace.cache_directory,
+                           max_bytes=namespace.cache_size * 2**20)
+    checkpoints = None
+    if namespace.checkpoint_directory is not None:
+        checkpoints = CheckpointStore(namespace.checkpoint_directory)
+
+    # Review every .csv file within a directory across worker processes
+    if os.path.isdir(filepath):
+        from trendreview.batch import run_batch, gather_csv_filenames
+        run_batch(gather_csv_filenames(filepath), equipment_type,
+                  log_filepath, workers=namespace.workers,
+                  max_pending=namespace.max_pending,
+                  target_width=namespace.target_width,
+                  decimation=namespace.decimation,
+                  independent_axis_name=independent_axis_name,
+                  graph_columns=graph_columns, all_faults=all_faults,
+                  chunksize=namespace.chunksize, cache=cache,
+                  clean=namespace.clean, checkpoints=checkpoints,
+                  report_formats=namespace.report_formats)
+        return None
 
     # Review data and run report
-    reporter = FDDReporting(log_filepath=log_filepath)
-
-    # Apply fault detection rules for dual duct terminal unit and create report
-    if equipment_type == 'ddvav':
-        ddvavRules = DDVAVRules(filepath)
-        methods = ddvavRules.get_rules()
-        for method in methods:
-            try:
-                method(ddvavRules.data)
-            except FDDException as e:
-                reporter.log_exception(e, create_image=True)
+    reporter = FDDReporting(log_filepath=log_filepath,
+                            render_workers=namespace.render_workers,
+                            target_width=namespace.target_width,
+                            decimation=namespace.decimation,
+                            report_formats=namespace.report_formats)
+    try:
+        review_file(filepath, equipment_type, reporter,
+                    independent_axis_name=independent_axis_name,
+                    graph_columns=graph_columns, all_faults=all_faults,
+                    chunksize=namespace.chunksize, cache=cache,
+                    clean=namespace.clean, checkpoints=checkpoints)
+    finally:
+        reporter.close()  # Wait for images to be written
+
+    return None
+
+
+@profiled('review_file')
+def review_file(filepath: str, equipment_type: str, reporter: 'FDDReporting',
+                independent_axis_name: str = 'DateTime',
+                graph_columns: List[str] = None,
+                all_faults: bool = False,
+                chunksize: int = None,
+                cache: 'TrendCache' = None,
+                clean: List[str] = None,
+                checkpoints: 'CheckpointStore' = None) -> None:
+    """Review a single trend file and log the results to reporter
+    inputs
+    -------
+    filepath: (str) path to trended data in CSV format
+    equipment_type: (str) one of SUPPORTED_EQUIPMENT
+    reporter: (FDDReporting) logs faults and graphs
+    independent_axis_name: (str) header of the independent axis (GraphAll)
+    graph_columns: (list) of column headers to graph, or None to graph all
+    columns (GraphAll)
+    all_faults: (bool) report every fault episode of every rule
+    chunksize: (int) stream the file in chunks of chunksize rows instead of
+    loading it into memory (equipment rules)
+    cache: (TrendCache) cache of parsed trend files, or None to always parse
+    the file
+    clean: (list) of cleaning steps applied to the file before review, see
+    data_cleaning_utilities.CLEANING_STEPS
+    checkpoints: (CheckpointStore) evaluate only the rows appended to the
+    file since it was last reviewed, see incremental (equipment rules)"""
 
     # Do not apply fault detection rules for any equipment
     # Create report and graph all data versus 'DateTime'
@@ -88,9 +271,26 @@ def main(parser: argparse.ArgumentParser):
         # Possilbe configuration in the future
         dependent_axis_names = graph_columns  # List of names
         # Load data
-        graphall = GraphAll(filepath, parse_dates=independent_axis_name)
+        from trendreview.GraphAll import GraphAll
+        graphall = GraphAll(filepath, parse_dates=independent_axis_name,
+                            cache=cache, clean=clean)
         graphall.graph_all_data(
             reporter, independent_axis_name, dependent_axis_names)
+        return None
+
+    # Apply fault detection rules of the equipment type and create report
+    # Rule classes of other packages may not accept checkpoints
+    options = {} if checkpoints is None else {'checkpoints': checkpoints}
+    equipmentRules = equipment_class(equipment_type)(
+        filepath, chunksize=chunksize, cache=cache, clean=clean, **options)
+    methods = equipmentRules.get_rules()
+    if all_faults:
+        faults = equipmentRules.collect_faults(methods)
+        data = equipmentRules.report_data(faults)
+        for fault in faults:
+            reporter.log_fault(fault, data, create_image=True)
+    else:
+        equipmentRules.evaluate_rules(methods, reporter)
 
     return None
 
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:32:08 2026
+
+@author: jvorsten
+
+Binary trend store
+A trend file converted once from CSV into fixed-dtype columns. Opening a
+store only reads its header; columns are memory-mapped, so rules and graphs
+operate on views of the file and startup does not depend on the length of
+the trend
+
+Format
+A single file with the extension .trend:
+  8 bytes    magic b'TRENDRV\\x00'
+  8 bytes    length of the header (little-endian unsigned integer)
+  header     UTF-8 json: version, n_rows and a description of each column
+  columns    one contiguous array per column, each aligned to 64 bytes
+Numeric columns are saved with their dtype (float32 for the DDVAV_TYPES and
+SDVAV_TYPES numerics), datetime columns as int64 nanoseconds, and text
+columns as int32 codes into a list of categories (-1 for missing values)
+
+Example
+Import a CSV file from the command line
+python -m trendreview.trendstore ./data/DD03.csv ./data/DD03.trend --type ddvav
+Then review the store like a CSV file
+python -m trendreview --filepath ./data/DD03.trend --type ddvav
+"""
+
+# Python imports
+from typing import Dict, Iterable, List, Mapping, Sequence
+import argparse
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+# Third party imports
+import numpy as np
+import pandas as pd
+
+# Local imports
+from .dateparse import parse_date_columns
+from .equipment import equipment_class
+from .trendreview import equipment_type, SUPPORTED_EQUIPMENT
+
+# Declarations
+STORE_FORMAT_VERSION = 1
+STORE_EXTENSION = '.trend'
+MAGIC = b'TRENDRV\x00'
+ALIGNMENT = 64
+CATEGORY_DTYPE = np.dtype('<i4')
+DEFAULT_CHUNKSIZE = 100000
+
+# %%
+
+
+def is_trend_store(filepath: str) -> bool:
+    """Return True if filepath is a trend store (by its magic bytes, not its
+    extension)"""
+    try:
+        with open(filepath, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _column_spec(values: pd.Series, dtype=None) -> Dict:
+    """Describe how a column is saved. dtype overrides the dtype inferred
+    from values (text dtypes such as str are saved as categories)"""
+    if pd.api.types.is_datetime64_dtype(values.dtype):
+        return {'kind': 'datetime', 'dtype': '<i8'}
+    if dtype is not None and np.dtype(dtype).kind in 'biuf':
+        return {'kind': 'numeric', 'dtype': np.dtype(dtype).str}
+    if dtype is None and values.dtype.kind == 'b':
+        return {'kind': 'numeric', 'dtype': '|b1'}
+    if dtype is None and values.dtype.kind in 'iuf':
+        # Integer columns may contain missing values after the first chunk
+        return {'kind': 'numeric', 'dtype': '<f8'}
+
+    return {'kind': 'category', 'dtype': CATEGORY_DTYPE.str}
+
+
+class _CategoryEncoder:
+    """Assign integer codes to text values across chunks"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        return None
+
+    def encode(self, values: pd.Series) -> np.ndarray:
+        chunk_codes, chunk_categories = pd.factorize(values)
+        mapping = np.empty(len(chunk_categories) + 1, dtype=CATEGORY_DTYPE)
+        mapping[-1] = -1  # Missing values keep code -1
+        for idx, category in enumerate(chunk_categories):
+            mapping[idx] = self.codes.setdefault(str(category),
+                                                 len(self.codes))
+        return mapping[chunk_codes]
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self.codes)
+
+
+def import_csv(csv_filepath: str, store_filepath: str,
+               dtypes: Mapping = None,
+               parse_dates: Sequence[str] = ('DateTime',),
+               chunksize: int = DEFAULT_CHUNKSIZE) -> 'TrendStore':
+    """Convert a CSV trend file into a trend store. The CSV file is read in
+    chunks, so files larger than memory can be imported
+    inputs
+    -------
+    csv_filepath: (str) trend file in CSV format
+    store_filepath: (str) path of the store to create. An existing store is
+    replaced
+    dtypes: (dict) of column name to dtype. Numeric dtypes are saved as
+    given, other dtypes (str, object) are saved as categories. Columns not
+    given are inferred from the first chunk: numeric columns are saved as
+    float64 and other columns as categories
+    parse_dates: (list) columns parsed as datetimes
+    chunksize: (int) number of rows read at once
+    outputs
+    -------
+    store: (TrendStore) the imported store"""
+    dtypes = dict(dtypes or {})
+    parse_dates = list(parse_dates)
+    read_dtypes = {column: dtype for column, dtype in dtypes.items()
+                   if column not in parse_dates}
+    read_dtypes.update({column: str for column in parse_dates})
+    first = pd.read_csv(csv_filepath, sep=',', nrows=chunksize,
+                        dtype=read_dtypes)
+    names = list(first.columns)
+    parse_dates = [column for column in parse_dates if column in names]
+    formats = parse_date_columns(first, parse_dates)
+    specs = [_column_spec(first[name], dtypes.get(name)) for name in names]
+    read_dtypes = {name: spec['dtype'] for name, spec in zip(names, specs)
+                   if spec['kind'] == 'numeric'}
+    read_dtypes.update({name: str for name, spec in zip(names, specs)
+                        if spec['kind'] != 'numeric'})
+    encoders = {name: _CategoryEncoder() for name, spec in zip(names, specs)
+                if spec['kind'] == 'category'}
+    parse_dates = [name for name, spec in zip(names, specs)
+                   if spec['kind'] == 'datetime']
+
+    directory = os.path.dirname(os.path.abspath(store_filepath))
+    staging = tempfile.mkdtemp(prefix='.trend-', dir=directory)
+    column_files = []
+    try:
+        # Append every chunk to one raw file per column
+        column_files = [open(os.path.join(staging, f'{idx}.bin'), 'wb')
+                        for idx in range(len(names))]
+        n_rows = 0
+        with pd.read_csv(csv_filepath, sep=',', dtype=read_dtypes,
+                         chunksize=chunksize) as reader:
+            for chunk in reader:
+                formats = parse_date_columns(chunk, parse_dates, formats)
+                for name, spec, file in zip(names, specs, column_files):
+                    values = chunk[name]
+                    if spec['kind'] == 'datetime':
+                        if not pd.api.types.is_datetime64_dtype(values.dtype):
+                            raise ValueError(
+                                f"Column {name} could not be parsed as " +
+                                f"datetimes at rows from {n_rows}")
+                        array = values.to_numpy(dtype='datetime64[ns]')\
+                            .view(np.int64)
+                    elif spec['kind'] == 'numeric':
+                        array = values.to_numpy(dtype=spec['dtype'])
+                    else:
+                        array = encoders[name].encode(values)
+                    file.write(np.ascontiguousarray(
+                        array, dtype=spec['dtype']).tobytes())
+                n_rows += chunk.shape[0]
+        for file in column_files:
+            file.close()
+
+        # Header, then columns at aligned offsets
+        for name, spec in zip(names, specs):
+            spec['name'] = name
+            if name in encoders:
+                spec['categories'] = encoders[name].categories
+        header = _layout_header(n_rows, specs)
+        temporary = os.path.join(staging, 'store' + STORE_EXTENSION)
+        with open(temporary, 'wb') as file:
+            file.write(header)
+            for idx, spec in enumerate(specs):
+                file.write(b'\x00' * (spec['offset'] - file.tell()))
+                with open(os.path.join(staging, f'{idx}.bin'), 'rb') as raw:
+                    shutil.copyfileobj(raw, file)
+        os.replace(temporary, store_filepath)
+    finally:
+        for file in column_files:
+            file.close()
+        shutil.rmtree(staging, ignore_errors=True)
+
+    return TrendStore(store_filepath)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _layout_header(n_rows: int, specs: List[Dict]) -> bytes:
+    """Assign the offset of every column and return the encoded header.
+    Offsets depend on the length of the header, so the header is encoded
+    until its length does not change"""
+    length = 0
+    while True:
+        offset = _align(len(MAGIC) + 8 + length)
+        for spec in specs:
+            spec['offset'] = offset
+            offset = _align(offset + n_rows * np.dtype(spec['dtype']).itemsize)
+        header = json.dumps({'version': STORE_FORMAT_VERSION,
+                             'n_rows': n_rows,
+                             'columns': specs}).encode('UTF-8')
+        if len(header) == length:
+            return MAGIC + struct.pack('<Q', length) + header
+        length = len(header)
+
+
+class TrendStore:
+    """Read-only view of a trend store"""
+
+    def __init__(self, filepath: str):
+        """Read the header of a trend store. Columns are not read until used
+        inputs
+        -------
+        filepath: (str) path of a store created by import_csv"""
+        self.filepath = filepath
+        with open(filepath, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{filepath} is not a trend store")
+            length, = struct.unpack('<Q', file.read(8))
+            header = json.loads(file.read(length).decode('UTF-8'))
+        if header['version'] != STORE_FORMAT_VERSION:
+            raise ValueError(
+                f"Trend store version {header['version']} is not supported. " +
+                f"Import {filepath} again")
+        self.n_rows: int = header['n_rows']
+        self.specs: Dict[str, Dict] = {
+            spec['name']: spec for spec in header['columns']}
+
+        return None
+
+    def __repr__(self):
+        return f"TrendStore({self.filepath!r}, n_rows={self.n_rows})"
+
+    @property
+    def columns(self) -> List[str]:
+        """Names of the columns, in the order of the CSV file"""
+        return list(self.specs)
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a column. Numeric and datetime columns are copy-on-write
+        memory maps of the store; text columns are decoded into an object
+        array like pandas.read_csv"""
+        spec = self.specs[name]
+        if self.n_rows == 0:
+            array = np.empty(0, dtype=spec['dtype'])
+        else:
+            array = np.memmap(self.filepath, dtype=spec['dtype'], mode='c',
+                              offset=spec['offset'], shape=(self.n_rows,))
+        if spec['kind'] == 'datetime':
+            return array.view('datetime64[ns]')
+        if spec['kind'] == 'numeric':
+            return array
+
+        categories = np.array(spec['categories'] + [np.nan], dtype=object)
+        return categories[array]  # Code -1 selects the trailing NaN
+
+    def frame(self, columns: Iterable[str] = None) -> pd.DataFrame:
+        """Return columns as a dataframe without copying numeric columns
+        inputs
+        -------
+        columns: (iterable) of column names, or None for every column.
+        Columns are returned in the order of the store"""
+        if columns is None:
+            names = self.columns
+        else:
+            missing = set(columns).difference(self.specs)
+            if missing:
+                raise KeyError(f"Columns not found in {self.filepath}: " +
+                               f"{sorted(missing)}")
+            names = [name for name in self.specs if name in set(columns)]
+
+        return pd.DataFrame({name: self.column(name) for name in names},
+                            columns=names, copy=False)
+
+
+def read_trend_store(filepath: str, headers: Iterable[str] = None
+                     ) -> pd.DataFrame:
+    """Return the columns headers (or all columns) of a trend store"""
+    return TrendStore(filepath).frame(headers)
+
+
+# %%
+
+parser = argparse.ArgumentParser(
+    description='Import a CSV trend file into a binary trend store')
+parser.add_argument('csv_filepath', type=os.path.abspath,
+                    help='file path to trended data in CSV format')
+parser.add_argument('store_filepath', type=os.path.abspath, nargs='?',
+                    default=None,
+                    help=('file path of the store to create (default: ' +
+                          f'csv_filepath with the extension {STORE_EXTENSION})'))
+parser.add_argument('--type', '-t', type=equipment_type, dest='type',
+                    metavar='{' + ','.join(SUPPORTED_EQUIPMENT) + '}',
+                    default='GraphAll',
+                    help=('Type of mechanical equipment being trended. ' +
+                          'Columns used by the equipment rules are saved ' +
+                          'with the dtypes of the rules, other numeric ' +
+                          'columns as float64. Equipment types of installed ' +
+                          'packages are accepted (default: GraphAll)'))
+parser.add_argument('--datetime-header', type=str, dest='datetime_header',
+                    default='DateTime',
+                    help='Header label of the datetime column')
+parser.add_argument('--chunksize', type=int, dest='chunksize',
+                    default=DEFAULT_CHUNKSIZE,
+                    help=('Number of rows read at once (default: ' +
+                          f'{DEFAULT_CHUNKSIZE})'))
+
+
+def main(parser: argparse.ArgumentParser):
+    """Import a CSV file from the command line"""
+    namespace = parser.parse_args()
+    store_filepath = namespace.store_filepath or \
+        os.path.splitext(namespace.csv_filepath)[0] + STORE_EXTENSION
+    dtypes = None
+    if namespace.type != 'GraphAll':
+        # Rule classes of other packages may not declare dtypes
+        dtypes = getattr(equipment_class(namespace.type), 'dtypes', None)
+    store = import_csv(namespace.csv_filepath, store_filepath, dtypes=dtypes,
+                       parse_dates=[namespace.datetime_header],
+                       chunksize=namespace.chunksize)
+    print(f"Imported {store.n_rows} rows into {store_filepath}")
+
+    return None
+
+
+if __name__ == '__main__':
+    sys.exit(main(parser))